@@ -43,6 +43,7 @@ import md5
 import mlt
 import os
 import sys
+import threading
 import time
 
 import appconsts
@@ -54,15 +55,16 @@ import clipmenuaction
 import compositeeditor
 import dialogs
 import dialogutils
+import diskcache
 import dnd
 import edit
 import editevent
 import editorpersistance
 import editorstate
 import editorwindow
-import gmic
 import gui
 import keyevents
+import lazyimport
 import medialog
 import mlt
 import mltenv
@@ -73,22 +75,21 @@ import mlttransitions
 import movemodes
 import persistance
 import positionbar
-import preferenceswindow
 import projectaction
 import projectdata
 import projectinfogui
 import proxyediting
 import render
 import renderconsumer
+import renderworker
 import respaths
 import resync
 import sequence
 import shortcuts
 import snapping
-import titler
+import startuptiming
 import tlinewidgets
 import toolsintegration
-import toolnatron
 import trimmodes
 import translations
 import undo
@@ -98,12 +99,23 @@ import utils
 
 import jackaudio
 
+# Tool windows and rarely used dialogs are imported on first use, see lazyimport.py.
+# Tools availability is checked when tool module is imported.
+gmic = lazyimport.lazy_import("gmic", lambda module: module.test_availablity())
+preferenceswindow = lazyimport.lazy_import("preferenceswindow")
+titler = lazyimport.lazy_import("titler")
+toolnatron = lazyimport.lazy_import("toolnatron", lambda module: module.init())
+
 AUTOSAVE_DIR = appconsts.AUTOSAVE_DIR
 AUTOSAVE_FILE = "autosave/autosave"
 instance_autosave_id_str = None
 PID_FILE = "flowbladepidfile"
 BATCH_DIR = "batchrender/"
 autosave_timeout_id = -1
+AUTOSAVE_FULL_SAVE_INTERVAL = 10 # Every n:th autosave is a full save that compacts journal and saves changes not tracked with edit generations
+autosave_saved_state = None
+autosave_count = 0
+autosave_thread = None
 recovery_dialog_id = -1
 loaded_autosave_file = None
 
@@ -123,6 +135,8 @@ def main(root_path):
     Called at application start.
     Initializes application with a default project.
     """
+    startuptiming.step("Module imports")
+
     # DEBUG: Direct output to log file if log file set
     if _log_file != None:
         log_print_output_to_file()
@@ -199,6 +213,7 @@ def main(root_path):
     translations.init_languages()
     translations.load_filters_translations()
     mlttransitions.init_module()
+    startuptiming.step("Preferences, shortcuts and translations")
 
     # RHEL7/CentOS compatibility fix
     if gtk_version == "3.8.8":
@@ -235,6 +250,7 @@ def main(root_path):
     # Splash screen
     if editorpersistance.prefs.display_splash_screen == True: 
         show_splash_screen()
+    startuptiming.step("GTK init and splash screen")
 
     # Init MLT framework
     repo = mlt.Factory().init()
@@ -244,6 +260,7 @@ def main(root_path):
 
     # Check for codecs and formats on the system
     mltenv.check_available_features(repo)
+    startuptiming.step("MLT init and environment detection")
     renderconsumer.load_render_profiles()
 
     # Load filter and compositor descriptions from xml files.
@@ -255,6 +272,7 @@ def main(root_path):
 
     # Create list of available mlt profiles
     mltprofiles.load_profile_list()
+    startuptiming.step("Render profiles, filters, compositors and MLT profiles")
     
     # Save assoc file path if found in arguments
     global assoc_file_path
@@ -267,21 +285,21 @@ def main(root_path):
 
     # Audiomonitoring being available needs to be known before GUI creation
     audiomonitoring.init(editorstate.project.profile)
+    startuptiming.step("Default project")
 
     # Set trim view mode to current default value
     editorstate.show_trim_view = editorpersistance.prefs.trim_view_default
 
-    # Check for tools and init tools integration
-    gmic.test_availablity()
-    toolnatron.init()
-    toolsintegration.init()
+    # Tools integration is initialized on first use
     #toolsintegration.test()
     
     # Create player object
     create_player()
+    startuptiming.step("Player")
 
     # Create main window and set widget handles in gui.py for more convenient reference.
     create_gui()
+    startuptiming.step("Editor window")
 
     # Inits widgets with project data
     init_project_gui()
@@ -294,6 +312,7 @@ def main(root_path):
 
     # Editor and modules need some more initializing
     init_editor_state()
+    startuptiming.step("Project and sequence GUI init")
 
     # Tracks need to be recentered if window is resized.
     # Connect listener for this now that the tline panel size allocation is sure to be available.
@@ -333,7 +352,15 @@ def main(root_path):
             print "Launch assoc file:", assoc_file_path
             global assoc_timeout_id
             assoc_timeout_id = GObject.timeout_add(10, open_assoc_file)
-        
+
+    # Persistent render worker is started now so that it is ready when first job is sent
+    renderworker.start()
+
+    # Report is printed when main loop is first idle
+    startuptiming.step("Autosave and callbacks")
+    if startuptiming.enabled == True:
+        GLib.idle_add(startuptiming.report)
+
     # Launch gtk+ main loop
     Gtk.main()
 
@@ -485,7 +512,8 @@ def init_project_gui():
     gui.tline_left_corner.update_gui()
     projectinfogui.update_project_info()
 
-    titler.reset_titler()
+    if lazyimport.is_loaded("titler"):
+        titler.reset_titler()
 
     # Set render folder selector to last render if prefs require 
     folder_path = editorstate.PROJECT().get_last_render_folder()
@@ -562,7 +590,6 @@ def open_project(new_project):
 
     audiomonitoring.close_audio_monitor()
     audiowaveformrenderer.clear_cache()
-    audiowaveform.frames_cache = {}
 
     editorstate.project = new_project
 
@@ -608,6 +635,8 @@ def open_project(new_project):
     editorstate.trim_mode_ripple = False
 
     updater.set_timeline_height()
+
+    diskcache.launch_eviction(new_project)
         
 def change_current_sequence(index):
     stop_autosave()
@@ -704,8 +733,7 @@ def start_autosave():
 
     print "Autosave started..."
     autosave_timeout_id = GObject.timeout_add(autosave_delay_millis, do_autosave)
-    autosave_file = utils.get_hidden_user_dir_path() + get_instance_autosave_file()
-    persistance.save_project(editorstate.PROJECT(), autosave_file)
+    _autosave_full_save()
 
 def get_autosave_files():
     autosave_dir = utils.get_hidden_user_dir_path() + AUTOSAVE_DIR
@@ -718,11 +746,90 @@ def stop_autosave():
     GObject.source_remove(autosave_timeout_id)
     autosave_timeout_id = -1
 
+    # Autosave file may be deleted or replaced after this.
+    if autosave_thread != None:
+        autosave_thread.join()
+
 def do_autosave():
-    autosave_file = utils.get_hidden_user_dir_path() + get_instance_autosave_file()
-    persistance.save_project(editorstate.PROJECT(), autosave_file)
+    # Previous autosave still being written, changes are picked up by next autosave.
+    if autosave_thread != None and autosave_thread.is_alive():
+        print "Autosave skipped, previous autosave not written yet"
+        return True
+
+    global autosave_saved_state, autosave_count
+    autosave_count += 1
+    if (autosave_count >= AUTOSAVE_FULL_SAVE_INTERVAL or
+        (autosave_thread != None and autosave_thread.failed)):
+        _autosave_full_save()
+        return True
+
+    project = editorstate.PROJECT()
+    state = _get_autosave_state(project)
+    if state == autosave_saved_state:
+        return True # Nothing changed since last autosave
+
+    # Sequences added, removed or reordered
+    project_state, seq_ids, seq_generations = state
+    saved_project_state, saved_seq_ids, saved_seq_generations = autosave_saved_state
+    if seq_ids != saved_seq_ids:
+        _autosave_full_save()
+        return True
+
+    # Append changed sequences and project data to autosave file
+    start_time = time.time()
+    changed_seq_indexes = []
+    for i in range(0, len(seq_generations)):
+        if seq_generations[i] != saved_seq_generations[i]:
+            changed_seq_indexes.append(i)
+    # Records are taken here on main thread and only encoded and written in autosave thread
+    records = list(persistance.get_project_journal_records(project, changed_seq_indexes, project_state != saved_project_state))
+    _launch_autosave_write(records, True, start_time)
+    autosave_saved_state = state
     return True
 
+def _autosave_full_save():
+    global autosave_saved_state, autosave_count
+    start_time = time.time()
+    project = editorstate.PROJECT()
+    records = list(persistance.get_project_records(project))
+    _launch_autosave_write(records, False, start_time)
+    autosave_saved_state = _get_autosave_state(project)
+    autosave_count = 0
+
+def _launch_autosave_write(records, append, start_time):
+    global autosave_thread
+    autosave_file = utils.get_hidden_user_dir_path() + get_instance_autosave_file()
+    autosave_thread = AutosaveThread(autosave_file, records, append)
+    autosave_thread.start()
+    print "Autosave snapshot taken in " + str(round(time.time() - start_time, 3)) + "s on main thread"
+
+def _get_autosave_state(project):
+    bin_generations = [(id(media_bin), media_bin.edit_generation) for media_bin in project.bins]
+    project_state = (project.media_generation, bin_generations, project.sequences.index(project.c_seq))
+    seq_ids = [id(seq) for seq in project.sequences]
+    seq_generations = [seq.edit_generation for seq in project.sequences]
+    return (project_state, seq_ids, seq_generations)
+
+class AutosaveThread(threading.Thread):
+    """
+    Encodes and writes autosave records taken from project on main thread.
+    """
+    def __init__(self, file_path, records, append):
+        threading.Thread.__init__(self)
+        self.file_path = file_path
+        self.records = records
+        self.append = append
+        self.failed = False
+
+    def run(self):
+        start_time = time.time()
+        try:
+            persistance.write_project_file(self.file_path, self.records, self.append, True)
+            print "Autosave written in " + str(round(time.time() - start_time, 3)) + "s"
+        except Exception as e:
+            self.failed = True
+            print "Autosave write FAILED:", e
+
 # ------------------------------------------------- splash screen
 def show_splash_screen():
     global splash_screen
@@ -151,8 +151,6 @@ GMIC_DIR = "gmic"
 PHANTOM_DIR = "phantom2d"
 PHANTOM_DISK_CACHE_DIR = "disk_cache"
 MATCH_FRAME_DIR = "match_frame"
-MATCH_FRAME = MATCH_FRAME_DIR + "/match_frame.png"
-MATCH_FRAME_NEW = MATCH_FRAME_DIR + "/match_frame_new.png"
 TRIM_VIEW_DIR = "trim_view"
 NATRON_DIR = "natron"
 
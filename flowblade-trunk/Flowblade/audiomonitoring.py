@@ -577,6 +577,7 @@ class GainControl(Gtk.Frame):
             self.seq.set_master_gain(gain)
         else:
             self.seq.set_track_gain(self.producer, gain)
+        self.seq.edit_generation += 1
         
     def pan_active_toggled(self, widget):
         self.pan_slider.set_value(0.0)
@@ -590,6 +591,7 @@ class GainControl(Gtk.Frame):
             self.seq.remove_track_pan_filter(self.producer)
             if self.is_master:
                 self.seq.master_audio_pan = appconsts.NO_PAN
+        self.seq.edit_generation += 1
 
     def pan_changed(self, slider):
         pan_value = (slider.get_value() + 100) / 200.0
@@ -597,6 +599,7 @@ class GainControl(Gtk.Frame):
             self.seq.set_master_pan_value(pan_value)
         else:
             self.seq.set_track_pan_value(self.producer, pan_value)
+        self.seq.edit_generation += 1
 
 
 
@@ -40,7 +40,7 @@ from gi.repository import GLib
 from gi.repository import Gtk, Gdk, GdkPixbuf
 
 import appconsts
-import clapperless
+import clipindex
 import dialogs
 import dialogutils
 import edit
@@ -49,6 +49,7 @@ import editorstate
 from editorstate import PROJECT
 from editorstate import current_sequence
 import gui
+import lazyimport
 import movemodes
 import projectaction
 import renderconsumer
@@ -57,6 +58,9 @@ import tlinewidgets
 import updater
 import utils
 
+# Imported on first use, see lazyimport.py
+clapperless = lazyimport.lazy_import("clapperless")
+
 _tline_sync_data = None # Compound clip and tline clip sync functions can't pass the same data througn clapperless so 
                          # we use this global to save data as needed for tline sync function.
                          # The data flow is a bit haed to follow here, this needs tobe refactored.
@@ -144,8 +148,8 @@ def select_sync_clip_mouse_pressed(event, frame):
     _tline_sync_data.sync_clip_index = sync_clip_index
 
     # TImeline media offset for clips
-    sync_clip_start_in_tline = sync_track.clip_start(sync_clip_index)
-    _tline_sync_data.origin_clip_start_in_tline = _tline_sync_data.origin_track.clip_start(_tline_sync_data.origin_clip_index)
+    sync_clip_start_in_tline = clipindex.clip_start(sync_track, sync_clip_index)
+    _tline_sync_data.origin_clip_start_in_tline = clipindex.clip_start(_tline_sync_data.origin_track, _tline_sync_data.origin_clip_index)
     
     _tline_sync_data.clip_tline_media_offset = (sync_clip_start_in_tline - sync_clip.clip_in) - (_tline_sync_data.origin_clip_start_in_tline - _tline_sync_data.origin_clip.clip_in)
     
@@ -34,6 +34,7 @@ import time
 from gi.repository import Gtk, Gdk
 
 import appconsts
+import audiowaveformrenderer
 import dialogutils
 from editorstate import PROJECT
 import gui
@@ -41,10 +42,6 @@ import guiutils
 import updater
 import utils
 
-# Frame level value cache for audio levels
-# path -> list of frame levels
-frames_cache = {}
-
 waveform_thread = None
 
 LEFT_CHANNEL = "_audio_level.0"
@@ -54,18 +51,10 @@ RIGHT_CHANNEL = "_audio_level.1"
 def set_waveform_displayer_clip_from_popup(data):
     clip, track, item_id, item_data = data
 
-    global frames_cache
-    if clip.path in frames_cache:
-        frame_levels = frames_cache[clip.path]
-        clip.waveform_data = frame_levels
-        return
-
-    cache_file_path = utils.get_hidden_user_dir_path() + appconsts.AUDIO_LEVELS_DIR + _get_unique_name_for_media(clip.path)
-    if os.path.isfile(cache_file_path):
-        f = open(cache_file_path)
-        frame_levels = pickle.load(f)
-        frames_cache[clip.path] = frame_levels
-        clip.waveform_data = frame_levels
+    # clip.waveform_data only flags that levels are displayed for clip, levels data is in
+    # audiowaveformrenderer memory cache.
+    if audiowaveformrenderer.get_levels_data(clip.path) != None:
+        clip.waveform_data = True
         return
 
     progress_bar = Gtk.ProgressBar()
@@ -95,8 +84,8 @@ def clear_waveform(data):
     clip.waveform_data_frame_height = -1
     updater.repaint_tline()
 
-def _get_unique_name_for_media(media_file_path):
-    return utils.get_unique_name_for_audio_levels_file(media_file_path, PROJECT().profile)
+def _get_levels_file_path(media_file_path):
+    return audiowaveformrenderer._get_levels_file_path(media_file_path, PROJECT().profile)
 
 
 class WaveformCreator(threading.Thread):    
@@ -104,7 +93,7 @@ class WaveformCreator(threading.Thread):
         threading.Thread.__init__(self)
         self.clip = clip
         self.temp_clip = self._get_temp_producer(clip)
-        self.file_cache_path = utils.get_hidden_user_dir_path() + appconsts.AUDIO_LEVELS_DIR + _get_unique_name_for_media(clip.path)
+        self.file_cache_path = _get_levels_file_path(clip.path)
         self.track_height = track_height
         self.abort = False
         self.clip_media_length = self.temp_clip.get_length()
@@ -113,9 +102,7 @@ class WaveformCreator(threading.Thread):
         self.dialog = dialog
         
     def run(self):
-        global frames_cache
-        frame_levels = [None] * self.clip_media_length 
-        frames_cache[self.clip.path] = frame_levels
+        frame_levels = [0.0] * self.clip_media_length 
 
         Gdk.threads_enter()
         self.dialog.progress_bar.set_fraction(0.0)
@@ -147,17 +134,16 @@ class WaveformCreator(threading.Thread):
                 time.sleep(0.1)
 
         if not self.abort:
-            self.clip.waveform_data = frame_levels
-            write_file = file(self.file_cache_path, "wb")
-            pickle.dump(frame_levels, write_file)
-
             Gdk.threads_enter()
             self.dialog.progress_bar.set_fraction(1.0)
             self.dialog.progress_bar.set_text(_("Saving to Hard Drive"))
             Gdk.threads_leave()
-        
-        else:
-            frames_cache.pop(self.clip.path, None)
+
+            audiowaveformrenderer.write_levels_file(self.file_cache_path, frame_levels)
+            Gdk.threads_enter()
+            if audiowaveformrenderer.get_levels_data(self.clip.path, reload=True) != None:
+                self.clip.waveform_data = True
+            Gdk.threads_leave()
 
         updater.repaint_tline()
 
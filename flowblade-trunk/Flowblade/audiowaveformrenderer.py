@@ -22,12 +22,13 @@
 Modules handles creating and caching audio waveform images for clips.
 """
 
+import collections
 import locale
 import math
 import md5
 import mlt
+import multiprocessing
 import os
-import pickle
 import struct
 import subprocess
 import sys
@@ -38,55 +39,131 @@ from gi.repository import Gtk, Gdk
 import appconsts
 import editorpersistance
 import editorstate
+import lazyimport
 import mltenv
 import mltprofiles
 import mlttransitions
 import mltfilters
 import renderconsumer
+import renderworker
 import respaths
 import translations
 import updater
 import utils
 
+# numpy is imported when levels are first rendered or loaded, not at application start
+np = lazyimport.lazy_import("numpy")
+
 LEFT_CHANNEL = "_audio_level.0"
 RIGHT_CHANNEL = "_audio_level.1"
 
 FILE_SEPARATOR = "#&#file:"
+LEVELS_DONE_MSG = "#&#levels_done:" # Render process writes this + file path to stdout for every completed file
+
+# Streamed levels extraction 
+STREAM_SAMPLE_RATE = 48000
+STREAM_BLOCK_FRAMES = 500 # Number of frames reduced to levels with one numpy operation
+STREAM_USE_RMS = False # Levels are peak values if False, RMS values if True
+
+# Same dB -> display level mapping that MLT audiolevel filter uses
+IEC_SCALE_DB = [-70.0, -60.0, -50.0, -40.0, -30.0, -20.0, 0.0]
+IEC_SCALE_LEVEL = [0.0, 0.025, 0.075, 0.15, 0.3, 0.5, 1.0]
 
-_waveforms = {} # Memory cache for waveform data
+# Levels files
+LEVELS_FILE_EXTENSION = ".levels"
+LEVELS_FILE_MAGIC = "FBLV"
+LEVELS_FILE_VERSION = 1
+LEVELS_FILE_HEADER = struct.Struct("<4sHHI") # magic, version, pyramid levels count, frame count
+LEVELS_PYRAMID_MIN_LENGTH = 64 # Pyramid levels are added until level has less values then this
+LEVELS_FILE_MMAP_MIN_SIZE = 1024 * 1024 # Smaller levels files are read into memory, memory map keeps file descriptor open
+
+WAVEFORMS_CACHE_MAX_ENTRIES = 256 # Memory mapped levels data keeps a file descriptor open, so entries are capped too
+
+_waveforms = collections.OrderedDict() # LRU memory cache for waveform data, least recently used first
+_waveforms_size = 0 # Bytes of levels data in memory cache
 _queued_waveform_renders = [] # Media queued for render during one timeline repaint
 _render_already_requested = [] # Files that have been sent to rendering since last project load
 
+_cache_hits = 0
+_cache_misses = 0
+_cache_evictions = 0
+
 
 # ------------------------------------------------- waveform cache
 def clear_cache():
-    global _waveforms, _queued_waveform_renders, _render_already_requested
+    global _waveforms, _waveforms_size, _queued_waveform_renders, _render_already_requested
 
-    _waveforms = {}
+    _waveforms = collections.OrderedDict()
+    _waveforms_size = 0
     _queued_waveform_renders = []
     _render_already_requested = []
 
 def get_waveform_data(clip):
+    """
+    Returns levels data for clip media, or None and queues levels render if levels file does not exist.
+    """
+    waveform = get_levels_data(clip.path)
+    if waveform == None:
+        global _queued_waveform_renders
+        _queued_waveform_renders.append(clip.path)
+    return waveform
+
+def get_levels_data(media_path, reload=False):
+    """
+    Returns levels data for media from memory cache or levels file, or None if levels file does not exist.
+    Levels data is not kept elsewhere, so that evicting it from cache frees it.
+    """
     # Return from memory if present
-    global _waveforms
+    global _waveforms, _waveforms_size, _cache_hits, _cache_misses
     try:
-        waveform = _waveforms[clip.path]
-        return waveform
-    except:
+        waveform = _waveforms.pop(media_path)
+        if reload == True:
+            _waveforms_size -= waveform.get_size()
+        else:
+            _waveforms[media_path] = waveform # move to most recently used end
+            _cache_hits += 1
+            return waveform
+    except KeyError:
         pass
-        
-    # Load from disk if found, otherwise queue for levels render
-    levels_file_path = _get_levels_file_path(clip.path, editorstate.PROJECT().profile)
-    if os.path.isfile(levels_file_path):
-        f = open(levels_file_path)
-        waveform = pickle.load(f)
-        _waveforms[clip.path] = waveform
-        return waveform
-    else:
-        global _queued_waveform_renders
-        _queued_waveform_renders.append(clip.path)
-        return None
-    
+
+    _cache_misses += 1
+
+    # Load from disk if found
+    levels_file_path = _get_levels_file_path(media_path, editorstate.PROJECT().profile)
+    waveform = load_levels_file(levels_file_path)
+    if waveform != None:
+        _add_to_cache(media_path, waveform)
+    return waveform
+
+def get_cache_stats():
+    """
+    Returns dict with memory cache counters for diagnostics.
+    """
+    return {"hits": _cache_hits, 
+            "misses": _cache_misses,
+            "evictions": _cache_evictions,
+            "entries": len(_waveforms),
+            "max_entries": WAVEFORMS_CACHE_MAX_ENTRIES,
+            "size": _waveforms_size,
+            "max_size": _get_cache_max_size()}
+
+def _add_to_cache(media_path, waveform):
+    global _waveforms_size, _cache_evictions
+    _waveforms[media_path] = waveform
+    _waveforms_size += waveform.get_size()
+
+    # Evict least recently used levels data until cache is within memory budget and entries count.
+    # Evicted data is loaded again from levels file when needed.
+    max_size = _get_cache_max_size()
+    while ((_waveforms_size > max_size or len(_waveforms) > WAVEFORMS_CACHE_MAX_ENTRIES)
+           and len(_waveforms) > 1):
+        evicted_path, evicted = _waveforms.popitem(last=False)
+        _waveforms_size -= evicted.get_size()
+        _cache_evictions += 1
+
+def _get_cache_max_size():
+    return editorpersistance.prefs.audio_levels_cache_mb * 1024 * 1024
+
 # ------------------------------------------------- launching render
 def launch_queued_renders():
     # Render files that were not found when timeline was displayed
@@ -104,7 +181,7 @@ def launch_audio_levels_rendering(file_names):
 
     for media_file in file_names:
         levels_file_path = _get_levels_file_path(media_file, editorstate.PROJECT().profile)
-        if os.path.isfile(levels_file_path):
+        if is_current_levels_file(levels_file_path):
             continue
         else:
             global _render_already_requested
@@ -124,8 +201,129 @@ def launch_audio_levels_rendering(file_names):
     single_render_launch_thread.start()
 
 def _get_levels_file_path(media_file_path, profile):
-    return utils.get_hidden_user_dir_path() + appconsts.AUDIO_LEVELS_DIR + utils.get_unique_name_for_audio_levels_file(media_file_path, profile)
- 
+    return utils.get_hidden_user_dir_path() + appconsts.AUDIO_LEVELS_DIR + utils.get_unique_name_for_audio_levels_file(media_file_path, profile) + LEVELS_FILE_EXTENSION
+
+
+# ------------------------------------------------- levels files
+def write_levels_file(levels_file_path, frame_levels):
+    """
+    Writes levels as uint8 values followed by min/max pyramid levels 
+    that each have half the values of the previous level.
+    """
+    levels = np.asarray(frame_levels, dtype=np.float64)
+    levels = np.clip(np.rint(levels * 255.0), 0, 255).astype(np.uint8)
+
+    pyramid = []
+    mins = levels
+    maxs = levels
+    while len(maxs) >= LEVELS_PYRAMID_MIN_LENGTH:
+        mins = _reduce_pairs(mins, np.minimum)
+        maxs = _reduce_pairs(maxs, np.maximum)
+        pyramid.append((mins, maxs))
+
+    # Write to temp file and rename so that editor never loads partially written levels file
+    temp_path = levels_file_path + ".part"
+    write_file = open(temp_path, "wb")
+    write_file.write(LEVELS_FILE_HEADER.pack(LEVELS_FILE_MAGIC, LEVELS_FILE_VERSION, len(pyramid), len(levels)))
+    write_file.write(levels.tostring())
+    for mins, maxs in pyramid:
+        write_file.write(mins.tostring())
+        write_file.write(maxs.tostring())
+    write_file.close()
+    os.rename(temp_path, levels_file_path)
+
+def load_levels_file(levels_file_path):
+    """
+    Returns LevelsData from file or None if file does not exist or is not current version.
+
+    Levels files are about 2 bytes per frame and most are read into memory. Only files
+    of very long media are memory mapped, each np.memmap keeps a duplicated file descriptor
+    open for as long as its LevelsData lives.
+    """
+    if not is_current_levels_file(levels_file_path):
+        return None
+    try:
+        if os.path.getsize(levels_file_path) < LEVELS_FILE_MMAP_MIN_SIZE:
+            return LevelsData(np.fromfile(levels_file_path, dtype=np.uint8))
+        return LevelsData(np.memmap(levels_file_path, dtype=np.uint8, mode="r"))
+    except (IOError, OSError, ValueError):
+        return None
+
+def is_current_levels_file(levels_file_path):
+    try:
+        f = open(levels_file_path, "rb")
+        header = f.read(LEVELS_FILE_HEADER.size)
+        f.close()
+    except IOError:
+        return False
+    if len(header) < LEVELS_FILE_HEADER.size:
+        return False
+    magic, version, pyramid_count, frame_count = LEVELS_FILE_HEADER.unpack(header)
+    return (magic == LEVELS_FILE_MAGIC and version == LEVELS_FILE_VERSION)
+
+def _reduce_pairs(values, reduce_func):
+    if len(values) % 2 == 1:
+        values = np.append(values, values[-1])
+    return reduce_func(values[0::2], values[1::2])
+
+
+class LevelsData:
+    """
+    Audio levels of a media file as read-only views into levels file data.
+    
+    Indexing gives level for frame in range 0.0 - 1.0, like the list of floats used for levels before.
+    For memory mapped files pages are only read when they are accessed, so drawing zoomed out
+    only touches the coarse pyramid levels.
+    """
+    def __init__(self, data):
+        magic, version, pyramid_count, frame_count = LEVELS_FILE_HEADER.unpack(data[0:LEVELS_FILE_HEADER.size].tostring())
+        self.size = len(data)
+
+        offset = LEVELS_FILE_HEADER.size
+        self.frame_levels = data[offset:offset + frame_count]
+        offset += frame_count
+
+        # pyramid[k] is (mins, maxs) with every value covering 2^(k + 1) frames
+        self.pyramid = []
+        level_length = frame_count
+        for i in range(0, pyramid_count):
+            level_length = (level_length + 1) // 2
+            mins = data[offset:offset + level_length]
+            maxs = data[offset + level_length:offset + 2 * level_length]
+            self.pyramid.append((mins, maxs))
+            offset += 2 * level_length
+
+    def __len__(self):
+        return len(self.frame_levels)
+
+    def __getitem__(self, frame):
+        return self.frame_levels[frame] / 255.0
+
+    def get_size(self):
+        return self.size
+
+    def get_draw_levels(self, first, last, step):
+        """
+        Returns list of levels for frames range(first, last, step).
+        
+        Values are read from the coarsest pyramid level that has at least one value per step
+        and are max values of the frames covered by the pyramid value.
+        """
+        pyramid_index = -1
+        factor = 1
+        while factor * 2 <= step and pyramid_index + 1 < len(self.pyramid):
+            pyramid_index += 1
+            factor *= 2
+
+        if pyramid_index == -1:
+            levels = self.frame_levels
+        else:
+            mins, levels = self.pyramid[pyramid_index]
+
+        indexes = np.arange(first, last, step) // factor
+        indexes = indexes[indexes < len(levels)]
+        return (levels[indexes] / 255.0).tolist()
+
 
 class AudioRenderLaunchThread(threading.Thread):
     def __init__(self, rendered_media, profile_desc):
@@ -134,37 +332,56 @@ class AudioRenderLaunchThread(threading.Thread):
         self.profile_desc = profile_desc
 
     def run(self):
-        # Launch render process and wait for it to end
+        rendered_media = self._render_in_worker()
+        if rendered_media == "":
+            return
+
+        # Launch render process and repaint timeline every time it reports a completed file
         FLOG = open(utils.get_hidden_user_dir_path() + "log_audio_levels_render", 'w')
         process = subprocess.Popen([sys.executable, respaths.LAUNCH_DIR + "flowbladeaudiorender", \
-                  self.rendered_media, self.profile_desc, respaths.ROOT_PATH], \
-                  stdin=FLOG, stdout=FLOG, stderr=FLOG)
+                  rendered_media, self.profile_desc, respaths.ROOT_PATH], \
+                  stdin=FLOG, stdout=subprocess.PIPE, stderr=FLOG)
+
+        for line in iter(process.stdout.readline, ""):
+            if not line.startswith(LEVELS_DONE_MSG):
+                FLOG.write(line)
+                continue
+
+            Gdk.threads_enter()
+            updater.repaint_tline()
+            Gdk.threads_leave()
+
         process.wait()
-        
+        FLOG.close()
+
         Gdk.threads_enter()
         updater.repaint_tline()
         Gdk.threads_leave()
 
-def set_waveform_displayer_clip_from_popup(data):
-    clip, track, item_id, item_data = data
+    def _render_in_worker(self):
+        # Returns media that still needs to be rendered in own process, all of it if worker
+        # is not available and files that worker failed to render if job fails.
+        files = self.rendered_media.lstrip(FILE_SEPARATOR).split(FILE_SEPARATOR)
+        job = renderworker.submit(renderworker.LEVELS_JOB, {"files":files, "profile_desc":self.profile_desc})
+        if job == None:
+            return self.rendered_media
+
+        done_files = set()
+        for msg in job.messages():
+            done_files.add(msg["path"].encode("utf-8"))
+            Gdk.threads_enter()
+            updater.repaint_tline()
+            Gdk.threads_leave()
 
-    global frames_cache
-    if clip.path in frames_cache:
-        frame_levels = frames_cache[clip.path]
-        clip.waveform_data = frame_levels
-        return
+        Gdk.threads_enter()
+        updater.repaint_tline()
+        Gdk.threads_leave()
 
-    cache_file_path = utils.get_hidden_user_dir_path() + appconsts.AUDIO_LEVELS_DIR + _get_unique_name_for_media(clip.path)
-    if os.path.isfile(cache_file_path):
-        f = open(cache_file_path)
-        frame_levels = pickle.load(f)
-        frames_cache[clip.path] = frame_levels
-        clip.waveform_data = frame_levels
-        return
-    
-    global waveform_thread
-    waveform_thread = WaveformCreator(clip, track.height, dialog)
-    waveform_thread.start()
+        rendered_media = ""
+        for media_file in files:
+            if not (media_file in done_files):
+                rendered_media = rendered_media + FILE_SEPARATOR + media_file
+        return rendered_media
 
 
 # --------------------------------------------------------- rendering
@@ -210,10 +427,33 @@ def main():
     
     files = files_paths.split(FILE_SEPARATOR)
 
-    for f in files:
-       t = WaveformCreator(f, profile_desc)
-       t.start()
-       t.join()
+    # Render files in parallel in worker processes and report each file to editor 
+    # as soon as it is done, so timeline can display waveforms without waiting for all files.
+    workers = min(multiprocessing.cpu_count(), len(files))
+    pool = multiprocessing.Pool(workers)
+    try:
+        for clip_path in pool.imap_unordered(_render_levels_file, [(f, profile_desc) for f in files]):
+            if clip_path != None:
+                print LEVELS_DONE_MSG + clip_path
+                sys.stdout.flush()
+    except:
+        # Workers are not left running if rendering fails, e.g. editor closed stdout pipe.
+        pool.terminate()
+        raise
+    pool.close()
+    pool.join()
+
+def _render_levels_file(job):
+    # Runs in worker process.
+    clip_path, profile_desc = job
+    try:
+        t = WaveformCreator(clip_path, profile_desc)
+        t.run()
+        return clip_path
+    except Exception as e:
+        print "audio levels render failed for " + clip_path + ": " + str(e)
+        sys.stdout.flush()
+        return None
 
 
 class WaveformCreator(threading.Thread):    
@@ -221,11 +461,81 @@ class WaveformCreator(threading.Thread):
         threading.Thread.__init__(self)
         self.clip_path = clip_path
         profile = mltprofiles.get_profile(profile_desc)
+        self.fps = float(profile.frame_rate_num()) / float(profile.frame_rate_den())
         self.temp_clip = self._get_temp_producer(clip_path, profile)
         self.file_cache_path =_get_levels_file_path(clip_path, profile)
         self.last_rendered_frame = 0
 
     def run(self):
+        frame_levels = self._get_streamed_levels()
+        if frame_levels == None:
+            frame_levels = self._get_seeked_levels()
+
+        write_levels_file(self.file_cache_path, frame_levels)
+
+    def _get_streamed_levels(self):
+        """
+        Decodes audio once from start to end with ffmpeg and reduces samples to 
+        per frame levels in numpy blocks. Levels are for right channel like levels
+        from MLT audiolevel filter in _get_seeked_levels().
+        
+        Returns None if ffmpeg is not available or could not decode the file.
+        """
+        ffmpeg_call = ["ffmpeg",
+                       "-i", self.clip_path,
+                       "-vn",      # Drop any video streams if there are any
+                       "-ac", "2", # Stereo, levels are read from right channel
+                       "-ar", str(STREAM_SAMPLE_RATE),
+                       "-f", "s16le",
+                       "-loglevel", "error",
+                       "-"]
+        devnull = open(os.devnull, "w")
+        try:
+            sp = subprocess.Popen(ffmpeg_call, bufsize=-1, stdout=subprocess.PIPE, stderr=devnull)
+        except OSError:
+            devnull.close()
+            return None
+
+        # First sample of each frame, frames do not contain a whole number of samples for all frame rates
+        length = self.clip_media_length
+        frame_starts = np.floor(np.arange(length + 1) * (STREAM_SAMPLE_RATE / self.fps)).astype(np.int64)
+        levels = np.zeros(length, dtype=np.float64)
+
+        first = 0
+        samples_read = 0
+        while first < length:
+            last = min(first + STREAM_BLOCK_FRAMES, length)
+            block_size = int(frame_starts[last] - frame_starts[first])
+            data = sp.stdout.read(block_size * 4)
+            samples = np.frombuffer(data[:len(data) - len(data) % 4], dtype=np.int16)[1::2].astype(np.float64)
+            if len(samples) == 0:
+                break
+            samples_read += len(samples)
+
+            starts = frame_starts[first:last] - frame_starts[first]
+            starts = starts[starts < len(samples)]
+            if STREAM_USE_RMS:
+                counts = np.diff(np.append(starts, len(samples)))
+                block_levels = np.sqrt(np.add.reduceat(samples * samples, starts) / counts)
+            else:
+                block_levels = np.maximum.reduceat(np.abs(samples), starts)
+            levels[first:first + len(block_levels)] = block_levels
+
+            if len(samples) < block_size:
+                break
+            first = last
+
+        sp.stdout.close()
+        sp.wait()
+        devnull.close()
+        if samples_read == 0:
+            return None
+
+        db = 20.0 * np.log10(np.maximum(levels, 1.0) / 32768.0)
+        self.last_rendered_frame = length - 1
+        return np.interp(db, IEC_SCALE_DB, IEC_SCALE_LEVEL)
+
+    def _get_seeked_levels(self):
         frame_levels = [None] * self.clip_media_length 
 
         for frame in range(0, len(frame_levels)):
@@ -237,8 +547,7 @@ class WaveformCreator(threading.Thread):
             frame_levels[frame] = float(val)
             self.last_rendered_frame = frame
 
-        write_file = file(self.file_cache_path, "wb")
-        pickle.dump(frame_levels, write_file)
+        return frame_levels
 
     def _get_temp_producer(self, clip_path, profile):
         temp_producer = mlt.Producer(profile, str(clip_path))
@@ -22,6 +22,7 @@
 Handles Overwrite Box tool functionality.
 """
 
+import clipindex
 import edit
 import editorstate
 from editorstate import current_sequence
@@ -283,8 +284,8 @@ class BoxTrackSelection:
             self.clip_is_media.append(clip.is_blanck_clip == False)
 
         # Get bounding frames
-        self.range_frame_in  = track.clip_start(self.selected_range_in)
-        self.range_frame_out =  track.clip_start(self.selected_range_out) + self.clip_lengths[-1]
+        self.range_frame_in  = clipindex.clip_start(track, self.selected_range_in)
+        self.range_frame_out =  clipindex.clip_start(track, self.selected_range_out) + self.clip_lengths[-1]
 
     def is_empty(self):
         if len(self.clip_lengths) == 0:
@@ -30,6 +30,7 @@ import time
 import dnd
 import edit
 import editorstate
+from editorstate import current_sequence
 from editorstate import PROJECT
 import gui
 import guicomponents
@@ -355,6 +356,7 @@ def toggle_all_pressed():
         filter_object = clip.filters[i]
         filter_object.active = (filter_object.active == False)
         filter_object.update_mlt_disabled_value()
+    current_sequence().edit_generation += 1
     
     update_stack_view()
 
@@ -365,12 +367,14 @@ def reset_filter_values():
     row_index = max(row)
     
     clip.filters[row_index].reset_values(PROJECT().profile, clip)
+    current_sequence().edit_generation += 1
     effect_selection_changed()
 
 def toggle_filter_active(row, update_stack_view=True):
     filter_object = clip.filters[row]
     filter_object.active = (filter_object.active == False)
     filter_object.update_mlt_disabled_value()
+    current_sequence().edit_generation += 1
     if update_stack_view == True:
         update_stack_view_changed_blocked()
 
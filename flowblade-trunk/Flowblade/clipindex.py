@@ -0,0 +1,102 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module keeps python side index of clip start frames for tracks.
+
+MLT Playlist methods get_clip_index_at() and clip_start() loop through all clips
+in C on every call and are called through SWIG. Edit, move, trim, sync, cut, snap and
+draw code do these queries for every track on every event, so we keep a list of clip start
+frames for each track and answer the queries with bisect. Editor code should use functions
+of this module instead of calling the MLT methods directly.
+
+edit.py primitives call clips_changed() when they change any track, and index for
+a track is rebuilt from track.clips on next query after that.
+"""
+
+import bisect
+
+# Set True to compare every query result against MLT and print differences.
+CHECK_AGAINST_MLT = False
+
+_edit_generation = 0
+
+
+def clips_changed():
+    global _edit_generation
+    _edit_generation += 1
+
+def get_clip_index_at(track, frame):
+    """
+    Same as mlt.Playlist.get_clip_index_at(), returns len(track.clips) if frame is after last clip.
+    """
+    starts = _get_clip_starts(track)
+    index = bisect.bisect_right(starts, frame) - 1
+    if index < 0:
+        index = 0
+    if index > len(starts) - 1:
+        index = len(starts) - 1
+
+    if CHECK_AGAINST_MLT:
+        _check("get_clip_index_at", track, frame, index, track.get_clip_index_at(frame))
+
+    return index
+
+def clip_start(track, index):
+    """
+    Same as mlt.Playlist.clip_start(), index is clamped to range 0 - len(track.clips).
+    """
+    starts = _get_clip_starts(track)
+    if index < 0:
+        start = starts[0]
+    elif index > len(starts) - 1:
+        start = starts[-1]
+    else:
+        start = starts[index]
+
+    if CHECK_AGAINST_MLT:
+        _check("clip_start", track, index, start, track.clip_start(index))
+
+    return start
+
+def _get_clip_starts(track):
+    """
+    Returns list with start frame of every clip in track and track length as last item.
+    """
+    try:
+        starts, generation, clips = track.clip_starts_index
+        # track.clips is replaced with a new list in some places without using edit.py primitives.
+        if generation == _edit_generation and clips is track.clips and len(starts) == len(clips) + 1:
+            return starts
+    except AttributeError:
+        pass
+
+    starts = [0]
+    total = 0
+    for clip in track.clips:
+        total += clip.clip_out - clip.clip_in + 1 # +1 out inclusive
+        starts.append(total)
+
+    track.clip_starts_index = (starts, _edit_generation, track.clips)
+    return starts
+
+def _check(query, track, arg, index_value, mlt_value):
+    if index_value != mlt_value:
+        print "clipindex." + query + "() differs from MLT, track:", track.id, "arg:", arg, "index:", index_value, "mlt:", mlt_value
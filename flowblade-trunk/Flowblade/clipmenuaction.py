@@ -29,12 +29,12 @@ from gi.repository import Gtk
 
 import mlt
 import os
-import shutil
 import time
 
 import audiowaveform
 import audiosync
 import appconsts
+import clipindex
 import clipeffectseditor
 import compositeeditor
 import dialogs
@@ -53,7 +53,6 @@ import tlineaction
 import updater
 import utils
 
-_match_frame_writer = None
 
 # ---------------------------------- clip menu
 def display_clip_menu(y, event, frame):
@@ -159,6 +158,7 @@ def _rename_clip_edited(dialog, response_id, data):
         return
 
     clip.name = new_text
+    current_sequence().edit_generation += 1
     updater.repaint_tline()
 
 def _clip_color(data):
@@ -178,6 +178,7 @@ def _clip_color(data):
     elif clip_color == "olive":
         clip.color = (0.5, 0.55, 0.5)
 
+    current_sequence().edit_generation += 1
     updater.repaint_tline()
 
 def open_selection_in_effects():
@@ -196,7 +197,7 @@ def _add_filter(data):
     
     # (re)open clip in editor
     frame = tlinewidgets.get_frame(x)
-    index = track.get_clip_index_at(frame)
+    index = clipindex.get_clip_index_at(track, frame)
     clipeffectseditor.set_clip(clip, track, index)
 
 def _add_compositor(data):
@@ -204,11 +205,11 @@ def _add_compositor(data):
     x, compositor_type = item_data
 
     frame = tlinewidgets.get_frame(x)
-    clip_index = track.get_clip_index_at(frame)
+    clip_index = clipindex.get_clip_index_at(track, frame)
 
     target_track_index = track.id - 1
 
-    compositor_in = current_sequence().tracks[track.id].clip_start(clip_index)
+    compositor_in = clipindex.clip_start(current_sequence().tracks[track.id], clip_index)
     clip_length = clip.clip_out - clip.clip_in
     compositor_out = compositor_in + clip_length
 
@@ -229,16 +230,16 @@ def _add_autofade(data):
     x, compositor_type = item_data
 
     frame = tlinewidgets.get_frame(x)
-    clip_index = track.get_clip_index_at(frame)
+    clip_index = clipindex.get_clip_index_at(track, frame)
 
     target_track_index = track.id - 1
 
     clip_length = clip.clip_out - clip.clip_in
     if compositor_type == "##auto_fade_in":
-        compositor_in = current_sequence().tracks[track.id].clip_start(clip_index)
+        compositor_in = clipindex.clip_start(current_sequence().tracks[track.id], clip_index)
         compositor_out = compositor_in + int(utils.fps()) - 1
     else:
-        clip_start = current_sequence().tracks[track.id].clip_start(clip_index)
+        clip_start = clipindex.clip_start(current_sequence().tracks[track.id], clip_index)
         compositor_out = clip_start + clip_length
         compositor_in = compositor_out - int(utils.fps()) + 1
 
@@ -466,72 +467,20 @@ def _match_frame_end_monitor(data):
     gui.monitor_widget.set_frame_match_view(clip, clip.clip_out)
      
 def _set_match_frame(clip, frame, track, display_on_right):
-    global _match_frame_writer
-    _match_frame_writer = MatchFrameWriter(clip, frame, track, display_on_right)
-    
-    GLib.idle_add(_write_match_frame)
+    # Get frame of clip.clip_in_in on timeline.
+    clip_index = track.clips.index(clip)
+    clip_start_in_tline = clipindex.clip_start(track, clip_index)
+    tline_match_frame = clip_start_in_tline + (frame - clip.clip_in)
+    tlinewidgets.set_match_frame(tline_match_frame, track.id, display_on_right, clip.path, frame)
 
-def _write_match_frame():
-    _match_frame_writer.write_image()
+    # Match frame image is created when timeline is drawn
+    updater.repaint_tline()
 
 def _match_frame_close(data):
     tlinewidgets.set_match_frame(-1, -1, True)
     gui.monitor_widget.set_default_view_force()
     updater.repaint_tline()
         
-class MatchFrameWriter:
-    def __init__(self, clip, clip_frame, track, display_on_right):
-        self.clip = clip
-        self.clip_frame = clip_frame
-        self.track = track
-        self.display_on_right = display_on_right
-        
-    def write_image(self):
-        """
-        Writes thumbnail image from file producer
-        """
-        clip_path = self.clip.path
-
-        # Create consumer
-        matchframe_new_path = utils.get_hidden_user_dir_path() + appconsts.MATCH_FRAME_NEW
-        consumer = mlt.Consumer(PROJECT().profile, "avformat", matchframe_new_path)
-        consumer.set("real_time", 0)
-        consumer.set("vcodec", "png")
-
-        # Create one frame producer
-        producer = mlt.Producer(PROJECT().profile, str(clip_path))
-        producer = producer.cut(int(self.clip_frame), int(self.clip_frame))
-
-        # Delete new match frame
-        try:
-            os.remove(matchframe_new_path)
-        except:
-            # This fails when done first time ever  
-            pass
-
-        # Connect and write image
-        consumer.connect(producer)
-        consumer.run()
-        
-        # Wait until new file exists
-        while os.path.isfile(matchframe_new_path) != True:
-            time.sleep(0.1)
-
-        # Copy to match frame
-        matchframe_path = utils.get_hidden_user_dir_path() + appconsts.MATCH_FRAME
-        shutil.copyfile(matchframe_new_path, matchframe_path)
-
-        # Update timeline data           
-        # Get frame of clip.clip_in_in on timeline.
-        clip_index = self.track.clips.index(self.clip)
-        clip_start_in_tline = self.track.clip_start(clip_index)
-        tline_match_frame = clip_start_in_tline + (self.clip_frame - self.clip.clip_in)
-        tlinewidgets.set_match_frame(tline_match_frame, self.track.id, self.display_on_right)
-
-        # Update view
-        updater.repaint_tline()
-
-    
 # Functions to handle popup menu selections for strings 
 # set as activation messages in guicomponents.py
 # activation_message -> _handler_func
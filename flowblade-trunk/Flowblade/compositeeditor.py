@@ -33,12 +33,15 @@ import guiutils
 import edit
 from editorstate import current_sequence
 import editorpersistance
-import keyframeeditor
+import lazyimport
 import propertyeditorbuilder
 import propertyedit
 import propertyparse
 import utils
 
+# Imported on first use, see lazyimport.py
+keyframeeditor = lazyimport.lazy_import("keyframeeditor")
+
 COMPOSITOR_PANEL_LEFT_WIDTH = 160
 
 widgets = utils.EmptyClass()
@@ -0,0 +1,92 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module caches objects parsed from descriptor XML files.
+
+Filters, compositors and render encodings are described in XML files in res/ that
+are parsed with minidom into info objects in editor and every helper process on launch.
+Parsed objects are pickled in hidden user dir and loaded instead of parsing while
+source files and MLT version stay the same.
+
+Cached objects must not depend on the environment, filtering by available
+services and codecs is done by callers after load.
+"""
+
+import cPickle
+import os
+
+import editorstate
+import utils
+
+DESCRIPTOR_CACHE_DIR = "descriptor_cache/"
+DESCRIPTOR_CACHE_VERSION = 1
+
+
+def load(name, source_paths, parse_func):
+    """
+    Returns cached parse result for source files, or calls parse_func() and caches its result.
+    """
+    key = _get_key(source_paths)
+    cache_path = get_cache_path(name)
+    try:
+        cache_file = open(cache_path, "rb")
+        cached_key, data = cPickle.load(cache_file)
+        cache_file.close()
+        if cached_key == key:
+            return data
+    except IOError:
+        pass # no cache yet
+    except Exception as e:
+        print "Descriptor cache load failed for " + name + ": " + str(e)
+
+    data = parse_func()
+    _save(cache_path, key, data)
+    return data
+
+def get_cache_path(name):
+    return utils.get_hidden_user_dir_path() + DESCRIPTOR_CACHE_DIR + name
+
+def clear(name):
+    try:
+        os.remove(get_cache_path(name))
+    except OSError:
+        pass
+
+def _get_key(source_paths):
+    files = []
+    for path in source_paths:
+        st = os.stat(path)
+        files.append((path, st.st_size, st.st_mtime))
+    return (DESCRIPTOR_CACHE_VERSION, editorstate.mlt_version, tuple(files))
+
+def _save(cache_path, key, data):
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        if not os.path.exists(cache_dir):
+            os.mkdir(cache_dir)
+        # Helper processes may save at the same time, temp file is unique to process
+        temp_path = cache_path + "." + str(os.getpid())
+        cache_file = open(temp_path, "wb")
+        cPickle.dump((key, data), cache_file, cPickle.HIGHEST_PROTOCOL)
+        cache_file.close()
+        os.rename(temp_path, cache_path)
+    except Exception as e:
+        print "Descriptor cache save failed for " + cache_path + ": " + str(e)
@@ -757,6 +757,9 @@ def recreate_icons_progress_dialog():
 
 def update_media_lengths_progress_dialog():
     return _text_info_prograss_dialog(_("Update media lengths data"))
+
+def add_media_files_progress_dialog():
+    return _text_info_prograss_dialog(_("Adding media files"))
     
 def _text_info_prograss_dialog(title):
     dialog = Gtk.Window(Gtk.WindowType.TOPLEVEL)
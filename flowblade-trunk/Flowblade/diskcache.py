@@ -0,0 +1,303 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module keeps disk cache folders inside size budgets set by user.
+
+Every cache category has a size budget in preferences, 0 means no limit. When a project
+is opened a background thread evicts least recently used entries from categories that
+are over budget. Entries are top level files or folders in category folder.
+
+Last access time of an entry is the latest of its mtime, atime and the time a
+project referencing it was last opened, which is recorded in hidden user dir.
+Entries referenced by the open project and recently written entries are never evicted.
+"""
+
+import cPickle
+import os
+import re
+import shutil
+import threading
+import time
+
+import appconsts
+import audiowaveformrenderer
+import editorpersistance
+import proxystore
+import utils
+
+ACCESS_FILE = "disk_cache_access"
+ACCESS_FILE_VERSION = 1
+
+EVICTION_START_DELAY = 30 # seconds, eviction waits until project load IO is done
+RECENT_WRITE_PROTECT_TIME = 60 * 60 # seconds, e.g. files being rendered are not referenced yet
+
+# Cache categories, names are keys in prefs.disk_cache_budgets_mb
+THUMBNAILS = "thumbnails"
+AUDIO_LEVELS = "audiolevels"
+GMIC = "gmic"
+PROXIES = "proxies"
+RENDERED_CLIPS = "rendered_clips"
+
+CATEGORIES = [THUMBNAILS, AUDIO_LEVELS, GMIC, PROXIES, RENDERED_CLIPS]
+
+# Thumbnails folder is user selectable, only thumbnails named with md5 of media path are cache entries
+THUMBNAIL_FILE_NAME = re.compile("^[0-9a-f]{32}\\.png$")
+
+# Proxies and rendered clips may be used by projects that are not open, so they are not limited by default
+DEFAULT_BUDGETS_MB = {THUMBNAILS: 512, AUDIO_LEVELS: 1024, GMIC: 2048, PROXIES: 0, RENDERED_CLIPS: 0}
+
+_access = None # abs path -> last time project referencing entry was opened
+_lock = threading.Lock()
+_eviction_thread = None
+
+
+class CacheEvictionThread(threading.Thread):
+
+    def __init__(self, referenced_paths):
+        threading.Thread.__init__(self)
+        self.referenced_paths = referenced_paths
+
+    def run(self):
+        time.sleep(EVICTION_START_DELAY)
+
+        evicted_count = 0
+        evicted_size = 0
+        for category in CATEGORIES:
+            count, size = evict_category(category, self.referenced_paths)
+            evicted_count += count
+            evicted_size += size
+        save()
+
+        if evicted_count > 0:
+            print "disk cache eviction removed " + str(evicted_count) + " entries, " + str(evicted_size / 1000000) + " MB"
+
+
+def launch_eviction(project):
+    """
+    Starts eviction of disk cache entries not used by project. Called from GUI thread after project is opened.
+    """
+    global _eviction_thread
+    if _eviction_thread != None and _eviction_thread.is_alive():
+        # Entries of both projects are kept, set is replaced not changed because thread may be iterating it
+        _eviction_thread.referenced_paths = _eviction_thread.referenced_paths | get_project_referenced_paths(project)
+        return
+    _eviction_thread = CacheEvictionThread(get_project_referenced_paths(project))
+    _eviction_thread.start()
+
+def get_budget(category):
+    """
+    Returns size budget for category in bytes, 0 means no limit.
+    """
+    return editorpersistance.prefs.disk_cache_budgets_mb.get(category, DEFAULT_BUDGETS_MB[category]) * 1024 * 1024
+
+def set_budget_mb(category, budget_mb):
+    editorpersistance.prefs.disk_cache_budgets_mb[category] = int(budget_mb)
+    editorpersistance.save()
+
+def get_category_folder(category):
+    if category == THUMBNAILS:
+        return editorpersistance.prefs.thumbnail_folder
+    elif category == AUDIO_LEVELS:
+        return utils.get_hidden_user_dir_path() + appconsts.AUDIO_LEVELS_DIR
+    elif category == GMIC:
+        return utils.get_hidden_user_dir_path() + appconsts.GMIC_DIR
+    elif category == PROXIES:
+        if editorpersistance.prefs.render_folder == None:
+            return None
+        return proxystore.get_store_folder()
+    else: # RENDERED_CLIPS
+        return editorpersistance.prefs.render_folder
+
+def get_category_entries(category):
+    """
+    Returns list of (path, size, last access time) for top level entries of category folder.
+    """
+    folder = get_category_folder(category)
+    if folder == None or not os.path.isdir(folder):
+        return []
+
+    entries = []
+    for name in os.listdir(folder):
+        path = os.path.abspath(os.path.join(folder, name))
+        if category == THUMBNAILS and not is_thumbnail_file_name(name):
+            continue # thumbnails folder may have other files
+        if os.path.isdir(path):
+            if category == RENDERED_CLIPS:
+                continue # proxies folder is in render folder, and is its own category
+            size, last_time = _get_folder_size_and_time(path)
+        else:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            size = st.st_size
+            last_time = max(st.st_mtime, st.st_atime)
+        entries.append((path, size, max(last_time, get_last_access(path))))
+    return entries
+
+def is_thumbnail_file_name(name):
+    """
+    Returns True if name is a thumbnail file name written by projectdata.Thumbnailer.
+    """
+    return THUMBNAIL_FILE_NAME.match(name) != None
+
+def evict_category(category, referenced_paths):
+    """
+    Removes least recently used entries until category is inside its budget.
+    Returns (evicted entries count, evicted size).
+    """
+    budget = get_budget(category)
+    entries = get_category_entries(category)
+
+    # Entries used by open project are recorded as accessed now
+    now = time.time()
+    evictable = []
+    total_size = 0
+    for path, size, last_time in entries:
+        total_size += size
+        if _is_referenced(path, referenced_paths):
+            touch(path, now)
+        elif now - last_time > RECENT_WRITE_PROTECT_TIME:
+            evictable.append((last_time, path, size))
+
+    if budget == 0 or total_size <= budget:
+        return (0, 0)
+
+    evictable.sort() # least recently used first
+    evicted_count = 0
+    evicted_size = 0
+    for last_time, path, size in evictable:
+        if total_size <= budget:
+            break
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except OSError as e:
+            print "disk cache eviction failed for " + path + ": " + str(e)
+            continue
+        total_size -= size
+        evicted_count += 1
+        evicted_size += size
+        with _lock:
+            _access.pop(path, None)
+
+    return (evicted_count, evicted_size)
+
+def get_project_referenced_paths(project):
+    """
+    Returns set of absolute paths of files used by project.
+    """
+    paths = set()
+    for media_file in project.media_files.itervalues():
+        for path in (getattr(media_file, "path", None), getattr(media_file, "second_file_path", None), getattr(media_file, "icon_path", None)):
+            if path != None:
+                paths.add(os.path.abspath(path))
+    for seq in project.sequences:
+        for track in seq.tracks:
+            for clip in track.clips:
+                path = getattr(clip, "path", None)
+                if clip.is_blanck_clip == False and path:
+                    paths.add(os.path.abspath(path))
+
+    # Audio levels files are named by media file path
+    for path in list(paths):
+        try:
+            paths.add(os.path.abspath(audiowaveformrenderer._get_levels_file_path(path, project.profile)))
+        except OSError:
+            pass # file missing or not a file
+
+    return paths
+
+def touch(path, access_time=None):
+    """
+    Records entry as accessed.
+    """
+    if access_time == None:
+        access_time = time.time()
+    with _lock:
+        _load()
+        _access[os.path.abspath(path)] = access_time
+
+def get_last_access(path):
+    with _lock:
+        _load()
+        return _access.get(path, 0)
+
+def save():
+    with _lock:
+        if _access == None:
+            return
+        # Drop entries for removed files
+        for path in _access.keys():
+            if not os.path.exists(path):
+                del _access[path]
+        access_path = utils.get_hidden_user_dir_path() + ACCESS_FILE
+        try:
+            write_file = open(access_path + ".tmp", "wb")
+            cPickle.dump((ACCESS_FILE_VERSION, _access), write_file, cPickle.HIGHEST_PROTOCOL)
+            write_file.close()
+            os.rename(access_path + ".tmp", access_path)
+        except Exception as e:
+            print "Disk cache access data save failed:", e
+
+def _load():
+    # Called with _lock held
+    global _access
+    if _access != None:
+        return
+    _access = {}
+    access_path = utils.get_hidden_user_dir_path() + ACCESS_FILE
+    if not os.path.exists(access_path):
+        return
+    try:
+        read_file = open(access_path, "rb")
+        version, access = cPickle.load(read_file)
+        read_file.close()
+        if version == ACCESS_FILE_VERSION:
+            _access = access
+    except Exception as e:
+        print "Disk cache access data load failed:", e
+
+def _is_referenced(path, referenced_paths):
+    if path in referenced_paths:
+        return True
+    if os.path.isdir(path):
+        # Image sequence proxies and G'MIC sessions are folders
+        folder_prefix = path + "/"
+        for ref_path in referenced_paths:
+            if ref_path.startswith(folder_prefix):
+                return True
+    return False
+
+def _get_folder_size_and_time(folder):
+    size = 0
+    last_time = 0
+    for dir_path, dir_names, file_names in os.walk(folder):
+        for file_name in file_names:
+            try:
+                st = os.stat(os.path.join(dir_path, file_name))
+            except OSError:
+                continue
+            size += st.st_size
+            last_time = max(last_time, st.st_mtime, st.st_atime)
+    return (size, last_time)
@@ -23,10 +23,14 @@ from gi.repository import Gtk
 from os import listdir
 from os.path import isfile, join
 import os
+import shutil
 
 import dialogutils
+import diskcache
+import editorpersistance
 import gui
 import guiutils
+import proxystore
 import utils
 
 
@@ -37,9 +41,10 @@ PROJECT_DATA_WARNING = 2
 
 class DiskFolderManagementPanel:
     
-    def __init__(self, folder, info_text, warning_level):
+    def __init__(self, folder, info_text, warning_level, cache_category=None):
         self.folder = folder
         self.warning_level = warning_level
+        self.cache_category = cache_category
                 
         self.destroy_button = Gtk.Button(_("Destroy data"))
         self.destroy_button.connect("clicked", self.destroy_pressed)
@@ -50,7 +55,7 @@ class DiskFolderManagementPanel:
         self.size_info = Gtk.Label()
         self.size_info.set_text(self.get_folder_size_str())
 
-        folder_label = Gtk.Label("/<i>" + folder + "</i>")
+        folder_label = Gtk.Label("<i>" + self.get_cache_folder() + "</i>")
         folder_label.set_use_markup(True)
 
         info = Gtk.HBox(True, 2)
@@ -71,25 +76,48 @@ class DiskFolderManagementPanel:
             button_area.pack_start(guiutils.pad_label(16, 16), False, False, 0)
         button_area.set_size_request(150, 24)
 
+        # Size budget for background LRU eviction, 0 means no limit
+        budget_area = Gtk.HBox(False, 2)
+        if self.cache_category != None:
+            budget_adj = Gtk.Adjustment(diskcache.get_budget(self.cache_category) / (1024 * 1024), 0, 1024 * 1024, 64)
+            self.budget_spin = Gtk.SpinButton()
+            self.budget_spin.set_adjustment(budget_adj)
+            self.budget_spin.set_numeric(True)
+            self.budget_spin.set_tooltip_text(_("Least recently used data not used by current project is deleted\nwhen size exceeds this limit. 0 means no limit."))
+            self.budget_spin.connect("value-changed", self.budget_changed)
+            budget_area.pack_start(Gtk.Label(label=_("Limit MB:")), False, False, 0)
+            budget_area.pack_start(self.budget_spin, False, False, 0)
+        budget_area.set_size_request(170, 24)
+
         row = Gtk.HBox(False, 2)
         row.pack_start(info, True, True, 0)
+        row.pack_start(budget_area, False, False, 0)
         row.pack_start(button_area, False, False, 0)
         
         self.vbox = Gtk.VBox(False, 2)
         self.vbox.pack_start(row, False, False, 0)
 
     def get_cache_folder(self):
-        return utils.get_hidden_user_dir_path() + "/" + self.folder
+        # Cache categories may be in user selected folders, panel shows the folder that is evicted
+        if self.cache_category != None:
+            return diskcache.get_category_folder(self.cache_category)
+        return utils.get_hidden_user_dir_path() + self.folder
 
     def get_folder_files(self):
         cache_folder = self.get_cache_folder()
-        return [f for f in listdir(cache_folder) if isfile(join(cache_folder, f))]
+        if cache_folder == None or not os.path.isdir(cache_folder):
+            return []
+        files = [f for f in listdir(cache_folder) if isfile(join(cache_folder, f))]
+        if self.cache_category == diskcache.THUMBNAILS:
+            # Thumbnails folder is user selectable and may have other files
+            files = [f for f in files if diskcache.is_thumbnail_file_name(f)]
+        return files
     
     def get_folder_size(self):
         files = self.get_folder_files()
         size = 0
         for f in files:
-            size += os.path.getsize(self.get_cache_folder() +"/" + f)
+            size += os.path.getsize(join(self.get_cache_folder(), f))
         return size
 
     def get_folder_size_str(self):
@@ -117,6 +145,9 @@ class DiskFolderManagementPanel:
             
         dialogutils. warning_confirmation(self.warning_confirmation, primaty_text, secondary_text, gui.editor_window.window, None, False, True)
 
+    def budget_changed(self, spin):
+        diskcache.set_budget_mb(self.cache_category, spin.get_adjustment().get_value())
+
     def destroy_guard_toggled(self, check_button):
         if check_button.get_active() == True:
             self.destroy_button.set_sensitive(True)
@@ -136,11 +167,36 @@ class DiskFolderManagementPanel:
         
         files = self.get_folder_files()
         for f in files:
-            os.remove(self.get_cache_folder() +"/" + f)
+            os.remove(join(self.get_cache_folder(), f))
 
         self.size_info.set_text(self.get_folder_size_str())
         self.size_info.queue_draw()
             
+class ProxyStoreManagementPanel(DiskFolderManagementPanel):
+    """
+    Proxy files are in render folder and image sequence proxies are in sub folders.
+    """
+    def get_cache_folder(self):
+        return proxystore.get_store_folder()
+
+    def get_folder_size(self):
+        return proxystore.get_store_size()
+
+    def destroy_data(self):
+        print "deleting proxy files"
+
+        cache_folder = self.get_cache_folder()
+        for f in listdir(cache_folder):
+            path = join(cache_folder, f)
+            if isfile(path):
+                os.remove(path)
+            else:
+                shutil.rmtree(path)
+
+        self.size_info.set_text(self.get_folder_size_str())
+        self.size_info.queue_draw()
+
+
 def show_disk_management_dialog():
     dialog = Gtk.Dialog(_("Disk Cache Manager"), None,
                     Gtk.DialogFlags.MODAL | Gtk.DialogFlags.DESTROY_WITH_PARENT,
@@ -164,11 +220,13 @@ def show_disk_management_dialog():
 
 def _get_disk_dir_panels():
     panels = []
-    panels.append(DiskFolderManagementPanel("audiolevels", _("Audio Levels Data"), RECREATE_WARNING))
-    panels.append(DiskFolderManagementPanel("gmic", _("G'Mic Tool Session Data"), NO_WARNING))
+    panels.append(DiskFolderManagementPanel("audiolevels", _("Audio Levels Data"), RECREATE_WARNING, diskcache.AUDIO_LEVELS))
+    panels.append(DiskFolderManagementPanel("gmic", _("G'Mic Tool Session Data"), NO_WARNING, diskcache.GMIC))
     panels.append(DiskFolderManagementPanel("natron", _("Natron Clip Export Data"), NO_WARNING))
-    panels.append(DiskFolderManagementPanel("rendered_clips", _("Rendered Files"), PROJECT_DATA_WARNING))
-    panels.append(DiskFolderManagementPanel("thumbnails", _("Thumbnails"), RECREATE_WARNING))
+    panels.append(DiskFolderManagementPanel("rendered_clips", _("Rendered Files"), PROJECT_DATA_WARNING, diskcache.RENDERED_CLIPS))
+    panels.append(DiskFolderManagementPanel("thumbnails", _("Thumbnails"), RECREATE_WARNING, diskcache.THUMBNAILS))
     panels.append(DiskFolderManagementPanel("user_profiles", _("User Created Custom Profiles"), PROJECT_DATA_WARNING))
+    if editorpersistance.prefs.render_folder != None and os.path.isdir(proxystore.get_store_folder()):
+        panels.append(ProxyStoreManagementPanel("proxies", _("Proxy Files"), PROJECT_DATA_WARNING, diskcache.PROXIES))
 
     return panels
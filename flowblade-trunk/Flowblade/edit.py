@@ -28,6 +28,7 @@ EditAction objects and placing them on the undo/redo stack.
 
 import audiowaveform
 import appconsts
+import clipindex
 import compositeeditor
 import compositorfades
 from editorstate import current_sequence
@@ -55,6 +56,7 @@ def append_clip(track, clip, clip_in, clip_out):
     clip.clip_out = clip_out
     track.clips.append(clip) # py
     track.append(clip, clip_in, clip_out) # mlt
+    clipindex.clips_changed()
     resync.clip_added_to_timeline(clip, track)
 
 def _insert_clip(track, clip, index, clip_in, clip_out):
@@ -65,6 +67,7 @@ def _insert_clip(track, clip, index, clip_in, clip_out):
     clip.clip_out = clip_out
     track.clips.insert(index, clip) # py
     track.insert(clip, index, clip_in, clip_out) # mlt
+    clipindex.clips_changed()
     resync.clip_added_to_timeline(clip, track)
 
 def _insert_blank(track, index, length):
@@ -75,6 +78,7 @@ def _insert_blank(track, index, length):
     blank_clip.clip_out = length - 1 # -1, end inclusive
     blank_clip.is_blanck_clip = True
     track.clips.insert(index, blank_clip)
+    clipindex.clips_changed()
     
 def _remove_clip(track, index):
     """
@@ -82,6 +86,7 @@ def _remove_clip(track, index):
     """
     track.remove(index)
     clip = track.clips.pop(index)
+    clipindex.clips_changed()
     updater.clip_removed_during_edit(clip)
     resync.clip_removed_from_timeline(clip)
     
@@ -123,6 +128,7 @@ def _add_blank_to_py(track, index, length):
     blank_clip.clip_out = length - 1 # -1, end inclusive
     blank_clip.is_blanck_clip = True
     track.clips.insert(index, blank_clip)
+    clipindex.clips_changed()
     return blank_clip
 
 # --------------------------------- util methods
@@ -133,6 +139,7 @@ def _set_in_out(clip, c_in, c_out):
     clip.clip_in = c_in
     clip.clip_out = c_out
     clip.set_in_and_out(c_in, c_out)
+    clipindex.clips_changed()
     
 def _clip_length(clip): # check if can be removed
     return clip.clip_out - clip.clip_in + 1 # +1, end inclusive
@@ -209,10 +216,10 @@ def _overwrite_cut_track(track, frame, add_cloned_filters=False):
     
     If cut was made it also clones fliters to new clip created by cut if requested.
     """
-    index = track.get_clip_index_at(frame)
+    index = clipindex.get_clip_index_at(track, frame)
     clip = track.clips[index]
     orig_in_out = (clip.clip_in, clip.clip_out)
-    clip_start_in_tline = track.clip_start(index)
+    clip_start_in_tline = clipindex.clip_start(track, index)
     clip_frame = frame - clip_start_in_tline + clip.clip_in
     
     if not _frame_on_cut(clip, clip_frame):
@@ -239,7 +246,7 @@ def _overwrite_cut_range_out(track, self):
         self.out_clip_length = clip_out - clip_in + 1 # Cut blank can't be reconstructed with clip_in data as it is always 0 for blank, so we use this
         if clip_in != -1: # if we did cut we'll need to restore the dut out clip
                           # which is the original clip because 
-            orig_index = track.get_clip_index_at(self.over_out - 1)
+            orig_index = clipindex.get_clip_index_at(track, self.over_out - 1)
             self.orig_out_clip = track.clips[orig_index] 
     else:
         self.out_clip_in = -1
@@ -336,6 +343,8 @@ class EditAction:
 
         _remove_all_trailing_blanks(None)
 
+        current_sequence().edit_generation += 1
+
         resync.calculate_and_set_child_clip_sync_states()
 
         # HACK, see above.
@@ -360,6 +369,8 @@ class EditAction:
         _remove_trailing_blanks_redo(self)
         resync.calculate_and_set_child_clip_sync_states()
 
+        current_sequence().edit_generation += 1
+
         tlinewidgets.set_match_frame(-1, -1, True)
 
         # HACK, see above.
@@ -648,8 +659,8 @@ def _sync_over_redo(self):
 
     # Splice out clips in overwrite range
     self.removed_clips = []
-    self.in_index = track.get_clip_index_at(self.frame)
-    self.out_index = track.get_clip_index_at(self.over_out)
+    self.in_index = clipindex.get_clip_index_at(track, self.frame)
+    self.out_index = clipindex.get_clip_index_at(track, self.over_out)
     for i in range(self.in_index, self.out_index):
         removed_clip = _remove_clip(track, self.in_index)
         self.removed_clips.append(removed_clip)
@@ -863,7 +874,7 @@ def _overwrite_move_undo(self):
         
     # Remove moved clips
     moved_clips_count = self.selected_range_out - self.selected_range_in + 1 # + 1 == out inclusive
-    moved_index = track.get_clip_index_at(self.over_in)
+    moved_index = clipindex.get_clip_index_at(track, self.over_in)
     for i in range(0, moved_clips_count):
         _remove_clip(track, moved_index)
         
@@ -924,8 +935,8 @@ def _overwrite_move_redo(self):
     
     # Splice out clips in overwrite range
     self.removed_clips = []
-    in_index = track.get_clip_index_at(self.over_in)
-    out_index = track.get_clip_index_at(self.over_out)
+    in_index = clipindex.get_clip_index_at(track, self.over_in)
+    out_index = clipindex.get_clip_index_at(track, self.over_out)
 
     for i in range(in_index, out_index):
         removed_clip = _remove_clip(track, in_index)
@@ -1011,7 +1022,7 @@ def _multitrack_overwrite_move_undo(self):
 
     # Remove moved clips
     moved_clips_count = self.selected_range_out - self.selected_range_in + 1 # + 1 == out inclusive
-    moved_index = to_track.get_clip_index_at(self.over_in)
+    moved_index = clipindex.get_clip_index_at(to_track, self.over_in)
     for i in range(0, moved_clips_count):
         _remove_clip(to_track, moved_index)
 
@@ -1073,8 +1084,8 @@ def _multitrack_overwrite_move_redo(self):
 
     # Splice out clips in overwrite range
     self.removed_clips = []
-    in_index = to_track.get_clip_index_at(self.over_in)
-    out_index = to_track.get_clip_index_at(self.over_out)
+    in_index = clipindex.get_clip_index_at(to_track, self.over_in)
+    out_index = clipindex.get_clip_index_at(to_track, self.over_out)
 
     for i in range(in_index, out_index):
         removed_clip = _remove_clip(to_track, in_index)
@@ -1833,7 +1844,7 @@ def _audio_splice_undo(self):
     to_track = self.to_track
 
     # Remove add audio clip
-    in_index = to_track.get_clip_index_at(self.over_in)
+    in_index = clipindex.get_clip_index_at(to_track, self.over_in)
     _remove_clip(to_track, in_index)
         
     # Fix in clip and remove cut created clip if in was cut
@@ -1892,8 +1903,8 @@ def _audio_splice_redo(self):
     
     # Splice out clips in overwrite range
     self.removed_clips = []
-    in_index = to_track.get_clip_index_at(self.over_in)
-    out_index = to_track.get_clip_index_at(self.over_out)
+    in_index = clipindex.get_clip_index_at(to_track, self.over_in)
+    out_index = clipindex.get_clip_index_at(to_track, self.over_out)
 
     for i in range(in_index, out_index):
         self.removed_clips.append(_remove_clip(to_track, in_index))
@@ -1965,7 +1976,7 @@ def _create_and_do_sync_actions_list(resync_data_list):
 
         # Get new in and out frames for clip
         diff = pos_offset - clip.sync_data.pos_offset
-        over_in = track.clip_start(index) - diff
+        over_in = clipindex.clip_start(track, index) - diff
         over_out = over_in + (clip.clip_out - clip.clip_in + 1)
         data = {"track":track,
                 "over_in":over_in,
@@ -2000,10 +2011,10 @@ def _resync_clips_sequence_redo(self):
     else:
         # Get new in and out frames for clips 
         diff = pos_offset - clip.sync_data.pos_offset
-        over_in = track.clip_start(index) - diff
+        over_in = clipindex.clip_start(track, index) - diff
 
         clip_last, track, index_last, pos_offset = resync_data[-1]
-        last_over_in = track.clip_start(index_last) - diff
+        last_over_in = clipindex.clip_start(track, index_last) - diff
         over_out = last_over_in + (clip_last.clip_out - clip_last.clip_in + 1)
 
         # Create, do and sacve edit action.
@@ -2040,8 +2051,8 @@ def _set_sync_redo(self):
     parent_clip = get_track(current_sequence().first_video_index).clips[self.parent_index]
 
     # Get offset
-    child_clip_start = self.child_track.clip_start(self.child_index) - child_clip.clip_in
-    parent_clip_start = self.parent_track.clip_start(self.parent_index) - parent_clip.clip_in
+    child_clip_start = clipindex.clip_start(self.child_track, self.child_index) - child_clip.clip_in
+    parent_clip_start = clipindex.clip_start(self.parent_track, self.parent_index) - parent_clip.clip_in
     pos_offset = child_clip_start - parent_clip_start
     
     # Set sync data
@@ -2467,7 +2478,7 @@ def _append_media_log_redo(self):
 # --------------------------------------------- help funcs for "range over" and "range splice out" edits
 def _track_put_back_range(over_in, track, track_extract_data):
     # get index for first clip that was removed
-    moved_index = track.get_clip_index_at(over_in)
+    moved_index = clipindex.get_clip_index_at(track, over_in)
 
     # Fix in clip and remove cut created clip if in was cut
     if track_extract_data.in_clip_out != -1:
@@ -2530,15 +2541,15 @@ def _track_extract_range(over_in, over_out, track):
         track_extract_data.out_clip_length = clip_out - clip_in + 1 # Cut blank can't be reconstructed with clip_in data as it is always 0 for blank, so we use this
         if clip_in != -1: # if we did cut we'll need to restore the dut out clip
                           # which is the original clip because 
-            orig_index = track.get_clip_index_at(over_out - 1)
+            orig_index = clipindex.get_clip_index_at(track, over_out - 1)
             track_extract_data.orig_out_clip = track.clips[orig_index] 
     else:
         track_extract_data.out_clip_in = -1
         
     # Splice out clips in overwrite range
     track_extract_data.removed_clips = []
-    track_extract_data.in_index = track.get_clip_index_at(over_in)
-    out_index = track.get_clip_index_at(over_out)
+    track_extract_data.in_index = clipindex.get_clip_index_at(track, over_in)
+    out_index = clipindex.get_clip_index_at(track, over_out)
 
     for i in range(track_extract_data.in_index, out_index):
         removed_clip = _remove_clip(track, track_extract_data.in_index)
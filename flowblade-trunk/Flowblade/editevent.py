@@ -33,6 +33,7 @@ from gi.repository import Gdk
 import appconsts
 import audiosync
 import boxmove
+import clipindex
 import clipeffectseditor
 import clipenddragmode
 import compositeeditor
@@ -141,7 +142,7 @@ def  _attempt_dnd_overwrite(track, clip, frame):
         updater.display_tline_cut_frame(track, index + 1)
         return True
     else: # Clip dropped before end of last clip on track
-        index = track.get_clip_index_at(frame)
+        index = clipindex.get_clip_index_at(track, frame)
         overwritten_clip = track.clips[index]
         
         # dnd overwrites can only done on blank clips
@@ -150,8 +151,8 @@ def  _attempt_dnd_overwrite(track, clip, frame):
             return False
 
         drop_length = clip.mark_out - clip.mark_in + 1 # +1 , mark out incl.
-        blank_start = track.clip_start(index)
-        blank_end = track.clip_start(index + 1)
+        blank_start = clipindex.clip_start(track, index)
+        blank_end = clipindex.clip_start(track, index + 1)
         
         movemodes.clear_selected_clips()
   
@@ -187,7 +187,7 @@ def update_prefs_from_widgets(widgets_tuples_tuple):
     use_english, disp_splash, buttons_style, dark_theme, theme_combo, audio_levels_combo, window_mode_combo, full_names, double_track_hights = view_prefs_widgets
 
     # Jan-2017 - SvdB
-    perf_render_threads, perf_drop_frames = performance_widgets
+    perf_render_threads, perf_drop_frames, levels_cache_size, frame_cache_size, proxy_render_jobs, render_segments, use_render_worker = performance_widgets
 
     # Apr-2017 - SvdB
     shortcuts_combo = shortcuts_widgets
@@ -226,6 +226,11 @@ def update_prefs_from_widgets(widgets_tuples_tuple):
     # Jan-2017 - SvdB
     prefs.perf_render_threads = int(perf_render_threads.get_adjustment().get_value())
     prefs.perf_drop_frames = perf_drop_frames.get_active()
+    prefs.audio_levels_cache_mb = int(levels_cache_size.get_adjustment().get_value())
+    prefs.frame_cache_mb = int(frame_cache_size.get_adjustment().get_value())
+    prefs.proxy_render_jobs = int(proxy_render_jobs.get_adjustment().get_value())
+    prefs.render_segments = int(render_segments.get_adjustment().get_value())
+    prefs.use_render_worker = use_render_worker.get_active()
     # Feb-2017 - SvdB - for full file names
     prefs.show_full_file_names = full_names.get_active()
     prefs.center_on_arrow_move = auto_center_on_updown.get_active()
@@ -331,3 +336,9 @@ class EditorPreferences:
         self.shortcuts = 'Flowblade Default'
         self.double_track_hights = False
         self.delta_overlay = True
+        self.audio_levels_cache_mb = 64 # memory budget for audio levels data in timeline
+        self.frame_cache_mb = 128 # memory budget for decoded trim view and match frames
+        self.proxy_render_jobs = 0 # number of concurrent proxy renders, 0 means derived from CPU count
+        self.render_segments = 1 # number of timeline render segments rendered in parallel processes, 1 means no segments
+        self.use_render_worker = False # audio levels, segment render and media import jobs are done in persistent worker process
+        self.disk_cache_budgets_mb = {} # disk cache category -> size budget, missing categories use diskcache.DEFAULT_BUDGETS_MB
@@ -32,7 +32,6 @@ import app
 import appconsts
 import audiomonitoring
 import audiosync
-import batchrendering
 import boxmove
 import clipeffectseditor
 import clipmenuaction
@@ -46,11 +45,10 @@ import editorpersistance
 import editorstate
 import exporting
 import glassbuttons
-import gmic
 import gui
 import guicomponents
 import guiutils
-import medialinker
+import lazyimport
 import medialog
 import menuactions
 import middlebar
@@ -62,17 +60,22 @@ import rendergui
 import panels
 import patternproducer
 from positionbar import PositionBar
-import preferenceswindow
 import projectaction
 import projectinfogui
 import proxyediting
-import titler
 import tlineaction
 import tlinewidgets
 import trackaction
 import updater
 import undo
 
+# Imported on first use, see lazyimport.py
+batchrendering = lazyimport.lazy_import("batchrendering")
+gmic = lazyimport.lazy_import("gmic")
+medialinker = lazyimport.lazy_import("medialinker")
+preferenceswindow = lazyimport.lazy_import("preferenceswindow")
+titler = lazyimport.lazy_import("titler")
+
 # GUI size params
 MEDIA_MANAGER_WIDTH = 250
 MONITOR_AREA_WIDTH = 600 # defines app min width with NOTEBOOK_WIDTH 400 for small
@@ -21,6 +21,8 @@
 
 
 from gi.repository import Gtk
+from gi.repository import Gdk
+from gi.repository import GdkPixbuf
 from gi.repository import GLib
 import os, sys
 from xml.dom import minidom
@@ -41,6 +43,7 @@ from editorstate import current_sequence
 import gui
 import guiutils
 import renderconsumer
+import rgbframe
 import utils
 
 REEL_NAME_HASH_8_NUMBER = 1
@@ -384,7 +387,6 @@ def screenshot_export():
     if frame > length - 2:
         frame = length - 2
 
-    render_screen_shot(frame, get_displayed_image_render_path(), "png")
     export_screenshot_dialog(_export_screenshot_dialog_callback, frame,
                              gui.editor_window.window, PROJECT().name)
     PLAYER().seek_frame(frame)
@@ -407,11 +409,25 @@ def _export_screenshot_dialog_callback(dialog, response_id, data):
     purge_screenshots()
     PLAYER().seek_frame(frame)
 
-def get_displayed_image_render_path():
-    return utils.get_hidden_screenshot_dir_path() + "screenshot_%01d.png"
-
-def get_displayed_image_path():
-    return utils.get_hidden_screenshot_dir_path() + "screenshot_1.png"
+def _get_displayed_image(frame, image_height):
+    # Displayed image is created from MLT frame in memory, only exported image is rendered to file.
+    w = PROJECT().profile.width()
+    h = PROJECT().profile.height()
+    rgb_data = _get_sequence_rgb_frame(frame, w, h)
+    surface = rgbframe.get_surface_from_mlt_rgb(rgb_data, w, h)
+    pixbuf = Gdk.pixbuf_get_from_surface(surface, 0, 0, w, h)
+    icon_width = int((float(w) / float(h)) * image_height)
+    s_pbuf = pixbuf.scale_simple(icon_width, image_height, GdkPixbuf.InterpType.BILINEAR)
+    return Gtk.Image.new_from_pixbuf(s_pbuf)
+
+def _get_sequence_rgb_frame(frame, w, h):
+    # Frame is taken from sequence tractor, player may be displaying a clip from media or bin.
+    tractor = current_sequence().tractor
+    tractor.set_speed(0)
+    tractor.seek(frame)
+    mlt_frame = tractor.get_frame()
+    mlt_frame.set("consumer_deinterlace", 1)
+    return mlt_frame.get_image(mlt.mlt_image_rgb24a, w, h)
 
 def _screenshot_frame_changed(adjustment):
     _update_displayed_image(int(adjustment.get_value()))
@@ -445,7 +461,7 @@ def export_screenshot_dialog(callback, frame, parent_window, project_name):
                         ok_str, Gtk.ResponseType.YES))
 
     global _screenshot_img
-    _screenshot_img = guiutils.get_gtk_image_from_file(get_displayed_image_path(), 300)
+    _screenshot_img = _get_displayed_image(frame, 300)
 
     frame_frame = guiutils.get_named_frame_with_vbox(None, [_screenshot_img])
     
@@ -0,0 +1,147 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module creates cairo surfaces from media file frames in memory.
+
+Used for trim view and timeline match frames. Producer for last used file is kept
+so that continuous updates when rolling and slipping do not reopen the file.
+
+Created surfaces are kept in a LRU cache with memory budget set in preferences,
+so that dragging trims back and forth over same frames does not decode them again.
+"""
+
+import collections
+import mlt
+import threading
+
+import editorpersistance
+from editorstate import PROJECT
+import rgbframe
+
+_producer = None
+_producer_path = None
+_producer_profile = None
+_lock = threading.Lock() # MLT producer can not be seeked from many threads at the same time
+
+# Frame surfaces cache, (clip path, frame, width, height) -> cairo.ImageSurface, least recently used first
+_frames = collections.OrderedDict()
+_frames_size = 0
+_cache_hits = 0
+_cache_misses = 0
+_cache_evictions = 0
+
+
+def get_frame_surface(clip_path, clip_frame, width, height):
+    """
+    Returns cairo.ImageSurface with frame of media file scaled to width x height.
+    """
+    width = int(width)
+    height = int(height)
+    key = (clip_path, int(clip_frame), width, height)
+    with _lock:
+        _check_profile()
+        surface = _get_cached(key)
+        if surface != None:
+            return surface
+
+        producer = _get_producer(clip_path)
+        image_producer = producer.cut(int(clip_frame), int(clip_frame))
+        image_producer.set_speed(0)
+        image_producer.seek(0)
+
+        # Get MLT rgb frame data
+        frame = image_producer.get_frame()
+        # And make sure to deinterlace if input is interlaced
+        frame.set("consumer_deinterlace", 1)
+        mlt_rgb = frame.get_image(mlt.mlt_image_rgb24a, width, height)
+
+    surface = rgbframe.get_surface_from_mlt_rgb(mlt_rgb, width, height)
+
+    with _lock:
+        _add_to_cache(key, surface)
+    return surface
+
+def clear_cache():
+    global _frames, _frames_size
+    with _lock:
+        _frames = collections.OrderedDict()
+        _frames_size = 0
+
+def get_cache_stats():
+    """
+    Returns dict with frame cache counters for diagnostics.
+    """
+    return {"hits": _cache_hits, 
+            "misses": _cache_misses,
+            "evictions": _cache_evictions,
+            "entries": len(_frames),
+            "size": _frames_size,
+            "max_size": _get_cache_max_size()}
+
+def _check_profile():
+    # Called with _lock held
+    global _producer, _producer_profile, _frames, _frames_size
+    if _producer_profile is not PROJECT().profile:
+        # Frame numbers refer to different frames with different profile
+        _frames = collections.OrderedDict()
+        _frames_size = 0
+        _producer = None
+        _producer_profile = PROJECT().profile
+
+def _get_producer(clip_path):
+    # Called with _lock held
+    global _producer, _producer_path
+    if _producer == None or _producer_path != clip_path:
+        _producer = mlt.Producer(PROJECT().profile, str(clip_path))
+        _producer_path = clip_path
+    return _producer
+
+def _get_cached(key):
+    # Called with _lock held
+    global _cache_hits, _cache_misses
+    try:
+        surface = _frames.pop(key)
+        _frames[key] = surface # move to most recently used end
+        _cache_hits += 1
+        return surface
+    except KeyError:
+        _cache_misses += 1
+        return None
+
+def _add_to_cache(key, surface):
+    # Called with _lock held
+    global _frames_size, _cache_evictions
+    if key in _frames:
+        return # Another thread decoded the same frame
+    _frames[key] = surface
+    _frames_size += _get_surface_size(surface)
+
+    max_size = _get_cache_max_size()
+    while _frames_size > max_size and len(_frames) > 1:
+        evicted_key, evicted = _frames.popitem(last=False)
+        _frames_size -= _get_surface_size(evicted)
+        _cache_evictions += 1
+
+def _get_surface_size(surface):
+    return surface.get_stride() * surface.get_height()
+
+def _get_cache_max_size():
+    return editorpersistance.prefs.frame_cache_mb * 1024 * 1024
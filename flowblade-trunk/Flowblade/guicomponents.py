@@ -23,6 +23,7 @@ Module contains classes and build methods to create GUI objects.
 """
 
 import cairo
+import clipindex
 import copy
 import math
 import time
@@ -556,7 +557,7 @@ class ProfileListView(TextListView):
         default_profile = mltprofiles.get_default_profile()
         for profile in profiles:
             row_data = [profile[0]]
-            if default_profile == profile[1]:
+            if profile[0] == default_profile.description():
                 row_data = [row_data[0] + " <" + _("default") + ">"]
             self.storemodel.append(row_data)
 
@@ -626,7 +627,7 @@ class ClipInfoPanel(Gtk.VBox):
         self.track.set_text(_("<b>Track: </b>"))
         self.track_value.set_text(track.get_name())
         self.position.set_text(_("<b>Position:</b>"))
-        clip_start_in_tline = track.clip_start(index)
+        clip_start_in_tline = clipindex.clip_start(track, index)
         tc_str = utils.get_tc_string(clip_start_in_tline)
         self.position_value.set_text(tc_str)
         self._set_use_mark_up()
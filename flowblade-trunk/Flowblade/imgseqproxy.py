@@ -0,0 +1,98 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module resizes image sequence frames to proxy frames in flowbladeimgseqproxy process.
+
+Editor process has GTK and MLT threads running and can't fork worker processes safely,
+so frames are resized in worker processes of this launched process. Progress is written
+to stdout for proxyediting.py.
+"""
+
+import glob
+import multiprocessing
+import os
+import sys
+
+from PIL import Image
+
+# Number of image sequence frames resized by a worker process in one job
+IMG_SEQ_PROXY_CHUNK_SIZE = 25
+
+PROGRESS_MSG = "IMG_SEQ_PROXY_PROGRESS"
+DONE_MSG = "IMG_SEQ_PROXY_DONE"
+
+
+def main():
+    # Called from .../launch/flowbladeimgseqproxy script
+    lookup_path, copyfolder, proxy_w, proxy_h = sys.argv[1:5]
+    size = (int(proxy_w), int(proxy_h))
+
+    listing = sorted(glob.glob(lookup_path))
+    if len(listing) == 0:
+        print DONE_MSG + " 0 0"
+        sys.stdout.flush()
+        return
+
+    # Frames are resized in worker processes in chunks of consecutive frames
+    jobs = []
+    for i in range(0, len(listing), IMG_SEQ_PROXY_CHUNK_SIZE):
+        jobs.append((listing[i:i + IMG_SEQ_PROXY_CHUNK_SIZE], copyfolder, size))
+
+    pool = multiprocessing.Pool(min(multiprocessing.cpu_count(), len(jobs)))
+    done = 0
+    skipped = 0
+    for chunk_done, chunk_skipped in pool.imap_unordered(_create_img_seq_proxy_frames, jobs):
+        done = done + chunk_done
+        skipped = skipped + chunk_skipped
+        print PROGRESS_MSG + " " + str(float(done) / float(len(listing)))
+        sys.stdout.flush()
+    pool.close()
+    pool.join()
+
+    print DONE_MSG + " " + str(len(listing)) + " " + str(skipped)
+    sys.stdout.flush()
+
+def _create_img_seq_proxy_frames(job):
+    # Runs in worker process. Frames that have proxy newer then source frame are skipped
+    # so that interrupted image sequence proxy render continues where it was left.
+    frame_paths, copyfolder, size = job
+    skipped = 0
+    for orig_path in frame_paths:
+        orig_folder, orig_file_name = os.path.split(orig_path)
+        proxy_frame_path = copyfolder + "/" + orig_file_name
+        try:
+            if os.path.getmtime(proxy_frame_path) >= os.path.getmtime(orig_path):
+                skipped = skipped + 1
+                continue
+        except OSError:
+            pass
+
+        try:
+            im = Image.open(orig_path)
+            im.thumbnail(size, Image.ANTIALIAS)
+            # Write to temp file first so that a frame left incomplete by abort is not skipped later
+            im.save(proxy_frame_path + ".tmp", "PNG")
+            os.rename(proxy_frame_path + ".tmp", proxy_frame_path)
+        except (IOError, OSError):
+            print "proxy img seq frame failed for '%s'" % orig_path
+            sys.stdout.flush()
+
+    return (len(frame_paths), skipped)
@@ -37,7 +37,7 @@ import editorstate
 from editorstate import current_sequence
 from editorstate import PLAYER
 from editorstate import timeline_visible
-import keyframeeditor
+import lazyimport
 import medialog
 import menuactions
 import monitorevent
@@ -53,6 +53,9 @@ import projectaction
 
 import audiowaveformrenderer
 
+# Imported on first use, see lazyimport.py
+keyframeeditor = lazyimport.lazy_import("keyframeeditor")
+
 
 # ------------------------------------- keyboard events
 def key_down(widget, event):
@@ -0,0 +1,115 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module imports tool windows, extra editors and rarely used dialogs on first use.
+
+Importing module declares it with lazy_import() instead of import statement and gets
+a proxy object that imports the module when one of its attributes is first read.
+Attributes set before module is loaded, e.g. monkeypatched callbacks, are set on
+module when it is loaded.
+
+Module code must not use lazy modules at import time.
+"""
+
+import importlib
+import sys
+import threading
+import time
+import types
+
+import startuptiming
+
+_lazy_modules = {} # module name -> LazyModule
+_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """
+    Proxy for module that is imported on first attribute access.
+    """
+    def __init__(self, name, init_func):
+        types.ModuleType.__init__(self, name)
+        self.__dict__["_lazy_init_func"] = init_func
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_pending_attrs"] = {}
+
+    def __getattr__(self, attr):
+        # Called only for attributes not found in proxy itself
+        module = self.__dict__["_lazy_module"]
+        if module == None:
+            pending_attrs = self.__dict__["_lazy_pending_attrs"]
+            if attr in pending_attrs:
+                return pending_attrs[attr]
+            module = self._load()
+        return getattr(module, attr)
+
+    def __setattr__(self, attr, value):
+        with _lock:
+            module = self.__dict__["_lazy_module"]
+            if module == None:
+                self.__dict__["_lazy_pending_attrs"][attr] = value
+                return
+        setattr(module, attr, value)
+
+    def _load(self):
+        with _lock:
+            if self.__dict__["_lazy_module"] != None:
+                return self.__dict__["_lazy_module"]
+
+            start = time.time()
+            module = importlib.import_module(self.__name__)
+            for attr, value in self.__dict__["_lazy_pending_attrs"].iteritems():
+                setattr(module, attr, value)
+            self.__dict__["_lazy_pending_attrs"] = {}
+            if self.__dict__["_lazy_init_func"] != None:
+                self.__dict__["_lazy_init_func"](module)
+            self.__dict__["_lazy_module"] = module
+            startuptiming.lazy_import_done(self.__name__, time.time() - start)
+            return module
+
+
+def lazy_import(name, init_func=None):
+    """
+    Returns proxy for module that imports it on first use.
+    If init_func is given it is called with module after module is imported.
+    """
+    with _lock:
+        try:
+            lazy_module = _lazy_modules[name]
+        except KeyError:
+            lazy_module = LazyModule(name, init_func)
+            _lazy_modules[name] = lazy_module
+            if name in sys.modules:
+                lazy_module._load() # already imported elsewhere, init_func still needs to be called
+            return lazy_module
+
+        if init_func != None:
+            if lazy_module.__dict__["_lazy_module"] == None:
+                lazy_module.__dict__["_lazy_init_func"] = init_func
+            else:
+                init_func(lazy_module.__dict__["_lazy_module"])
+        return lazy_module
+
+def is_loaded(name):
+    try:
+        return _lazy_modules[name].__dict__["_lazy_module"] != None
+    except KeyError:
+        return name in sys.modules
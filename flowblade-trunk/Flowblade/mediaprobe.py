@@ -0,0 +1,111 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module probes and thumbnails media files in flowblademediaprobe process.
+
+MLT Python bindings hold GIL during calls, so media files can't be probed in parallel
+in editor process threads, and editor process has GTK and MLT threads running and
+can't fork worker processes safely. Files are probed in worker processes of this
+launched process and results are written to stdout in given file order for projectaction.py.
+"""
+
+import json
+import locale
+import mlt
+import multiprocessing
+import sys
+
+import editorpersistance
+import editorstate
+import mltprofiles
+import projectdata
+import respaths
+import translations
+
+RESULT_MSG = "MEDIA_PROBE_RESULT"
+DONE_MSG = "MEDIA_PROBE_DONE"
+
+# Pool does not notice when a worker process dies, e.g. MLT crashes on a broken file,
+# and its job is never completed. Probing is given up if next result does not arrive in this time.
+RESULT_TIMEOUT = 60 # seconds
+
+_thumbnailer = None # each worker process has its own
+
+
+def main():
+    # Called from .../launch/flowblademediaprobe script
+    root_path, profile_desc = sys.argv[1:3]
+    files = sys.argv[3:]
+    respaths.set_paths(root_path)
+
+    try:
+        editorstate.mlt_version = mlt.LIBMLT_VERSION
+    except:
+        editorstate.mlt_version = "0.0.99" # magic string for "not found"
+
+    # Thumbnail folder is in editor prefs
+    editorpersistance.load()
+    translations.init_languages()
+
+    repo = mlt.Factory().init()
+
+    # Set numeric locale to use "." as radix, MLT initilizes this to OS locale and this causes bugs
+    locale.setlocale(locale.LC_NUMERIC, 'C')
+
+    mltprofiles.load_profile_list()
+
+    if len(files) > 0:
+        # Worker processes are forked after MLT init, results come in file order
+        pool = multiprocessing.Pool(min(multiprocessing.cpu_count(), len(files)), _init_worker, (profile_desc,))
+        try:
+            results = pool.imap(_probe_file, files)
+            for i in range(0, len(files)):
+                try:
+                    result = results.next(RESULT_TIMEOUT)
+                except multiprocessing.TimeoutError:
+                    print "media probe timed out for '%s'" % files[i]
+                    sys.stdout.flush()
+                    sys.exit(1)
+                print RESULT_MSG + " " + json.dumps(result)
+                sys.stdout.flush()
+        except:
+            # Workers are not left running if probing fails or times out, editor probes remaining files.
+            pool.terminate()
+            raise
+        pool.close()
+        pool.join()
+
+    print DONE_MSG
+    sys.stdout.flush()
+
+def _init_worker(profile_desc):
+    global _thumbnailer
+    _thumbnailer = projectdata.Thumbnailer()
+    _thumbnailer.set_context(mltprofiles.get_profile(profile_desc))
+
+def _probe_file(file_path):
+    # Runs in worker process
+    try:
+        media_type, icon_path, length, info = projectdata.get_media_file_data(file_path, _thumbnailer)
+    except projectdata.ProducerNotValidError as err:
+        return {"error":err.value}
+
+    return {"media_type":media_type, "icon_path":icon_path, "length":length, "info":info}
@@ -40,15 +40,19 @@ from editorstate import current_sequence
 import editorstate
 import gui
 import jackaudio
+import lazyimport
 import mltenv
 import mltfilters
 import mlttransitions
 import projectdata
 import patternproducer
-import profilesmanager
+import probecache
 import renderconsumer
 import respaths
 
+# Imported on first use, see lazyimport.py
+profilesmanager = lazyimport.lazy_import("profilesmanager")
+
 profile_manager_dialog = None
 
 # ---------------------------------------------- recreate icons
@@ -77,7 +81,7 @@ class RecreateIconsThread(threading.Thread):
                     icon_path = respaths.IMAGE_PATH + "audio_file.png"
                     media_file.info = None
                 else:
-                    (icon_path, length, info) = projectdata.thumbnailer.write_image(media_file.path)
+                    (icon_path, length, info) = projectdata.thumbnailer.write_image(media_file.path, False)
                     media_file.info = info
                 media_file.icon_path = icon_path
                 media_file.create_icon()
@@ -90,6 +94,8 @@ class RecreateIconsThread(threading.Thread):
             time.sleep(0.01)
             Gdk.threads_leave()
 
+        probecache.save()
+
         # Update editor gui
         Gdk.threads_enter()
         recreate_progress_window.destroy()
@@ -24,21 +24,24 @@ from gi.repository import Gtk
 
 import appconsts
 import audiomonitoring
-import batchrendering
 import editevent
 import editorpersistance
 import editorstate
 import glassbuttons
-import gmic
 import gui
 import guicomponents
 import guiutils
+import lazyimport
 import respaths
-import titler
 import tlineaction
 import updater
 import undo
 
+# Imported on first use, see lazyimport.py
+batchrendering = lazyimport.lazy_import("batchrendering")
+gmic = lazyimport.lazy_import("gmic")
+titler = lazyimport.lazy_import("titler")
+
 # editor window object
 # This needs to be set here because gui.py module ref is not available at init time
 w = None
@@ -164,8 +167,8 @@ def _create_buttons(editor_window):
     
     editor_window.tools_buttons = glassbuttons.GlassButtonsGroup(30, 23, 2, 14, 7)
     editor_window.tools_buttons.add_button(cairo.ImageSurface.create_from_png(IMG_PATH + "open_mixer.png"), audiomonitoring.show_audio_monitor)
-    editor_window.tools_buttons.add_button(cairo.ImageSurface.create_from_png(IMG_PATH + "open_titler.png"), titler.show_titler)
-    editor_window.tools_buttons.add_button(cairo.ImageSurface.create_from_png(IMG_PATH + "open_gmic.png"), gmic.launch_gmic)
+    editor_window.tools_buttons.add_button(cairo.ImageSurface.create_from_png(IMG_PATH + "open_titler.png"), lambda :titler.show_titler())
+    editor_window.tools_buttons.add_button(cairo.ImageSurface.create_from_png(IMG_PATH + "open_gmic.png"), lambda :gmic.launch_gmic())
     editor_window.tools_buttons.add_button(cairo.ImageSurface.create_from_png(IMG_PATH + "open_renderqueue.png"), lambda :batchrendering.launch_batch_rendering())
     editor_window.tools_buttons.widget.set_tooltip_text(_("Audio Mixer\nTitler\nG'Mic Effects\nBatch Render Queue"))
     editor_window.tools_buttons.no_decorations = True
@@ -20,13 +20,26 @@
 
 """
 Module checks environment for available codecs and formats.
+
+Detection starts avformat consumers and lists all repository services which is slow,
+and it is done in editor and every helper process on launch. Detected environment
+is cached in hidden user dir and is used while MLT version, MLT plugin folders and
+loaded libav* libraries stay the same. Launch with '-refresh-env' to force detection.
 """
+import cPickle
 from gi.repository import GObject
 import mlt
+import os
+import sys
 
 import dialogutils
 import editorstate
 import gui
+import utils
+
+ENV_CACHE_FILE = "mlt_env_cache"
+ENV_CACHE_VERSION = 1
+FORCE_REFRESH_ARG = "-refresh-env"
 
 acodecs = None
 vcodecs = None
@@ -36,15 +49,21 @@ transitions = None
 
 environment_detection_success = False
 
-def check_available_features(repo):
+def check_available_features(repo, force_refresh=False):
+    global acodecs, vcodecs, formats, services, transitions, environment_detection_success
+
+    if force_refresh == False and FORCE_REFRESH_ARG not in sys.argv:
+        cached = _load_cached_environment()
+        if cached != None:
+            acodecs, vcodecs, formats, services, transitions = cached
+            environment_detection_success = True
+            print "MLT environment loaded from cache, " + str(len(formats)) + " formats, "  \
+            + str(len(vcodecs)) + " video codecs, " + str(len(acodecs)) + " audio codecs and " \
+            + str(len(services)) + " MLT services."
+            return
+
     try:
         print "Detecting environment..."
-        global acodecs        
-        global vcodecs    
-        global formats
-        global services
-        global transitions
-        global environment_detection_success
         acodecs = []
         vcodecs = []
         formats = []
@@ -94,6 +113,9 @@ def check_available_features(repo):
     except:
         print "Environment detection failed, environment unknown."
         GObject.timeout_add(2000, _show_failed_environment_info)
+        return
+
+    _save_cached_environment()
 
 def render_profile_supported(frmt, vcodec, acodec):
     if environment_detection_success == False:
@@ -128,3 +150,78 @@ def _show_failed_environment_info():
 
     
     
+
+
+# --------------------------------------------------- environment cache
+def _get_environment_key():
+    """
+    Returns value that changes when MLT or codec libraries are updated.
+    """
+    try:
+        mlt_version = mlt.LIBMLT_VERSION
+    except:
+        mlt_version = "0.0.99"
+
+    # Loaded MLT and libav* libraries, MLT plugins are loaded by mlt.Factory().init()
+    lib_paths = set()
+    try:
+        maps = open("/proc/self/maps")
+        for line in maps:
+            parts = line.split()
+            if len(parts) < 6:
+                continue
+            lib_name = os.path.basename(parts[5])
+            if lib_name.startswith("libmlt") or lib_name.startswith("libav"):
+                lib_paths.add(parts[5])
+        maps.close()
+    except IOError:
+        pass # not Linux, key is MLT version and plugin folders only
+
+    # Plugin folders change when plugins are added, removed or replaced
+    plugin_dirs = set()
+    if os.getenv("MLT_REPOSITORY") != None:
+        plugin_dirs.add(os.getenv("MLT_REPOSITORY"))
+    for lib_path in lib_paths:
+        if os.path.basename(lib_path).startswith("libmlt"):
+            lib_dir = os.path.dirname(lib_path)
+            for plugin_dir_name in ("mlt", "mlt-7"):
+                if os.path.isdir(os.path.join(lib_dir, plugin_dir_name)):
+                    plugin_dirs.add(os.path.join(lib_dir, plugin_dir_name))
+
+    mtimes = []
+    for path in sorted(lib_paths | plugin_dirs):
+        try:
+            mtimes.append((path, os.path.getmtime(path)))
+        except OSError:
+            pass
+
+    return (mlt_version, tuple(mtimes))
+
+def _load_cached_environment():
+    cache_path = utils.get_hidden_user_dir_path() + ENV_CACHE_FILE
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        cache_file = open(cache_path, "rb")
+        version, key, environment = cPickle.load(cache_file)
+        cache_file.close()
+    except Exception as e:
+        print "MLT environment cache load failed:", e
+        return None
+
+    if version != ENV_CACHE_VERSION or key != _get_environment_key():
+        return None
+    return environment
+
+def _save_cached_environment():
+    cache_path = utils.get_hidden_user_dir_path() + ENV_CACHE_FILE
+    environment = (acodecs, vcodecs, formats, services, transitions)
+    try:
+        # Helper processes may save at the same time, temp file is unique to process
+        temp_path = cache_path + "." + str(os.getpid())
+        cache_file = open(temp_path, "wb")
+        cPickle.dump((ENV_CACHE_VERSION, _get_environment_key(), environment), cache_file, cPickle.HIGHEST_PROTOCOL)
+        cache_file.close()
+        os.rename(temp_path, cache_path)
+    except Exception as e:
+        print "MLT environment cache save failed:", e
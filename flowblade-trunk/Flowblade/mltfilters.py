@@ -31,6 +31,7 @@ import mlt
 import xml.dom.minidom
 
 import appconsts
+import descriptorcache
 import editorstate
 from editorstate import PROJECT
 import mltrefhold
@@ -61,7 +62,6 @@ MULTIPART_START = "multistartprop" # name of property into which value at start
 MULTIPART_END = "multiendprop" # name of property into which value at start of part-filter is set 
 
 # Document
-filters_doc = None
 
 # Filters are saved as tuples of group name and array of FilterInfo objects.
 groups = []
@@ -369,15 +369,12 @@ def load_filters_xml(services):
     _load_icons()
     
     print "Loading filters..."
-    
-    global filters_doc
-    filters_doc = xml.dom.minidom.parse(respaths.FILTERS_XML_DOC)
 
-    load_groups = {}
-    filter_nodes = filters_doc.getElementsByTagName(FILTER)
-    for f_node in filter_nodes:
-        filter_info = FilterInfo(f_node)
+    # Parsed FilterInfo objects are cached, available filters are selected here every time
+    filter_infos = descriptorcache.load("filters", [respaths.FILTERS_XML_DOC], _parse_filters_xml)
 
+    load_groups = {}
+    for filter_info in filter_infos:
         if filter_info.mlt_drop_version != "":
             if editorstate.mlt_version_is_equal_or_greater(filter_info.mlt_drop_version):
                 print filter_info.name + " dropped, MLT version too high for this filter."
@@ -421,6 +418,13 @@ def load_filters_xml(services):
         add_group = sorted(group, key=lambda finfo: translations.get_filter_name(finfo.name) )
         groups.append((gkey, add_group))
 
+def _parse_filters_xml():
+    filters_doc = xml.dom.minidom.parse(respaths.FILTERS_XML_DOC)
+    filter_infos = []
+    for f_node in filters_doc.getElementsByTagName(FILTER):
+        filter_infos.append(FilterInfo(f_node))
+    return filter_infos
+
 def clone_filter_object(filter_object, mlt_profile):
     """
     Creates new filter object with with copied properties values.
@@ -19,7 +19,12 @@
 """
 
 """
-MLT framework profiles. 
+MLT framework profiles.
+
+Profile files are read into ProfileEntry objects indexed by description and by
+(width, height, fps, progressive) values used for matching media to profiles.
+mlt.Profile objects are created only when a profile is used, and entries are kept
+between reloads while profile file stays unchanged.
 """
 import os
 import mlt
@@ -32,19 +37,64 @@ import utils
 USER_PROFILES_DIR = "user_profiles/"
 DEFAULT_DEFAULT_PROFILE = "DV/DVD PAL"
 
-# List of mlt profiles
+# List of [description, ProfileEntry] pairs
 _profile_list = []
 _factory_profiles = []
 _hidden_factory_profiles = []
 _user_profiles = []
 
+# Lookup indexes into _profile_list, built in load_profile_list()
+_name_index = {} # description -> index
+_size_fps_index = {} # (width, height, fps) -> (first progressive index, first index)
+_size_index = {} # (width, height) -> (first progressive index, first index)
+_fps_index = {} # fps -> (first progressive index, first index)
+_first_progressive_index = -1
+
+_loaded_entries = {} # file path -> ProfileEntry, kept between reloads
+
+
+class ProfileEntry:
+    """
+    Profile values read from profile file, mlt.Profile object is created on first use.
+    """
+    def __init__(self, file_path, mtime):
+        self.file_path = file_path
+        self.mtime = mtime
+        self.profile = None
+
+        values = _read_profile_file(file_path)
+        try:
+            self.description = values["description"]
+            self.width = int(values["width"])
+            self.height = int(values["height"])
+            self.fps_num = int(values["frame_rate_num"])
+            self.fps_den = int(values["frame_rate_den"])
+            self.progressive = int(values.get("progressive", "0")) != 0
+        except (KeyError, ValueError):
+            # Let MLT figure out files we can't read
+            profile = self.get_profile()
+            self.description = profile.description()
+            self.width = profile.width()
+            self.height = profile.height()
+            self.fps_num = profile.frame_rate_num()
+            self.fps_den = profile.frame_rate_den()
+            self.progressive = profile.progressive() != 0
+
+        self.fps = round(float(self.fps_num) / float(self.fps_den), 1)
+
+    def get_profile(self):
+        if self.profile == None:
+            self.profile = mlt.Profile(self.file_path)
+            self.profile.file_path = self.file_path
+        return self.profile
+
 
 def load_profile_list():
     """ 
-    Creates a list of MLT profile objects.
-    Called at app start.
+    Creates lists of profile entries and lookup indexes.
+    Called at app start and when profiles are added, removed or hidden.
     """
-    global _profile_list,_factory_profiles, _hidden_factory_profiles, _user_profiles, _proxy_profiles
+    global _profile_list,_factory_profiles, _hidden_factory_profiles, _user_profiles
 
     user_profiles_dir = utils.get_hidden_user_dir_path() + USER_PROFILES_DIR
     _user_profiles = _load_profiles_list(user_profiles_dir)
@@ -57,45 +107,88 @@ def load_profile_list():
     _hidden_factory_profiles.sort(_sort_profiles)
     _user_profiles.sort(_sort_profiles)
 
+    _build_indexes()
+
 def _load_profiles_list(dir_path):
     load_profiles = []
-    file_list = os.listdir(dir_path)
-    for fname in file_list:
-        ## Feb-2017 - SvdB - Filter out duplicate profiles based on profile name
-        found_duplicate = False
-        
+    # Feb-2017 - SvdB - Filter out duplicate profiles based on profile name
+    descriptions = set()
+    for fname in sorted(os.listdir(dir_path)):
         file_path = dir_path + fname
-        profile = mlt.Profile(file_path)
-        profile.file_path = file_path
-        load_profiles.append([profile.description(), profile])
-        
-        # Feb-2017 - SvdB - Filter out duplicate profiles based on profile name
-        for enu_count, prof in enumerate(load_profiles):
-            for prof_idx, prof_name in enumerate(prof):
-                if prof_name == profile.description():
-                    found_duplicate = True
-        if found_duplicate == False:
-            load_profiles.append([profile.description(), profile])
+        entry = _get_entry(file_path)
+        if entry == None or entry.description in descriptions:
+            continue
+        descriptions.add(entry.description)
+        load_profiles.append([entry.description, entry])
     
     return load_profiles
 
+def _get_entry(file_path):
+    try:
+        mtime = os.stat(file_path).st_mtime
+    except OSError:
+        return None
+
+    try:
+        entry = _loaded_entries[file_path]
+        if entry.mtime == mtime:
+            return entry
+    except KeyError:
+        pass
+
+    entry = ProfileEntry(file_path, mtime)
+    _loaded_entries[file_path] = entry
+    return entry
+
+def _read_profile_file(file_path):
+    values = {}
+    try:
+        profile_file = open(file_path)
+        for line in profile_file:
+            key, sep, value = line.partition("=")
+            if sep == "=":
+                values[key.strip()] = value.strip()
+        profile_file.close()
+    except IOError:
+        pass
+    return values
+
 def _load_factory_profiles():
     global _factory_profiles, _hidden_factory_profiles
     factory_profiles_all = _load_profiles_list(respaths.PROFILE_PATH)
+    hidden_names = set(editorpersistance.prefs.hidden_profile_names)
     visible_profiles = []
     hidden_profiles = []
     for profile in factory_profiles_all:
-        blocked = False
-        for hidden_name in editorpersistance.prefs.hidden_profile_names:
-            if hidden_name == profile[0]:
-                blocked = True
-        if blocked == False:
-            visible_profiles.append(profile)
-        else:
+        if profile[0] in hidden_names:
             hidden_profiles.append(profile)
+        else:
+            visible_profiles.append(profile)
     _factory_profiles = visible_profiles
     _hidden_factory_profiles = hidden_profiles
-    
+
+def _build_indexes():
+    global _name_index, _size_fps_index, _size_index, _fps_index, _first_progressive_index
+    _name_index = {}
+    _size_fps_index = {}
+    _size_index = {}
+    _fps_index = {}
+    _first_progressive_index = -1
+    for i in range(0, len(_profile_list)):
+        name, entry = _profile_list[i]
+        _name_index.setdefault(name, i)
+        _add_match_index(_size_fps_index, (entry.width, entry.height, entry.fps), i, entry.progressive)
+        _add_match_index(_size_index, (entry.width, entry.height), i, entry.progressive)
+        _add_match_index(_fps_index, entry.fps, i, entry.progressive)
+        if entry.progressive and _first_progressive_index == -1:
+            _first_progressive_index = i
+
+def _add_match_index(index, key, i, progressive):
+    progressive_index, first_index = index.get(key, (-1, i))
+    if progressive and progressive_index == -1:
+        progressive_index = i
+    index[key] = (progressive_index, first_index)
+
 def get_profiles():
     return _profile_list
 
@@ -109,16 +202,17 @@ def get_user_profiles():
     return _user_profiles
 
 def get_profile(profile_name):
-    for fname, profile in _profile_list:
-        if profile_name == profile.description():
-            return profile
+    try:
+        return get_profile_for_index(_name_index[profile_name])
+    except KeyError:
+        return None
     
 def get_profile_for_index(index):
-    profile_name, profile = _profile_list[index]
-    return profile
+    profile_name, entry = _profile_list[index]
+    return entry.get_profile()
 
 def get_profile_name_for_index(index):
-    profile_name, profile = _profile_list[index]
+    profile_name, entry = _profile_list[index]
     return profile_name
     
 def get_default_profile():
@@ -135,19 +229,15 @@ def get_default_profile_index():
         def_profile_name =  DEFAULT_DEFAULT_PROFILE
         if def_profile_index == -1:
             def_profile_index = 0
-            def_profile_name, profile = _profile_list[def_profile_index]
+            def_profile_name = get_profile_name_for_index(def_profile_index)
             print "DEFAULT_DEFAULT_PROFILE deleted returning first profile"
         editorpersistance.prefs.default_profile_name = def_profile_name
         editorpersistance.save()
     return def_profile_index
     
 def get_index_for_name(lookup_profile_name):
-    # fails if two profiles have same names
-    for i in range(0, len(_profile_list)):
-        profile = _profile_list[i]
-        if lookup_profile_name == profile[0]:
-            return i
-    return -1
+    # Returns first profile index if two profiles have same names
+    return _name_index.get(lookup_profile_name, -1)
 
 def get_closest_matching_profile_index(producer_info):
     # producer_info is dict from utils.get_file_producer_info
@@ -155,39 +245,23 @@ def get_closest_matching_profile_index(producer_info):
     height= producer_info["height"]
     fps_num =  producer_info["fps_num"]
     fps_den = producer_info["fps_den"]
-    progressive = producer_info["progressive"]
     fps = round(float(float(fps_num)/float(fps_den)), 1)
-    
-    # We calculate match score for all available profiles and return 
-    # the one with the highest score
-    current_match_index = -1
-    current_match_score = 0
-    for i in range(0, len(_profile_list)):
-        match_score = 0
-        name, profile = _profile_list[i]
-
-        prof_width = profile.width()
-        prof_height = profile.height()
-        prof_fps_num =  profile.frame_rate_num()
-        prof_fps_den = profile.frame_rate_den()
-        prof_progressive = profile.progressive()
-        prof_fps = round(float(float(prof_fps_num)/float(prof_fps_den)), 1)
-
-        if width == prof_width and height == prof_height:
-            match_score = match_score + 1000
-        if fps == prof_fps:
-            match_score = match_score + 100
-        if prof_progressive: # prefer progressive always
-            match_score = match_score + 10
-
-        if match_score > current_match_score:
-            current_match_score = match_score
-            current_match_index = i
-
-    if current_match_index == -1:
-        return get_default_profile_index()
-    
-    return current_match_index
+
+    # Match score is 1000 for size, 100 for fps and 10 for progressive, we prefer progressive always.
+    # Indexes give first profile with the highest score without scoring all profiles.
+    for index, key in ((_size_fps_index, (width, height, fps)), (_size_index, (width, height)), (_fps_index, fps)):
+        try:
+            progressive_index, first_index = index[key]
+        except KeyError:
+            continue
+        if progressive_index != -1:
+            return progressive_index
+        return first_index
+
+    if _first_progressive_index != -1:
+        return _first_progressive_index
+
+    return get_default_profile_index()
 
 def _sort_profiles(a, b):
     a_desc, a_profile = a
@@ -199,4 +273,3 @@ def _sort_profiles(a, b):
         return 1
     else:
         return 0
-
@@ -29,6 +29,7 @@ import xml.dom.minidom
 
 import appconsts
 import compositorfades
+import descriptorcache
 import mltrefhold
 import patternproducer
 import propertyparse
@@ -393,12 +394,11 @@ def load_compositors_xml(transitions):
     Load filters document and create MLTCompositorInfo objects and
     put them in dict mlt_compositor_infos with names as keys.
     """
-    compositors_doc = xml.dom.minidom.parse(respaths.COMPOSITORS_XML_DOC)
-
     print "Loading transitions..."
-    compositor_nodes = compositors_doc.getElementsByTagName(COMPOSITOR)
-    for c_node in compositor_nodes:
-        compositor_info = CompositorTransitionInfo(c_node)
+
+    # Parsed CompositorTransitionInfo objects are cached, available compositors are selected here every time
+    compositor_infos = descriptorcache.load("compositors", [respaths.COMPOSITORS_XML_DOC], _parse_compositors_xml)
+    for compositor_info in compositor_infos:
         if (not compositor_info.mlt_service_id in transitions) and len(transitions) > 0:
             print "MLT transition " + compositor_info.mlt_service_id + " not found."
             global not_found_transitions
@@ -407,6 +407,13 @@ def load_compositors_xml(transitions):
 
         mlt_compositor_transition_infos[compositor_info.name] = compositor_info
 
+def _parse_compositors_xml():
+    compositors_doc = xml.dom.minidom.parse(respaths.COMPOSITORS_XML_DOC)
+    compositor_infos = []
+    for c_node in compositors_doc.getElementsByTagName(COMPOSITOR):
+        compositor_infos.append(CompositorTransitionInfo(c_node))
+    return compositor_infos
+
 def get_wipe_resource_path_for_sorted_keys_index(sorted_keys_index):
     # This exists to avoid sending a list of sorted keys around or having to use global variables
     keys = wipe_lumas.keys()
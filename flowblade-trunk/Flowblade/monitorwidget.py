@@ -21,8 +21,6 @@ from gi.repository import Gdk
 from gi.repository import Gtk, GLib
 
 import cairo
-import mlt
-import numpy as np
 import os
 import threading
 import time
@@ -31,6 +29,7 @@ import utils
 import appconsts
 import cairoarea
 import editorstate
+import framegrabber
 from editorstate import PLAYER
 from editorstate import PROJECT
 import respaths
@@ -53,24 +52,15 @@ TC_LEFT_SIDE_PAD = 172
 TC_RIGHT_SIDE_PAD = 28
 TC_HEIGHT = 27
         
-MATCH_FRAME = "match_frame.png"
-
 MONITOR_INDICATOR_COLOR = utils.get_cairo_color_tuple_255_rgb(71, 131, 169)
 MONITOR_INDICATOR_COLOR_MATCH = utils.get_cairo_color_tuple_255_rgb(21, 71, 105)
 
 FRAME_MATCH_VIEW_COLOR = (0.3, 0.3, 0.3)
 
 # Continuos match frame update
-CONTINUOS_UPDATE_PAUSE = 0.2
-_last_render_time = 0.0
-_producer = None
-_consumer = None
-_frame_write_on = False
+_match_clip_path = None
             
 _widget = None
-
-def _get_match_frame_path():
-    return utils.get_hidden_user_dir_path() + appconsts.TRIM_VIEW_DIR + "/" + MATCH_FRAME
         
 class MonitorWidget:
     
@@ -168,13 +158,6 @@ class MonitorWidget:
         if PLAYER().is_rendering:
             return
 
-        # Delete match frame
-        try:
-            os.remove(_get_match_frame_path())
-        except:
-            # This fails when done first time ever  
-            pass
-        
         self.match_frame_surface = None
                 
         self.view = DEFAULT_VIEW
@@ -194,13 +177,6 @@ class MonitorWidget:
         if PLAYER().is_rendering:
             return
 
-        # Delete match frame
-        try:
-            os.remove(_get_match_frame_path())
-        except:
-            # This fails when done first time ever  
-            pass
-        
         self.match_frame_surface = None
                 
         self.view = FRAME_MATCH_VIEW
@@ -212,10 +188,8 @@ class MonitorWidget:
         self.clip_name = cname
         self.match_frame = frame
         
-        match_frame_write_thread = MonitorMatchFrameWriter(match_clip.path, frame, 
-                                                            MATCH_FRAME, self.match_frame_write_complete)
-                                        
-        match_frame_write_thread.start()
+        match_frame_grab_thread = MonitorMatchFrameGrabThread(match_clip.path, frame, self.match_frame_grab_complete)
+        match_frame_grab_thread.start()
         
     def set_start_trim_view(self, match_clip, edit_clip_start):
         if self.is_active(True) == False:
@@ -251,8 +225,8 @@ class MonitorWidget:
 
         self.match_frame = match_clip.clip_out
         self.match_not_updateble = False
-        data = (match_clip.path, match_clip.clip_out, MATCH_FRAME, self.match_frame_write_complete)
-        GLib.idle_add(_launch_match_frame_writer, data)
+        data = (match_clip.path, match_clip.clip_out, self.match_frame_grab_complete)
+        GLib.idle_add(_launch_match_frame_grab, data)
         
     def set_end_trim_view(self, match_clip, edit_clip_start):
         if self.is_active(True) == False:
@@ -288,8 +262,8 @@ class MonitorWidget:
             
         self.match_frame = match_clip.clip_in
         self.match_not_updateble = False
-        data = (match_clip.path, match_clip.clip_in, MATCH_FRAME, self.match_frame_write_complete)
-        GLib.idle_add(_launch_match_frame_writer, data)
+        data = (match_clip.path, match_clip.clip_in, self.match_frame_grab_complete)
+        GLib.idle_add(_launch_match_frame_grab, data)
         
     def set_roll_trim_right_active_view(self, match_clip, edit_clip_start):
         if self.is_active() == False:
@@ -325,8 +299,8 @@ class MonitorWidget:
             
         self.match_frame = match_clip.clip_out
         self.match_not_updateble = False
-        data = (match_clip.path, match_clip.clip_out, MATCH_FRAME, self.match_frame_write_complete)
-        GLib.idle_add(_launch_match_frame_writer, data)
+        data = (match_clip.path, match_clip.clip_out, self.match_frame_grab_complete)
+        GLib.idle_add(_launch_match_frame_grab, data)
         
     def set_roll_trim_left_active_view(self, match_clip, edit_clip_start):
         if self.is_active() == False:
@@ -362,8 +336,8 @@ class MonitorWidget:
             
         self.match_frame = match_clip.clip_in
         self.match_not_updateble = False
-        data = (match_clip.path, match_clip.clip_in, MATCH_FRAME, self.match_frame_write_complete)
-        GLib.idle_add(_launch_match_frame_writer, data)
+        data = (match_clip.path, match_clip.clip_in, self.match_frame_grab_complete)
+        GLib.idle_add(_launch_match_frame_grab, data)
         
     def set_slip_trim_right_active_view(self, match_clip):
         if self.is_active() == False:
@@ -400,8 +374,8 @@ class MonitorWidget:
             return
 
         self.match_not_updateble = False
-        data = (match_clip.path, match_clip.clip_in, MATCH_FRAME, self.match_frame_write_complete)
-        GLib.idle_add(_launch_match_frame_writer, data)
+        data = (match_clip.path, match_clip.clip_in, self.match_frame_grab_complete)
+        GLib.idle_add(_launch_match_frame_grab, data)
 
     def set_slip_trim_left_active_view(self, match_clip):
         if self.is_active() == False:
@@ -439,8 +413,8 @@ class MonitorWidget:
             return
 
         self.match_not_updateble = False
-        data = (match_clip.path, match_clip.clip_out, MATCH_FRAME, self.match_frame_write_complete)
-        GLib.idle_add(_launch_match_frame_writer, data)
+        data = (match_clip.path, match_clip.clip_out, self.match_frame_grab_complete)
+        GLib.idle_add(_launch_match_frame_grab, data)
         
     # ------------------------------------------------------------------ LAYOUT
     def _layout_expand_edge_panels(self):
@@ -539,8 +513,8 @@ class MonitorWidget:
                 self.set_default_view_force()
             
     # ------------------------------------------------------------------ MATCH FRAME
-    def match_frame_write_complete(self, frame_name):
-        self.match_frame_surface = self.create_match_frame_image_surface(frame_name)
+    def match_frame_grab_complete(self, surface):
+        self.match_frame_surface = surface
         
         Gdk.threads_enter()
         self.left_display.queue_draw()
@@ -575,35 +549,6 @@ class MonitorWidget:
         self.left_display.queue_draw()
         self.right_display.queue_draw()
         
-    def create_match_frame_image_surface(self, frame_name):
-        # Create non-scaled surface
-        matchframe_path = utils.get_hidden_user_dir_path() + appconsts.TRIM_VIEW_DIR + "/" + frame_name 
-        
-        surface = cairo.ImageSurface.create_from_png(matchframe_path)
-
-        # Create and return scaled surface
-        profile_screen_ratio = float(PROJECT().profile.width()) / float(PROJECT().profile.height())
-        match_frame_width, match_frame_height = self.get_match_frame_panel_size()
-        
-        scaled_surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, int(match_frame_width), int(match_frame_height))
-        cr = cairo.Context(scaled_surface)
-        cr.scale(float(match_frame_width) / float(surface.get_width()), float(match_frame_height) / float(surface.get_height()))
-
-        cr.set_source_surface(surface, 0, 0)
-        cr.paint()
-        
-        return scaled_surface
-    
-    def _get_cairo_buf_from_mlt_rgb(self, screen_rgb_data, img_w, img_h ):
-        buf = np.fromstring(screen_rgb_data, dtype=np.uint8)
-        buf.shape = (img_h + 1, img_w, 4) # +1 in h, seemeed to need it
-        out = np.copy(buf)
-        r = np.index_exp[:, :, 0]
-        b = np.index_exp[:, :, 2]
-        out[r] = buf[b]
-        out[b] = buf[r]
-        return out
-        
     # ------------------------------------------------------------------ DRAW
     def _draw_match_frame_left(self, event, cr, allocation):
         if self.view == END_TRIM_VIEW or self.view == ROLL_TRIM_LEFT_ACTIVE_VIEW:
@@ -857,59 +802,34 @@ class MonitorWidget:
 
     
 # ---------------------------------------------------------------------------------- match frame cration
-def _launch_match_frame_writer(data):
-    match_clip_path, clip_frame, frame_name, callback = data        
+def _launch_match_frame_grab(data):
+    match_clip_path, clip_frame, callback = data        
 
-    match_frame_write_thread = MonitorMatchFrameWriter(match_clip_path, clip_frame, frame_name, callback)
-    match_frame_write_thread.start()
+    match_frame_grab_thread = MonitorMatchFrameGrabThread(match_clip_path, clip_frame, callback)
+    match_frame_grab_thread.start()
 
 
-class MonitorMatchFrameWriter(threading.Thread):
-    def __init__(self, clip_path, clip_frame, frame_name, completion_callback):
+class MonitorMatchFrameGrabThread(threading.Thread):
+    def __init__(self, clip_path, clip_frame, completion_callback):
         self.clip_path = clip_path
         self.clip_frame = clip_frame
         self.completion_callback = completion_callback
-        self.frame_name = frame_name
         threading.Thread.__init__(self)
         
     def run(self):
         """
-        Writes thumbnail image from file producer
+        Creates match frame surface from file producer
         """
-        # Create consumer
-        matchframe_path = utils.get_hidden_user_dir_path() + appconsts.TRIM_VIEW_DIR + "/" + self.frame_name
-        consumer = mlt.Consumer(PROJECT().profile, "avformat", matchframe_path)
-        consumer.set("real_time", 0)
-        consumer.set("vcodec", "png")
-
-        # Create one frame producer
-        producer = mlt.Producer(PROJECT().profile, str(self.clip_path))
-        producer.set("mlt_service", "avformat-novalidate")
-        producer = producer.cut(int(self.clip_frame), int(self.clip_frame))
-
-        # Delete match frame
-        try:
-            os.remove(matchframe_path)
-        except:
-            # This fails when done first time ever  
-            pass
-        
-        # Save producer and consumer for view needing continues match frame update
-        global _producer, _consumer
-        if _widget.view != START_TRIM_VIEW and _widget.view != END_TRIM_VIEW:
-            _producer = producer
-            _consumer = consumer
+        size = _widget.get_match_frame_panel_size()
+        surface = framegrabber.get_frame_surface(self.clip_path, self.clip_frame, *size)
 
-        # Connect and write image
-        consumer.connect(producer)
-        consumer.run()
-        
-        # Wait until new file exists
-        while os.path.isfile(matchframe_path) != True:
-            time.sleep(0.1)
+        # Save clip path for view needing continues match frame update
+        global _match_clip_path
+        if _widget.view != START_TRIM_VIEW and _widget.view != END_TRIM_VIEW:
+            _match_clip_path = self.clip_path
 
         # Do completion callback
-        self.completion_callback(self.frame_name)
+        self.completion_callback(surface)
 
 
 class MatchSurfaceCreator(threading.Thread):
@@ -918,35 +838,15 @@ class MatchSurfaceCreator(threading.Thread):
         threading.Thread.__init__(self)
         
     def run(self):
-        # Create new producer to get mlt frame data
-        while _producer == None:
-            print "MatchSurfaceCreator: waiting for _producer"
+        while _match_clip_path == None:
+            print "MatchSurfaceCreator: waiting for _match_clip_path"
             time.sleep(0.01)
-            
-        image_producer = _producer.cut(int(self.match_frame), int(self.match_frame))
-        image_producer.set_speed(0)
-        image_producer.seek(0)
-        
-        # Get MLT rgb frame data
-        frame = image_producer.get_frame()
-        # And make sureto deinterlace if input is interlaced
-        frame.set("consumer_deinterlace", 1)
+
         size = _widget.get_match_frame_panel_size()
-        mlt_rgb = frame.get_image(mlt.mlt_image_rgb24a, *size) 
-   
-        # Create cairo surface
-        cairo_buf = _widget._get_cairo_buf_from_mlt_rgb(mlt_rgb, *size)
-        img_w, img_h = size
-        stride = cairo.ImageSurface.format_stride_for_width(cairo.FORMAT_RGB24, img_w)
-        surface = cairo.ImageSurface.create_for_data(cairo_buf, cairo.FORMAT_RGB24, img_w, img_h, stride)
-        
-        _widget.match_frame_surface = surface
+        _widget.match_frame_surface = framegrabber.get_frame_surface(_match_clip_path, self.match_frame, *size)
         
         # Repaint
         Gdk.threads_enter()
         _widget.left_display.queue_draw()
         _widget.right_display.queue_draw()
         Gdk.threads_leave()
-        
-        
-        
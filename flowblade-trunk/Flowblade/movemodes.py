@@ -28,6 +28,7 @@ from gi.repository import Gtk, Gdk
 
 import appconsts
 import boxmove
+import clipindex
 import dialogutils
 import editorpersistance # Jul-2016 - SvdB - For play/pause button
 import editorstate
@@ -211,7 +212,7 @@ def insert_move_release(x, y, frame, state):
     # Get tracks and insert index
     track = edit_data["track_object"]
     to_track = edit_data["to_track_object"]
-    insert_index = to_track.get_clip_index_at(attempt_insert_frame)
+    insert_index = clipindex.get_clip_index_at(to_track, attempt_insert_frame)
     
     # Check locking of target track. Source track checked at press event.
     if _track_is_locked(to_track):
@@ -222,7 +223,7 @@ def insert_move_release(x, y, frame, state):
 
     # Update data for editmode overlay
     edit_data["current_frame"] = frame
-    edit_data["insert_frame"] = track.clip_start(insert_index)
+    edit_data["insert_frame"] = clipindex.clip_start(track, insert_index)
 
     # Collect selection data
     range_in = edit_data["selected_range_in"]
@@ -252,7 +253,7 @@ def insert_move_release(x, y, frame, state):
             select_index = insert_index
             if (range_in < insert_index):#when moving forward clips are removed affecting later indexes
                 select_index = insert_index - (old_range_length + 1)
-            PLAYER().seek_frame(track.clip_start(select_index), False)
+            PLAYER().seek_frame(clipindex.clip_start(track, select_index), False)
         else:
             _move_mode_released()
     else: # insert to different track 
@@ -260,7 +261,7 @@ def insert_move_release(x, y, frame, state):
         clear_selected_clips()
         action = edit.multitrack_insert_move_action(data)
         action.do_edit()
-        PLAYER().seek_frame(to_track.clip_start(insert_index), False)
+        PLAYER().seek_frame(clipindex.clip_start(to_track, insert_index), False)
 
     # Clear edit mode data
     edit_data = None
@@ -513,7 +514,7 @@ def _move_mode_pressed(event, frame):
         clip_lengths.append(clip.clip_out - clip.clip_in + 1)
 
     # Overwrite mode ignores this
-    insert_frame = track.clip_start(selected_range_in)
+    insert_frame = clipindex.clip_start(track, selected_range_in)
     
     # Set edit mode data. This is not used unless mouse delta big enough
     # to initiate move.
@@ -561,9 +562,9 @@ def _move_mode_move(frame, x, y):
     edit_data["to_track_object"] = to_track
 
     # Get index for insert in target track
-    insert_index = to_track.get_clip_index_at(attempt_insert_frame)
+    insert_index = clipindex.get_clip_index_at(to_track, attempt_insert_frame)
     edit_data["insert_index"] = insert_index
-    edit_data["insert_frame"] = to_track.clip_start(insert_index)
+    edit_data["insert_frame"] = clipindex.clip_start(to_track, insert_index)
     
     _set_current_move_frame_and_check_move_start(frame, x, y)
 
@@ -21,20 +21,23 @@
 """
 Module for saving and loading projects.
 
-Main functionality of the module is to replace unpickleable 
-SwigPyObject MLT objects with pickleable python objects for save, 
-and then create MLT objects from pickled objects when project is loaded.
+Main functionality of the module is to replace SwigPyObject MLT objects 
+that can't be saved with python objects for save, 
+and then create MLT objects from saved objects when project is loaded.
 """
 
+import base64
 import copy
+import cPickle
+import datetime
 import glob
 import fnmatch
+import importlib
+import json
 import os
-import pickle
+import struct
 import time
-
-from gi.repository import Gtk
-from gi.repository import Gdk
+import types
 
 import appconsts
 import editorstate
@@ -51,7 +54,7 @@ import utils
 # These are removed at save and recreated at load.
 PROJECT_REMOVE = ['profile','c_seq']
 SEQUENCE_REMOVE = ['profile','field','multitrack','tractor','monitor_clip','vectorscope','audiowave','rgbparade','outputfilter','watermark_filter']
-PLAY_LIST_REMOVE = ['this','sequence','get_name','gain_filter','pan_filter']
+PLAY_LIST_REMOVE = ['this','sequence','get_name','gain_filter','pan_filter','clip_starts_index']
 CLIP_REMOVE = ['this','clip_length']
 TRANSITION_REMOVE = ['this']
 FILTER_REMOVE = ['mlt_filter','mlt_filters']
@@ -60,6 +63,53 @@ MEDIA_FILE_REMOVE = ['icon']
 # Used to flag a not found relative path
 NOT_FOUND = "/not_found_not_found/not_found"
 
+# Project file format.
+# File is a header followed by records that each have a record header and a JSON payload. 
+# Records are PROJECT, MEDIA_FILE for every media file and for every sequence SEQUENCE, TRACK for 
+# every track and COMPOSITORS, and last END.
+# Files without header are projects saved as a single pickled object by earlier versions,
+# and format version 1 files have pickled payloads.
+#
+# Autosave appends journal segments after END record of a full save. A segment has 
+# a PROJECT record with MEDIA_FILE records if project data changed, and 
+# SEQUENCE_INDEX, SEQUENCE, TRACK.., COMPOSITORS records for every changed sequence, and END.
+# Segments are applied on load in order, segment without END is ignored.
+PROJECT_FILE_MAGIC = "FBPRJREC"
+PROJECT_FILE_FORMAT_VERSION = 2
+PICKLE_PAYLOADS_FORMAT_VERSION = 1
+PROJECT_FILE_HEADER = struct.Struct("<8sH") # magic, format version
+RECORD_HEADER = struct.Struct("<BI") # record type, payload length
+
+PROJECT_RECORD = 1
+MEDIA_FILE_RECORD = 2
+SEQUENCE_RECORD = 3
+TRACK_RECORD = 4
+COMPOSITORS_RECORD = 5
+END_RECORD = 6
+SEQUENCE_INDEX_RECORD = 7
+
+# Record payload is JSON object {"version":RECORD_DATA_VERSION, "data":<encoded value>}.
+# Values are encoded as JSON values and JSON objects that have one type key:
+#   str                  JSON string, or {"__bytes__":base64 string} if not utf-8
+#   unicode              {"__unicode__":string}
+#   tuple, set           {"__tuple__":[values]}, {"__set__":[values]}
+#   dict                 {"__dict__":[[key, value], ...]}
+#   datetime             {"__datetime__":[year, month, day, hour, minute, second, microsecond]}
+#   object               {"__object__":"module.Class", "__id__":n, "fields":[[attr, value], ...]}
+#   repeated object      {"__ref__":n}
+# Lists of values keep the order in which values were written, so that object is always
+# created before a reference to it is read.
+# Objects are saved by their attributes and only classes in PROJECT_DATA_MODULES are saved 
+# and created on load. Most of these modules import GUI modules, so loading a project
+# imports them like unpickling did. Objects referenced many times in a record, like project.c_bin, are
+# the same object again after load.
+RECORD_DATA_VERSION = 2
+
+# Set True to decode every written record and print differences to saved objects.
+CHECK_RECORD_ROUND_TRIP = False
+PROJECT_DATA_MODULES = ["edit", "medialog", "miscdataobjects", "mlt", "mltfilters", 
+                        "mlttransitions", "patternproducer", "projectdata", "sequence"]
+
 # Used to send messages when loading project
 load_dialog = None
 
@@ -83,6 +133,9 @@ snapshot_paths = None
 
 # Used to compute in/out points when saving to change profile
 _fps_conv_mult = 1.0
+
+# Class path -> class for classes of objects created from project file records
+_loaded_classes = {}
     
 class FileProducerNotFoundError(Exception):
     """
@@ -105,6 +158,8 @@ class ProjectProfileNotFoundError(Exception):
 # -------------------------------------------------- LOAD MESSAGES
 def _show_msg(msg, delay=0.0):
     if show_messages == True:
+        # Imported here so that projects can be loaded without GUI modules when messages are off.
+        from gi.repository import Gdk
         Gdk.threads_enter()
         load_dialog.info.set_text(msg)
         time.sleep(delay)
@@ -113,23 +168,105 @@ def _show_msg(msg, delay=0.0):
 # -------------------------------------------------- SAVE
 def save_project(project, file_path, changed_profile_desc=None):
     """
-    Creates pickleable project object
+    Writes copy of project into file
     """
     print "Save project " + os.path.basename(file_path)
-    
-    # Get shallow copy
-    s_proj = copy.copy(project)
-    
+    start_time = time.time()
+
+    records = get_project_records(project, changed_profile_desc)
+    write_project_file(file_path, records)
+
+    print "Project saved in " + str(round(time.time() - start_time, 3)) + "s"
+
+def get_project_records(project, changed_profile_desc=None):
+    """
+    Generates (record_type, object) tuples with saveable copies of all project data.
+    Mutable data is copied so that records can be written in another thread 
+    while project is being edited if they are all taken before that.
+    """
     # Implements "change profile" functionality
     global _fps_conv_mult
     _fps_conv_mult = 1.0
     if changed_profile_desc != None:
-        print mltprofiles.get_profile(changed_profile_desc), mltprofiles.get_profile(s_proj.profile_desc), s_proj.profile_desc
-        _fps_conv_mult = mltprofiles.get_profile(changed_profile_desc).fps() / mltprofiles.get_profile(s_proj.profile_desc).fps()
-        s_proj.profile_desc = changed_profile_desc
+        print mltprofiles.get_profile(changed_profile_desc), mltprofiles.get_profile(project.profile_desc), project.profile_desc
+        _fps_conv_mult = mltprofiles.get_profile(changed_profile_desc).fps() / mltprofiles.get_profile(project.profile_desc).fps()
         print "Saving changed profile project: ", changed_profile_desc
         print "FPS conversion multiplier:", _fps_conv_mult
 
+    for record in get_project_data_records(project, changed_profile_desc):
+        yield record
+
+    # Sequences, tracks are written one at a time as they are created
+    for seq in project.sequences:
+        for record in get_p_sequence_records(seq):
+            yield record
+
+    yield (END_RECORD, None)
+
+def get_project_journal_records(project, seq_indexes, write_project_data):
+    """
+    Generates records for journal segment with sequences in seq_indexes and optionally 
+    project data and media files. Segment is appended to a file written with save_project().
+    """
+    global _fps_conv_mult, project_proxy_mode, proxy_path_dict
+    _fps_conv_mult = 1.0
+    project_proxy_mode = project.proxy_data.proxy_mode
+    proxy_path_dict = {}
+    
+    # Proxy path dict for sequence clips is filled when media files are written.
+    if (project_proxy_mode == appconsts.CONVERTING_TO_USE_PROXY_MEDIA or 
+        project_proxy_mode == appconsts.CONVERTING_TO_USE_ORIGINAL_MEDIA):
+        write_project_data = True
+
+    if write_project_data:
+        for record in get_project_data_records(project):
+            yield record
+
+    for seq_index in seq_indexes:
+        yield (SEQUENCE_INDEX_RECORD, seq_index)
+        for record in get_p_sequence_records(project.sequences[seq_index]):
+            yield record
+
+    yield (END_RECORD, None)
+
+def write_project_file(file_path, records, append=False, sync=False):
+    """
+    Encodes and writes records as they are taken from records iterable. New files are first written 
+    to a temp file that replaces file_path when done, so an interrupted write does not destroy 
+    an existing file.
+    """
+    if append:
+        write_file = open(file_path, "ab")
+    else:
+        write_path = file_path + ".tmp"
+        write_file = open(write_path, "wb")
+        write_file.write(PROJECT_FILE_HEADER.pack(PROJECT_FILE_MAGIC, PROJECT_FILE_FORMAT_VERSION))
+
+    for record_type, obj in records:
+        data = encode_record_data(obj)
+        if CHECK_RECORD_ROUND_TRIP:
+            _check_record_round_trip(record_type, obj, data)
+        write_file.write(RECORD_HEADER.pack(record_type, len(data)))
+        write_file.write(data)
+
+    if sync:
+        write_file.flush()
+        os.fsync(write_file.fileno())
+    write_file.close()
+
+    if not append:
+        os.rename(write_path, file_path)
+
+def get_project_data_records(project, changed_profile_desc=None):
+    """
+    Generates project record followed by media file records.
+    """
+    # Get shallow copy
+    s_proj = copy.copy(project)
+    
+    if changed_profile_desc != None:
+        s_proj.profile_desc = changed_profile_desc
+
     # Set current sequence index
     s_proj.c_seq_index = project.sequences.index(project.c_seq)
     
@@ -142,11 +279,28 @@ def save_project(project, file_path, changed_profile_desc=None):
     project_proxy_mode = s_proj.proxy_data.proxy_mode
     proxy_path_dict = {}
 
-    # Replace media file objects with pickleable copys
-    media_files = {}
-    for k, v in s_proj.media_files.iteritems():
+    # Media files and sequences are written as their own records
+    s_proj.media_files = {}
+    s_proj.sequences = []
+
+    # Remove unpickleable attributes
+    remove_attrs(s_proj, PROJECT_REMOVE)
+
+    # Copy bins, events, media log and properties, and data objects edited in place
+    copy_mutable_attrs(s_proj)
+    s_proj.proxy_data = copy.copy(project.proxy_data)
+    try:
+        s_proj.c_bin = s_proj.bins[project.bins.index(project.c_bin)]
+    except ValueError:
+        pass
+
+    yield (PROJECT_RECORD, s_proj)
+
+    # Saveable copies of media file objects
+    for k, v in project.media_files.iteritems():
         s_media_file = copy.copy(v)
         remove_attrs(s_media_file, MEDIA_FILE_REMOVE)
+        copy_mutable_attrs(s_media_file)
         
         # Convert media files between original and proxy files
         if project_proxy_mode == appconsts.CONVERTING_TO_USE_PROXY_MEDIA:
@@ -165,23 +319,23 @@ def save_project(project, file_path, changed_profile_desc=None):
             if s_media_file.type != appconsts.PATTERN_PRODUCER and  s_media_file.type != appconsts.IMAGE_SEQUENCE:
                 s_media_file.path = snapshot_paths[s_media_file.path] 
 
-        media_files[s_media_file.id] = s_media_file
+        yield (MEDIA_FILE_RECORD, s_media_file)
 
-    s_proj.media_files = media_files
-
-    # Replace sequences with pickleable objects
-    sequences = []
-    for i in range(0, len(project.sequences)):
-        add_seq = project.sequences[i]
-        sequences.append(get_p_sequence(add_seq))
-    s_proj.sequences = sequences
-
-    # Remove unpickleable attributes
-    remove_attrs(s_proj, PROJECT_REMOVE)
+def get_p_sequence_records(sequence):
+    """
+    Generates sequence record followed by track records and compositors record.
+    """
+    s_seq = copy.copy(sequence)
+    s_seq.tracks = []
+    s_seq.compositors = []
+    remove_attrs(s_seq, SEQUENCE_REMOVE)
+    copy_mutable_attrs(s_seq)
+    yield (SEQUENCE_RECORD, s_seq)
+    
+    for track in sequence.tracks:
+        yield (TRACK_RECORD, get_p_playlist(track))
 
-    # Write out file.
-    write_file = file(file_path, "wb")
-    pickle.dump(s_proj, write_file)
+    yield (COMPOSITORS_RECORD, get_p_compositors(sequence.compositors))
 
 def get_p_sequence(sequence):
     """
@@ -217,10 +371,11 @@ def get_p_playlist(playlist):
         clip = playlist.clips[i]
         add_clips.append(get_p_clip(clip))
 
-    s_playlist.clips = add_clips
-    
     # Remove unpicleable attributes
     remove_attrs(s_playlist, PLAY_LIST_REMOVE)
+    copy_mutable_attrs(s_playlist, ["clips"])
+
+    s_playlist.clips = add_clips
    
     return s_playlist
 
@@ -262,6 +417,8 @@ def get_p_clip(clip):
     # Don't save waveform data.
     s_clip.waveform_data = None
 
+    copy_mutable_attrs(s_clip, ["filters"])
+
     # Add pickleable filters
     s_clip.filters = filters
     
@@ -288,6 +445,7 @@ def get_p_filter(f):
     """
     s_filter = copy.copy(f)
     remove_attrs(s_filter, FILTER_REMOVE)
+    copy_mutable_attrs(s_filter)
     if f.info.multipart_filter == False:
         s_filter.is_multi_filter = False
     else:
@@ -299,8 +457,10 @@ def get_p_compositors(compositors):
     s_compositors = []
     for compositor in compositors:
         s_compositor = copy.copy(compositor)
+        copy_mutable_attrs(s_compositor)
         s_compositor.transition = copy.copy(compositor.transition)
         s_compositor.transition.mlt_transition = None
+        copy_mutable_attrs(s_compositor.transition)
         if _fps_conv_mult != 1.0:
             _update_compositor_in_out_for_fps_change(s_compositor)
 
@@ -316,6 +476,17 @@ def get_p_sync_data(sync_data):
     s_sync_data.master_clip = sync_data.master_clip.id
     return s_sync_data
 
+def copy_mutable_attrs(s_obj, skip_attrs=[]):
+    """
+    Replaces list, dict and set attribute values of shallow copy with deep copies,
+    so that copy does not share data that is edited on main thread while it is written.
+    """
+    for attr, value in s_obj.__dict__.items():
+        if attr in skip_attrs:
+            continue
+        if isinstance(value, (list, dict, set)):
+            s_obj.__dict__[attr] = copy.deepcopy(value)
+
 def remove_attrs(obj, remove_attrs):
     """
     Removes unpickleable attributes
@@ -333,14 +504,80 @@ def _update_clip_in_out_for_fps_change(s_clip):
 def _update_compositor_in_out_for_fps_change(s_compositor):
     s_compositor.clip_in = int(s_compositor.clip_in * _fps_conv_mult)
     s_compositor.clip_out = int(s_compositor.clip_out * _fps_conv_mult)
+
+def encode_record_data(obj):
+    """
+    Returns JSON payload for record object.
+    """
+    try:
+        data = _encode_value(obj, {}, False)
+        return json.dumps({"version":RECORD_DATA_VERSION, "data":data}, separators=(",", ":"))
+    except UnicodeDecodeError:
+        # Record has str values that are not utf-8, these are saved as bytes
+        data = _encode_value(obj, {}, True)
+        return json.dumps({"version":RECORD_DATA_VERSION, "data":data}, separators=(",", ":"))
+
+def _encode_value(value, memo, check_bytes):
+    # memo is object id -> __id__ for objects already encoded in record.
+    # Exact types are tested first because this is called for every value in project.
+    value_type = type(value)
+    if value_type is str:
+        if check_bytes:
+            try:
+                value.decode("utf-8")
+            except UnicodeDecodeError:
+                return {"__bytes__":base64.b64encode(value)}
+        return value
+    elif value is None or value_type is int or value_type is bool or value_type is float or value_type is long:
+        return value
+    elif value_type is unicode:
+        return {"__unicode__":value}
+    elif value_type is list:
+        return _encode_items(value, memo, check_bytes)
+    elif value_type is tuple:
+        return {"__tuple__":_encode_items(value, memo, check_bytes)}
+    elif value_type is dict:
+        return {"__dict__":[[_encode_value(k, memo, check_bytes), _encode_value(v, memo, check_bytes)] for k, v in value.iteritems()]}
+    elif value_type is set:
+        return {"__set__":_encode_items(value, memo, check_bytes)}
+    elif value_type is datetime.datetime:
+        return {"__datetime__":[value.year, value.month, value.day, value.hour, 
+                                value.minute, value.second, value.microsecond]}
+
+    if id(value) in memo:
+        return {"__ref__":memo[id(value)]}
+
+    cls = value.__class__
+    if cls.__module__ not in PROJECT_DATA_MODULES or not hasattr(value, "__dict__"):
+        raise TypeError("Can't save object of type " + cls.__module__ + "." + cls.__name__)
+
+    obj_id = len(memo)
+    memo[id(value)] = obj_id
+    attrs = value.__dict__.keys()
+    values = _encode_items([value.__dict__[attr] for attr in attrs], memo, check_bytes)
+    return {"__object__":cls.__module__ + "." + cls.__name__, "__id__":obj_id, "fields":map(list, zip(attrs, values))}
+
+def _encode_items(values, memo, check_bytes):
+    # Values that are written as is are handled here without a function call for each value
+    items = []
+    append = items.append
+    for item in values:
+        item_type = type(item)
+        if (item_type is int or item_type is float or item is None or item_type is bool or
+            (item_type is str and not check_bytes)):
+            append(item)
+        else:
+            append(_encode_value(item, memo, check_bytes))
+    return items
  
 # -------------------------------------------------- LOAD
 def load_project(file_path, icons_and_thumnails=True, relinker_load=False):
     _show_msg("Unpickling")
 
     # Load project object
-    f = open(file_path)
-    project = pickle.load(f)
+    start_time = time.time()
+    project = read_project_file(file_path)
+    print "Project file read in " + str(round(time.time() - start_time, 3)) + "s"
 
     # Relinker only operates on pickleable python data 
     if relinker_load:
@@ -419,6 +656,204 @@ def load_project(file_path, icons_and_thumnails=True, relinker_load=False):
 
     return project
 
+def read_project_file(file_path):
+    """
+    Returns project object with media files and sequences read from project file.
+    This does not create any MLT or GUI objects, but modules of saved classes are imported 
+    and projectdata, sequence, edit and medialog import GUI modules.
+    """
+    f = open(file_path, "rb")
+    header = f.read(PROJECT_FILE_HEADER.size)
+    if len(header) < PROJECT_FILE_HEADER.size or header[0:len(PROJECT_FILE_MAGIC)] != PROJECT_FILE_MAGIC:
+        # Project saved by earlier versions as single pickled object
+        f.seek(0)
+        project = cPickle.load(f)
+        f.close()
+        return project
+
+    magic, format_version = PROJECT_FILE_HEADER.unpack(header)
+    if format_version > PROJECT_FILE_FORMAT_VERSION:
+        f.close()
+        raise IOError("Project file format version " + str(format_version) + " is newer then supported version " + str(PROJECT_FILE_FORMAT_VERSION))
+
+    if format_version == PICKLE_PAYLOADS_FORMAT_VERSION:
+        decode_func = cPickle.loads
+    else:
+        decode_func = decode_record_data
+
+    # First segment is the full save, rest are journal segments appended by autosave.
+    project = None
+    while True:
+        segment = _read_segment(f, decode_func)
+        if segment == None:
+            break
+        project = _apply_segment(project, segment)
+
+    f.close()
+    return project
+
+def _read_segment(f, decode_func):
+    """
+    Returns (project, media_files, [(seq_index, seq)]) for records until next END record,
+    or None if file ends before segment is complete.
+    """
+    project = None
+    media_files = {}
+    sequences = []
+    seq_index = None
+    seq = None
+    while True:
+        header = f.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return None
+        record_type, payload_length = RECORD_HEADER.unpack(header)
+        data = f.read(payload_length)
+        if len(data) < payload_length:
+            return None
+        if record_type == END_RECORD:
+            return (project, media_files, sequences)
+        
+        obj = decode_func(data)
+        if record_type == PROJECT_RECORD:
+            project = obj
+        elif record_type == MEDIA_FILE_RECORD:
+            media_files[obj.id] = obj
+        elif record_type == SEQUENCE_INDEX_RECORD:
+            seq_index = obj
+        elif record_type == SEQUENCE_RECORD:
+            seq = obj
+            sequences.append((seq_index, seq))
+            seq_index = None
+        elif record_type == TRACK_RECORD:
+            seq.tracks.append(obj)
+        elif record_type == COMPOSITORS_RECORD:
+            seq.compositors = obj
+        # Unknown record types are skipped, they may be added in later format versions.
+
+def decode_record_data(data):
+    """
+    Returns record object from JSON payload.
+    """
+    record_data = json.loads(data)
+    if record_data["version"] > RECORD_DATA_VERSION:
+        raise IOError("Project file record version " + str(record_data["version"]) + " is newer then supported version " + str(RECORD_DATA_VERSION))
+    return _decode_value(record_data["data"], {})
+
+def _decode_value(value, objects):
+    # objects is __id__ -> object for objects already created from record
+    value_type = type(value)
+    if value_type is unicode:
+        return value.encode("utf-8")
+    elif value_type is list:
+        return _decode_items(value, objects)
+    elif value_type is not dict:
+        return value # None, bool or number
+
+    if "__object__" in value:
+        obj = _create_object(value["__object__"])
+        objects[value["__id__"]] = obj
+        fields = value["fields"]
+        if isinstance(fields, dict): # record data version 1
+            fields = fields.items()
+        attrs = [attr.encode("utf-8") for attr, attr_value in fields]
+        values = _decode_items([attr_value for attr, attr_value in fields], objects)
+        obj.__dict__.update(zip(attrs, values))
+        return obj
+    elif "__unicode__" in value:
+        return value["__unicode__"]
+    elif "__tuple__" in value:
+        return tuple(_decode_items(value["__tuple__"], objects))
+    elif "__ref__" in value:
+        return objects[value["__ref__"]]
+    elif "__dict__" in value:
+        return dict([(_decode_value(k, objects), _decode_value(v, objects)) for k, v in value["__dict__"]])
+    elif "__set__" in value:
+        return set(_decode_items(value["__set__"], objects))
+    elif "__bytes__" in value:
+        return base64.b64decode(value["__bytes__"])
+    elif "__datetime__" in value:
+        return datetime.datetime(*value["__datetime__"])
+
+    raise IOError("Unknown value in project file record: " + str(value.keys()))
+
+def _decode_items(values, objects):
+    # Values that are read as is are handled here without a function call for each value.
+    # Values are decoded in order so that objects are created before references to them.
+    items = []
+    append = items.append
+    for item in values:
+        item_type = type(item)
+        if item_type is unicode:
+            append(item.encode("utf-8"))
+        elif item_type is list or item_type is dict:
+            append(_decode_value(item, objects))
+        else:
+            append(item)
+    return items
+
+def _create_object(class_path):
+    # Objects are created without calling __init__() like unpickling does
+    try:
+        cls = _loaded_classes[class_path]
+    except KeyError:
+        module_name, class_name = class_path.encode("utf-8").rsplit(".", 1)
+        if module_name not in PROJECT_DATA_MODULES:
+            raise IOError("Project file has object of not allowed type " + class_path)
+        cls = getattr(importlib.import_module(module_name), class_name, None)
+        _loaded_classes[class_path] = cls
+
+    if isinstance(cls, types.ClassType):
+        return types.InstanceType(cls)
+    elif isinstance(cls, type):
+        return cls.__new__(cls)
+    raise IOError("Project file has object of unknown type " + class_path)
+
+def _check_record_round_trip(record_type, obj, data):
+    if not _same_value(obj, decode_record_data(data), {}):
+        print "persistance record round trip differs, record type:", record_type
+
+def _same_value(a, b, objects):
+    # objects is id of saved object -> loaded object, shared objects must be shared after load too
+    if a.__class__ is not b.__class__:
+        return False
+    elif isinstance(a, (list, tuple)):
+        if len(a) != len(b):
+            return False
+        for i in range(0, len(a)):
+            if not _same_value(a[i], b[i], objects):
+                return False
+        return True
+    elif isinstance(a, dict):
+        if set(a.keys()) != set(b.keys()):
+            return False
+        for k, v in a.iteritems():
+            if not _same_value(v, b[k], objects):
+                return False
+        return True
+    elif a.__class__.__module__ in PROJECT_DATA_MODULES and hasattr(a, "__dict__"):
+        if id(a) in objects:
+            return objects[id(a)] is b
+        objects[id(a)] = b
+        return _same_value(a.__dict__, b.__dict__, objects)
+
+    return a == b
+
+def _apply_segment(project, segment):
+    segment_project, media_files, sequences = segment
+    if segment_project != None:
+        segment_project.media_files = media_files
+        if project != None:
+            segment_project.sequences = project.sequences
+        project = segment_project
+
+    for seq_index, seq in sequences:
+        if seq_index == None:
+            project.sequences.append(seq)
+        else:
+            project.sequences[seq_index] = seq
+
+    return project
+
 def fill_sequence_mlt(seq, SAVEFILE_VERSION):
     """
     Replaces sequences py objects with mlt objects
@@ -713,6 +1148,9 @@ def FIX_N_TO_3_SEQUENCE_COMPATIBILITY(seq):
         seq.master_audio_pan = appconsts.NO_PAN
         seq.master_audio_gain = 1.0
 
+    if not hasattr(seq, "edit_generation"):
+        seq.edit_generation = 0
+
 def FIX_N_TO_4_MEDIA_FILE_COMPATIBILITY(media_file):
     media_file.has_proxy_file = False
     media_file.is_proxy_file = False
@@ -733,6 +1171,11 @@ def FIX_MISSING_PROJECT_ATTRS(project):
 
     if (not(hasattr(project, "project_properties"))):
         project.project_properties = {}
+
+    if (not(hasattr(project, "media_generation"))):
+        project.media_generation = 0
+        for media_bin in project.bins:
+            media_bin.edit_generation = 0
         
 def _fix_wipe_relative_path(compositor):
     if compositor.type_id == "##wipe": # Wipe may have user luma and needs to be looked up relatively
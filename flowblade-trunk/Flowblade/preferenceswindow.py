@@ -399,22 +399,60 @@ def _performance_panel():
     perf_drop_frames = Gtk.CheckButton()
     perf_drop_frames.set_active(prefs.perf_drop_frames)
 
+    levels_cache_adj = Gtk.Adjustment(prefs.audio_levels_cache_mb, 8, 1024, 8)
+    levels_cache_size = Gtk.SpinButton()
+    levels_cache_size.set_adjustment(levels_cache_adj)
+    levels_cache_size.set_numeric(True)
+
+    frame_cache_adj = Gtk.Adjustment(prefs.frame_cache_mb, 16, 2048, 16)
+    frame_cache_size = Gtk.SpinButton()
+    frame_cache_size.set_adjustment(frame_cache_adj)
+    frame_cache_size.set_numeric(True)
+
+    proxy_jobs_adj = Gtk.Adjustment(prefs.proxy_render_jobs, 0, multiprocessing.cpu_count(), 1)
+    proxy_render_jobs = Gtk.SpinButton()
+    proxy_render_jobs.set_adjustment(proxy_jobs_adj)
+    proxy_render_jobs.set_numeric(True)
+
+    render_segments_adj = Gtk.Adjustment(prefs.render_segments, 1, multiprocessing.cpu_count(), 1)
+    render_segments = Gtk.SpinButton()
+    render_segments.set_adjustment(render_segments_adj)
+    render_segments.set_numeric(True)
+
+    use_render_worker = Gtk.CheckButton()
+    use_render_worker.set_active(prefs.use_render_worker)
+
     # Tooltips
     perf_render_threads.set_tooltip_text(_("Between 1 and the number of CPU Cores"))
     perf_drop_frames.set_tooltip_text(_("Allow Frame Dropping for real-time rendering, when needed"))
+    levels_cache_size.set_tooltip_text(_("Memory used for audio levels data displayed in timeline"))
+    frame_cache_size.set_tooltip_text(_("Memory used for decoded frames displayed when trimming and matching frames"))
+    proxy_render_jobs.set_tooltip_text(_("Number of proxy files rendered at the same time, 0 sets value using number of CPU Cores"))
+    render_segments.set_tooltip_text(_("Timeline render is split in this many parts that are rendered at the same time\nand then joined without re-encoding. 1 renders without splitting."))
+    use_render_worker.set_tooltip_text(_("Audio levels, render segments and media import are done in a background process\nthat is kept running between jobs instead of starting a new process for every job"))
 
     # Layout
     row1 = _row(guiutils.get_two_column_box(Gtk.Label(label=_("Render Threads:")), perf_render_threads, PREFERENCES_LEFT))
     row2 = _row(guiutils.get_checkbox_row_box(perf_drop_frames, Gtk.Label(label=_("Allow Frame Dropping"))))
+    row3 = _row(guiutils.get_two_column_box(Gtk.Label(label=_("Audio Levels Cache Size (MB):")), levels_cache_size, PREFERENCES_LEFT))
+    row4 = _row(guiutils.get_two_column_box(Gtk.Label(label=_("Trim Frames Cache Size (MB):")), frame_cache_size, PREFERENCES_LEFT))
+    row5 = _row(guiutils.get_two_column_box(Gtk.Label(label=_("Concurrent Proxy Renders:")), proxy_render_jobs, PREFERENCES_LEFT))
+    row6 = _row(guiutils.get_two_column_box(Gtk.Label(label=_("Render Segments:")), render_segments, PREFERENCES_LEFT))
+    row7 = _row(guiutils.get_checkbox_row_box(use_render_worker, Gtk.Label(label=_("Use Persistent Render Worker"))))
 
     vbox = Gtk.VBox(False, 2)
     vbox.pack_start(row1, False, False, 0)
     vbox.pack_start(row2, False, False, 0)
+    vbox.pack_start(row3, False, False, 0)
+    vbox.pack_start(row4, False, False, 0)
+    vbox.pack_start(row5, False, False, 0)
+    vbox.pack_start(row6, False, False, 0)
+    vbox.pack_start(row7, False, False, 0)
     vbox.pack_start(Gtk.Label(), True, True, 0)
 
     guiutils.set_margins(vbox, 12, 0, 12, 12)
 
-    return vbox, (perf_render_threads, perf_drop_frames)
+    return vbox, (perf_render_threads, perf_drop_frames, levels_cache_size, frame_cache_size, proxy_render_jobs, render_segments, use_render_worker)
 
 def _shortcuts_panel():
     # Apr-2017 - SvdB
@@ -0,0 +1,144 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module keeps persistent cache of media file probe results.
+
+Opening a mlt.Producer to get length and utils.get_file_producer_info() data is slow,
+and the values only change when the file changes. Results are saved in hidden user dir
+keyed by absolute path and profile, and are valid while file size and mtime stay the same.
+
+Cache is used from worker threads and all access is locked.
+"""
+
+import collections
+import cPickle
+import os
+import threading
+
+import utils
+
+PROBE_CACHE_FILE = "probe_cache"
+PROBE_CACHE_VERSION = 1
+MAX_ENTRIES = 5000
+
+_cache = None # OrderedDict (abs path, profile desc) -> (size, mtime, length, info), least recently used first
+_changed = False
+_lock = threading.Lock()
+
+
+def get(file_path, profile):
+    """
+    Returns (length, info) or None if file not in cache or changed after probe.
+    info is None for entries created without producer info, e.g. audio files.
+    """
+    stat_key = _get_stat_key(file_path)
+    if stat_key == None:
+        return None
+
+    key = _get_key(file_path, profile)
+    with _lock:
+        _load()
+        try:
+            size, mtime, length, info = _cache.pop(key)
+        except KeyError:
+            return None
+        if (size, mtime) != stat_key:
+            return None
+        _cache[key] = (size, mtime, length, info) # move to most recently used
+        return (length, info)
+
+def put(file_path, profile, length, info):
+    global _changed
+    stat_key = _get_stat_key(file_path)
+    if stat_key == None:
+        return # Image sequences and other non-file resources are not cached
+
+    size, mtime = stat_key
+    key = _get_key(file_path, profile)
+    with _lock:
+        _load()
+        _cache.pop(key, None)
+        _cache[key] = (size, mtime, length, info)
+        _changed = True
+
+def get_length(file_path, profile, producer_func):
+    """
+    Returns cached length or length of producer created with producer_func, or None if producer not valid.
+    """
+    cached = get(file_path, profile)
+    if cached != None:
+        length, info = cached
+        return length
+
+    producer = producer_func()
+    if producer.is_valid() == False:
+        return None
+    length = producer.get_length()
+    put(file_path, profile, length, None)
+    return length
+
+def save():
+    """
+    Writes cache to disk if it has changed.
+    """
+    global _changed
+    with _lock:
+        if _cache == None or _changed == False:
+            return
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+        cache_path = utils.get_hidden_user_dir_path() + PROBE_CACHE_FILE
+        try:
+            write_file = open(cache_path + ".tmp", "wb")
+            cPickle.dump((PROBE_CACHE_VERSION, _cache), write_file, cPickle.HIGHEST_PROTOCOL)
+            write_file.close()
+            os.rename(cache_path + ".tmp", cache_path)
+            _changed = False
+        except Exception as e:
+            print "Probe cache save failed:", e
+
+def _load():
+    # Called with _lock held
+    global _cache
+    if _cache != None:
+        return
+    _cache = collections.OrderedDict()
+    cache_path = utils.get_hidden_user_dir_path() + PROBE_CACHE_FILE
+    if not os.path.exists(cache_path):
+        return
+    try:
+        read_file = open(cache_path, "rb")
+        version, cache = cPickle.load(read_file)
+        read_file.close()
+        if version == PROBE_CACHE_VERSION:
+            _cache = cache
+    except Exception as e:
+        print "Probe cache load failed:", e
+
+def _get_key(file_path, profile):
+    return (os.path.abspath(file_path), profile.description())
+
+def _get_stat_key(file_path):
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime)
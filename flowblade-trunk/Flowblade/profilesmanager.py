@@ -309,10 +309,10 @@ def _hide_selected_clicked(visible_view, hidden_view):
     prof_names = []
     default_profile = mltprofiles.get_default_profile()
     for i in visible_indexes:
-        pname, profile = mltprofiles.get_factory_profiles()[i]
-        if profile == default_profile:
+        pname, profile_entry = mltprofiles.get_factory_profiles()[i]
+        if pname == default_profile.description():
             dialogutils.warning_message("Can't hide default Profile", 
-                                    "Profile '"+ profile.description() + "' is default profile and can't be hidden.", 
+                                    "Profile '"+ pname + "' is default profile and can't be hidden.", 
                                     None)
             return
         prof_names.append(pname)
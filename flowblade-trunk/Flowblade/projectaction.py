@@ -25,6 +25,7 @@ Load, save, add media file, etc...
 
 import datetime
 import glob
+import json
 import md5
 import mlt
 import os
@@ -33,6 +34,8 @@ from os.path import isfile, join
 from PIL import Image
 import re
 import shutil
+import subprocess
+import sys
 import time
 import threading
 
@@ -44,7 +47,7 @@ from gi.repository import GLib
 import app
 import audiowaveformrenderer
 import appconsts
-import batchrendering
+import clipindex
 import dialogs
 import dialogutils
 import gui
@@ -58,23 +61,39 @@ from editorstate import current_bin
 from editorstate import PROJECT
 from editorstate import MONITOR_MEDIA_FILE
 import editorpersistance
-import medialinker
+import lazyimport
+import mediaprobe
 import movemodes
 import mltprofiles
 import persistance
+import probecache
 import projectdata
 import projectinfogui
 import projectmediaimport
 import propertyparse
 import proxyediting
+import proxystore
 import render
 import renderconsumer
 import rendergui
+import respaths
 import sequence
 import undo
 import updater
 import utils
 
+# Imported on first use, see lazyimport.py
+batchrendering = lazyimport.lazy_import("batchrendering")
+medialinker = lazyimport.lazy_import("medialinker")
+
+
+# Media files are probed and thumbnailed in flowblademediaprobe process when adding at least this many.
+MEDIA_IMPORT_PROBE_PROCESS_MIN_FILES = 4
+MEDIA_IMPORT_PROBE_LOG_FILE = "log_media_probe"
+# Media list view is refreshed at most this often when adding media files.
+MEDIA_IMPORT_VIEW_UPDATE_INTERVAL = 0.5 # seconds
+# Progress dialog is shown when adding at least this many media files.
+MEDIA_IMPORT_PROGRESS_DIALOG_MIN_FILES = 4
 
 save_time = None
 save_icon_remove_event_id = None
@@ -208,22 +227,61 @@ class AddMediaFilesThread(threading.Thread):
         duplicates = []
         succes_new_file = None
         filenames = self.filenames
+        
+        # Files already in project are not probed
+        probe_files = []
         for new_file in filenames:
             (folder, file_name) = os.path.split(new_file)
-            if PROJECT().media_file_exists(new_file):
+            if PROJECT().media_file_exists(new_file) or new_file in probe_files:
                 duplicates.append(file_name)
             else:
-                try:
-                    PROJECT().add_media_file(new_file, self.compound_clip_name)
-                    succes_new_file = new_file
-                except projectdata.ProducerNotValidError as err:
-                    print err.__str__()
-                    dialogs.not_valid_producer_dialog(err.value, gui.editor_window.window)
-            
+                probe_files.append(new_file)
+
+        dialog = None
+        if len(probe_files) >= MEDIA_IMPORT_PROGRESS_DIALOG_MIN_FILES:
             Gdk.threads_enter()
-            gui.media_list_view.fill_data_model()
-            max_val = gui.editor_window.media_scroll_window.get_vadjustment().get_upper()
-            gui.editor_window.media_scroll_window.get_vadjustment().set_value(max_val)
+            dialog = dialogs.add_media_files_progress_dialog()
+            Gdk.threads_leave()
+
+        # Files are probed and thumbnailed in worker processes of launched flowblademediaprobe
+        # process and added to project in given order, see mediaprobe.py.
+        # A few files are probed here, launching the process would take longer.
+        start = time.time()
+        if len(probe_files) >= MEDIA_IMPORT_PROBE_PROCESS_MIN_FILES:
+            results = _probe_media_files_in_process(probe_files)
+        else:
+            results = (_probe_media_file(new_file) for new_file in probe_files)
+
+        last_view_update = 0.0
+        done_count = 0
+        for new_file, media_data, err in results:
+            if err == None:
+                media_file = PROJECT().add_media_file(new_file, self.compound_clip_name, media_data)
+                proxyediting.use_stored_proxy_file(media_file)
+                succes_new_file = new_file
+            else:
+                print err.__str__()
+                dialogs.not_valid_producer_dialog(err.value, gui.editor_window.window)
+            done_count += 1
+
+            # Media list view is refreshed in batches
+            Gdk.threads_enter()
+            if dialog != None:
+                dialog.info.set_text(os.path.basename(new_file))
+                dialog.progress_bar.set_fraction(float(done_count) / len(probe_files))
+            if time.time() - last_view_update > MEDIA_IMPORT_VIEW_UPDATE_INTERVAL:
+                gui.media_list_view.fill_data_model()
+                max_val = gui.editor_window.media_scroll_window.get_vadjustment().get_upper()
+                gui.editor_window.media_scroll_window.get_vadjustment().set_value(max_val)
+                last_view_update = time.time()
+            Gdk.threads_leave()
+
+        probecache.save()
+        print "media import done, files: " + str(len(probe_files)) + ", time: " + str(round(time.time() - start, 2)) + "s"
+
+        if dialog != None:
+            Gdk.threads_enter()
+            dialog.destroy()
             Gdk.threads_leave()
 
         if succes_new_file != None and self.compound_clip_name == None: # hidden rendered files folder for compound clips is not a last_opened_media_dir
@@ -233,6 +291,8 @@ class AddMediaFilesThread(threading.Thread):
         # Update editor gui
         Gdk.threads_enter()
         gui.media_list_view.fill_data_model()
+        max_val = gui.editor_window.media_scroll_window.get_vadjustment().get_upper()
+        gui.editor_window.media_scroll_window.get_vadjustment().set_value(max_val)
         update_current_bin_files_count()
         _enable_save()
 
@@ -248,6 +308,57 @@ class AddMediaFilesThread(threading.Thread):
             
         audiowaveformrenderer.launch_audio_levels_rendering(filenames)
 
+def _probe_media_files_in_process(file_paths):
+    # Generator run in AddMediaFilesThread, yields (file_path, media_data, error) in file_paths order.
+    # Files not probed because process failed are probed here.
+    FLOG = open(utils.get_hidden_user_dir_path() + MEDIA_IMPORT_PROBE_LOG_FILE, 'w')
+    probe_process = subprocess.Popen([sys.executable, respaths.LAUNCH_DIR + "flowblademediaprobe",
+                                      respaths.ROOT_PATH, PROJECT().profile_desc] + file_paths,
+                                      stdin=FLOG, stdout=subprocess.PIPE, stderr=FLOG)
+
+    done_count = 0
+    for line in iter(probe_process.stdout.readline, ""):
+        if line.startswith(mediaprobe.RESULT_MSG):
+            result = utils.utf8_strings(json.loads(line[len(mediaprobe.RESULT_MSG):]))
+            yield _get_probe_process_result(file_paths[done_count], result)
+            done_count += 1
+        elif not line.startswith(mediaprobe.DONE_MSG):
+            FLOG.write(line)
+
+    probe_process.wait()
+    FLOG.close()
+
+    if done_count < len(file_paths):
+        print "media probe process failed, probing " + str(len(file_paths) - done_count) + " files in editor process"
+        for file_path in file_paths[done_count:]:
+            yield _probe_media_file(file_path)
+
+def _get_probe_process_result(file_path, result):
+    if "error" in result:
+        return (file_path, None, projectdata.ProducerNotValidError(result["error"]))
+
+    # Probe cache of this process is updated so that file is not probed again.
+    media_data = (result["media_type"], result["icon_path"], result["length"], result["info"])
+    probecache.put(file_path, PROJECT().profile, result["length"], result["info"])
+    _media_file_probed(file_path, media_data)
+    return (file_path, media_data, None)
+
+def _probe_media_file(file_path):
+    # Returns (file_path, media_data, error)
+    try:
+        media_data = projectdata.get_media_file_data(file_path)
+    except projectdata.ProducerNotValidError as err:
+        return (file_path, None, err)
+
+    _media_file_probed(file_path, media_data)
+    return (file_path, media_data, None)
+
+def _media_file_probed(file_path, media_data):
+    # Content fingerprint for proxy store lookup is computed when file is probed, it is then kept in memory.
+    media_type, icon_path, length, info = media_data
+    if media_type == appconsts.VIDEO and editorpersistance.prefs.render_folder != None:
+        proxystore.get_fingerprint(file_path)
+
 
 class UpdateMediaLengthsThread(threading.Thread):
     
@@ -268,15 +379,16 @@ class UpdateMediaLengthsThread(threading.Thread):
                 dialog.info.set_text(media_file.name)
                 Gdk.threads_leave()
         
-                producer = mlt.Producer(PROJECT().profile, str(media_file.path))
-                if producer.is_valid() == False:
+                producer_func = lambda: mlt.Producer(PROJECT().profile, str(media_file.path))
+                length = probecache.get_length(media_file.path, PROJECT().profile, producer_func)
+                if length == None:
                     print "not valid producer"
                     continue
 
-                length = producer.get_length()
                 media_file.length = length
                 
         PROJECT().update_media_lengths_on_load = False
+        probecache.save()
         
         Gdk.threads_enter()
         dialog.destroy()
@@ -1035,11 +1147,13 @@ def delete_media_files(force_delete=False):
     bin_indexes.reverse()
     for i in bin_indexes:
         current_bin().file_ids.pop(i)
+    current_bin().edit_generation += 1
     update_current_bin_files_count()
         
     # Delete from project
     for file_id in file_ids:
         PROJECT().media_files.pop(file_id)
+    PROJECT().media_generation += 1
 
     gui.media_list_view.fill_data_model()
 
@@ -1067,6 +1181,7 @@ def media_file_name_edited(dialog, response_id, data):
         return
 
     media_file.name = new_text
+    PROJECT().media_generation += 1
     gui.media_list_view.fill_data_model()
 
 def _display_file_info(media_file):
@@ -1287,6 +1402,7 @@ def delete_selected_bin():
     # Remove from gui and project data
     model.remove(iter)
     PROJECT().bins.pop(row)
+    PROJECT().media_generation += 1
     
     # Set first bin selected, listener 'bin_selection_changed' updates editorstate.project.c_bin
     selection.select_path("0")
@@ -1303,6 +1419,7 @@ def bin_name_edited(cell, path, new_text, user_data):
     liststore, column = user_data
     liststore[path][column] = new_text
     PROJECT().bins[int(path)].name = new_text
+    PROJECT().bins[int(path)].edit_generation += 1
     _enable_save()
 
 def update_current_bin_files_count():
@@ -1347,10 +1464,12 @@ def move_files_to_bin(new_bin, bin_indexes):
     bin_indexes.reverse()
     for i in bin_indexes:
         moved_ids.append(current_bin().file_ids.pop(i))
+    current_bin().edit_generation += 1
         
     # Add to target bin
     for file_id in moved_ids:
         PROJECT().bins[new_bin].file_ids.append(file_id)
+    PROJECT().bins[new_bin].edit_generation += 1
 
     gui.media_list_view.fill_data_model()
     gui.bin_list_view.fill_data_model()
@@ -1471,6 +1590,7 @@ def sequence_name_edited(cell, path, new_text, user_data):
     liststore, column = user_data
     liststore[path][column] = new_text
     PROJECT().sequences[int(path)].name = new_text
+    PROJECT().sequences[int(path)].edit_generation += 1
 
     _enable_save()
 
@@ -1586,7 +1706,7 @@ def _insert_sequence(import_seq):
         track = current_sequence().tracks[i]
         
         import_track = import_seq.tracks[i + tracks_off]
-        insert_start_index = track.get_clip_index_at(insert_frame)
+        insert_start_index = clipindex.get_clip_index_at(track, insert_frame)
         for j in range(0, len(import_track.clips)):
             import_clip = import_track.clips[j]
             if import_clip.is_blanck_clip != True:
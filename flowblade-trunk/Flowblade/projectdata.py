@@ -39,7 +39,9 @@ from editorstate import PROJECT
 import mltprofiles
 import mltrefhold
 import patternproducer
+import probecache
 import projectaction
+import proxystore
 import miscdataobjects
 import respaths
 import sequence
@@ -94,6 +96,7 @@ class Project:
         self.update_media_lengths_on_load = False # old projects < 1.10 had wrong media length data which just was never used.
                                                   # 1.10 needed that data for the first time and required recreating it correctly for older projects
         self.project_properties = {} # Key value pair for misc persistent properties, dict is used that we can add thesse without worrying loading
+        self.media_generation = 0 # Bumped when media files or bins are added or removed, autosave uses this to find changes
 
         self.SAVEFILE_VERSION = SAVEFILE_VERSION
         
@@ -117,23 +120,17 @@ class Project:
         media_object.length = length
         media_object.name = name
 
-    def add_media_file(self, file_path, compound_clip_name=None):
+    def add_media_file(self, file_path, compound_clip_name=None, media_data=None):
         """
         Adds media file to project if exists and file is of right type.
+        media_data is value returned by get_media_file_data() if file has already been probed.
         """
         (directory, file_name) = os.path.split(file_path)
         (name, ext) = os.path.splitext(file_name)
 
-        # Get media type
-        media_type = sequence.get_media_type(file_path)
-
-        # Get length and icon
-        if media_type == appconsts.AUDIO:
-            icon_path = respaths.IMAGE_PATH + "audio_file.png"
-            length = thumbnailer.get_file_length(file_path)
-            info = None
-        else: # For non-audio we need write a thumbbnail file and get file lengh while we're at it
-             (icon_path, length, info) = thumbnailer.write_image(file_path)
+        if media_data == None:
+            media_data = get_media_file_data(file_path)
+        media_type, icon_path, length, info = media_data
 
         # Hide file extension if enabled in user preferences
         clip_name = file_name
@@ -165,6 +162,8 @@ class Project:
 
         # Add to bin
         self.c_bin.file_ids.append(media_object.id)
+        self.c_bin.edit_generation += 1
+        self.media_generation += 1
 
     def media_file_exists(self, file_path):
         for key, media_file in self.media_files.items():
@@ -185,6 +184,7 @@ class Project:
 
     def delete_media_file_from_current_bin(self, media_file):
         self.c_bin.file_ids.pop(media_file.id)
+        self.c_bin.edit_generation += 1
 
     def get_current_proxy_paths(self):
         paths_dict = {}
@@ -206,6 +206,7 @@ class Project:
         name = _("bin_") + str(self.next_bin_number)
         self.bins.append(Bin(name))
         self.next_bin_number += 1
+        self.media_generation += 1
     
     def add_unnamed_sequence(self):
         """
@@ -354,30 +355,17 @@ class MediaFile:
         
         return scaled_icon
 
-    def create_proxy_path(self, proxy_width, proxy_height, file_extesion):
-        if self.type == appconsts.IMAGE_SEQUENCE:
-            return self._create_img_seg_proxy_path(proxy_width, proxy_height)
-        
-        proxy_md_key = self.path + str(proxy_width) + str(proxy_height)
-        if hasattr(self, "use_unique_proxy"): # This may have been added in proxyediting.py to prevent interfering with existing projects
-            proxy_md_key = proxy_md_key + os.urandom(16)
-        md_str = md5.new(proxy_md_key).hexdigest()
-        return str(editorpersistance.prefs.render_folder + "/proxies/" + md_str + "." + file_extesion) # str() because we get unicode here
-
-    def _create_img_seg_proxy_path(self,  proxy_width, proxy_height):
-        folder, file_name = os.path.split(self.path)
-        proxy_md_key = self.path + str(proxy_width) + str(proxy_height)
-        if hasattr(self, "use_unique_proxy"): # This may have been added in proxyediting.py to prevent interfering with existing projects
-            proxy_md_key = proxy_md_key + os.urandom(16)
-        md_str = md5.new(proxy_md_key).hexdigest()
-        return str(editorpersistance.prefs.render_folder + "/proxies/" + md_str + "/" + file_name)
+    def create_proxy_path(self, proxy_width, proxy_height, proxy_encoding):
+        # use_unique_proxy may have been added in proxyediting.py to prevent interfering with existing projects
+        unique = hasattr(self, "use_unique_proxy")
+        return proxystore.get_proxy_path(self.path, self.type, proxy_width, proxy_height, proxy_encoding, unique)
 
     def add_proxy_file(self, proxy_path):
         self.has_proxy_file = True
         self.second_file_path = proxy_path
 
-    def add_existing_proxy_file(self, proxy_width, proxy_height, file_extesion):
-        proxy_path = self.create_proxy_path(proxy_width, proxy_height, file_extesion)
+    def add_existing_proxy_file(self, proxy_width, proxy_height, proxy_encoding):
+        proxy_path = self.create_proxy_path(proxy_width, proxy_height, proxy_encoding)
         self.add_proxy_file(proxy_path)
 
     def set_as_proxy_media_file(self):
@@ -440,7 +428,7 @@ class Bin:
         self.file_ids = [] # List of media files ids in the bin.
                            # Ids are increasing integers given in 
                            # Project.add_media_file(...)
-        
+        self.edit_generation = 0 # Bumped when name or file_ids change
         
 class ProducerNotValidError(Exception):
     def __init__(self, value):
@@ -456,14 +444,22 @@ class Thumbnailer:
     def set_context(self, profile):
         self.profile = profile
     
-    def write_image(self, file_path):
+    def write_image(self, file_path, use_cache=True):
         """
-        Writes thumbnail image from file producer
+        Writes thumbnail image from file producer.
+        If use_cache is False thumbnail is written even if it exists.
         """
         # Get data
         md_str = md5.new(file_path).hexdigest()
         thumbnail_path = editorpersistance.prefs.thumbnail_folder + "/" + md_str +  ".png"
 
+        # Producer is not needed if file has not changed since thumbnail was written
+        cached = probecache.get(file_path, self.profile)
+        if use_cache == True and cached != None and os.path.exists(thumbnail_path):
+            length, info = cached
+            if info != None:
+                return (thumbnail_path, length, info)
+
         # Create consumer
         consumer = mlt.Consumer(self.profile, "avformat", 
                                      thumbnail_path)
@@ -478,6 +474,7 @@ class Thumbnailer:
         info = utils.get_file_producer_info(producer)
 
         length = producer.get_length()
+        probecache.put(file_path, self.profile, length, info)
         frame = length / 2
         producer = producer.cut(frame, frame)
 
@@ -492,8 +489,15 @@ class Thumbnailer:
         # but do need file length known
 
         # Create one frame producer
+        cached = probecache.get(file_path, self.profile)
+        if cached != None:
+            length, info = cached
+            return length
+
         producer = mlt.Producer(self.profile, str(file_path))
-        return producer.get_length()
+        length = producer.get_length()
+        probecache.put(file_path, self.profile, length, None)
+        return length
 
 
 # ----------------------------------- project and media log events
@@ -528,6 +532,27 @@ class ProjectEvent:
 
 
 # ------------------------------- MODULE FUNCTIONS
+def get_media_file_data(file_path, media_thumbnailer=None):
+    """
+    Returns (media_type, icon_path, length, info) for media file.
+    Does not touch project data. Media import processes give their own thumbnailer.
+    """
+    if media_thumbnailer == None:
+        media_thumbnailer = thumbnailer
+
+    # Get media type
+    media_type = sequence.get_media_type(file_path)
+
+    # Get length and icon
+    if media_type == appconsts.AUDIO:
+        icon_path = respaths.IMAGE_PATH + "audio_file.png"
+        length = media_thumbnailer.get_file_length(file_path)
+        info = None
+    else: # For non-audio we need write a thumbbnail file and get file lengh while we're at it
+         (icon_path, length, info) = media_thumbnailer.write_image(file_path)
+
+    return (media_type, icon_path, length, info)
+
 def get_default_project():
     """
     Creates the project displayed at start up.
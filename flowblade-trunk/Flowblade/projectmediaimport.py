@@ -44,6 +44,7 @@ import patternproducer
 import persistance
 import respaths
 import renderconsumer
+import renderworker
 import translations
 import utils
 
@@ -69,22 +70,7 @@ class ProjectLoadThread(threading.Thread):
         _info_window.info.set_text("Loading project " + self.filename + "...")
         Gdk.threads_leave()
 
-        persistance.show_messages = False
-        target_project = persistance.load_project(self.filename, False, True)
-        
-        target_project.c_seq = target_project.sequences[target_project.c_seq_index]
-
-        # Media file media assets
-        media_assets = ""
-        for media_file_id, media_file in target_project.media_files.iteritems():
-            if isinstance(media_file, patternproducer.AbstractBinClip):
-                continue
-            if os.path.isfile(media_file.path):                
-                media_assets = media_assets + str(media_file.path) + "\n"
-        
-        f = open(_get_assets_file(), 'w')
-        f.write(media_assets)
-        f.close()
+        write_media_assets(self.filename)
 
         _shutdown()
 
@@ -117,6 +103,11 @@ def get_imported_media():
     
 def write_files(filename):
     print "Starting media import..."
+    job = renderworker.submit(renderworker.MEDIA_IMPORT_JOB, {"project_path":filename})
+    if job != None and job.wait() == True:
+        GLib.idle_add(assets_write_complete)
+        return
+
     FLOG = open(utils.get_hidden_user_dir_path() + "log_media_import", 'w')
     p = subprocess.Popen([sys.executable, respaths.LAUNCH_DIR + "flowblademediaimport", filename], stdin=FLOG, stdout=FLOG, stderr=FLOG)
     p.wait()
@@ -127,6 +118,26 @@ def assets_write_complete():
     _media_paths_written_to_disk_complete_callback()
 
 
+def write_media_assets(filename):
+    # Called in media import process or render worker
+    persistance.show_messages = False
+    target_project = persistance.load_project(filename, False, True)
+
+    target_project.c_seq = target_project.sequences[target_project.c_seq_index]
+
+    # Media file media assets
+    media_assets = ""
+    for media_file_id, media_file in target_project.media_files.iteritems():
+        if isinstance(media_file, patternproducer.AbstractBinClip):
+            continue
+        if os.path.isfile(media_file.path):
+            media_assets = media_assets + str(media_file.path) + "\n"
+
+    f = open(_get_assets_file(), 'w')
+    f.write(media_assets)
+    f.close()
+
+
 # ------------------------------------------------------------ module internal
 def _do_assets_write(filename):
     _create_info_dialog()
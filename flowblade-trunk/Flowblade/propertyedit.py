@@ -31,6 +31,7 @@ and python side values (that are persistant).
 from gi.repository import Gtk, Gdk
 
 import appconsts
+import clipindex
 from editorstate import current_sequence
 import mlttransitions
 import mltfilters
@@ -305,7 +306,7 @@ class AbstractProperty:
         return self.clip.clip_out - self.clip.clip_in + 1
         
     def get_clip_tline_pos(self):
-        return self.track.clip_start(self.clip_index)
+        return clipindex.clip_start(self.track, self.clip_index)
     
     def update_clip_index(self):
         self.clip_index = self.track.clips.index(self.clip)
@@ -365,6 +366,7 @@ class EditableProperty(AbstractProperty):
         filter_object = self._get_filter_object()
         prop = (str(self.name), str(str_value), self.type)
         filter_object.properties[self.property_index] = prop
+        current_sequence().edit_generation += 1
 
 
 class TransitionEditableProperty(AbstractProperty):
@@ -404,6 +406,7 @@ class TransitionEditableProperty(AbstractProperty):
         # Persistant python object
         prop = (str(self.name), str(str_value), self.type)
         self.transition.properties[self.property_index] = prop
+        current_sequence().edit_generation += 1
 
 
 class NonMltEditableProperty(AbstractProperty):
@@ -436,6 +439,7 @@ class NonMltEditableProperty(AbstractProperty):
         prop = (str(self.name), str(str_value), self.type)
         filter_object.non_mlt_properties[self.non_mlt_property_index] = prop
         self.value = str_value
+        current_sequence().edit_generation += 1
 
     def get_float_value(self):
         return float(self.value)
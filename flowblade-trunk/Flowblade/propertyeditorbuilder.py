@@ -30,7 +30,7 @@ from editorstate import PLAYER
 from editorstate import current_sequence
 import extraeditors
 import guiutils
-import keyframeeditor
+import lazyimport
 import mltfilters
 import mlttransitions
 import propertyparse
@@ -38,6 +38,9 @@ import translations
 import updater
 import utils
 
+# Imported on first use, see lazyimport.py
+keyframeeditor = lazyimport.lazy_import("keyframeeditor")
+
 EDITOR = "editor"
 
 # editor types and agrs                                     editor component or arg description
@@ -18,11 +18,13 @@
     along with Flowblade Movie Editor. If not, see <http://www.gnu.org/licenses/>.
 """
 
-import glob
-from PIL import Image
 import mlt
+import multiprocessing
 import os
 import shutil
+import signal
+import subprocess
+import sys
 import threading
 import time
 
@@ -36,10 +38,12 @@ import editorpersistance
 import editorstate
 import gui
 import guiutils
+import imgseqproxy
 import mltrefhold
 import persistance
 import render
 import renderconsumer
+import respaths
 import sequence
 import utils
 
@@ -48,7 +52,6 @@ manager_window = None
 progress_window = None
 proxy_render_issues_window = None
 
-render_thread = None
 runner_thread = None
 load_thread = None
 
@@ -57,6 +60,32 @@ PROXY_SIZE_FULL = 0
 PROXY_SIZE_HALF = 1
 PROXY_SIZE_QUARTER = 2
 
+# Max number of concurrent proxy renders when number is derived from CPU count
+PROXY_RENDER_MAX_AUTO_JOBS = 8
+
+# Proxy files are rendered to proxy path + this and renamed when complete, so that
+# an unfinished file in proxy store is never used as proxy
+PROXY_PART_EXTENSION = ".part"
+
+
+class ProxyRenderJob:
+    """
+    One proxy file being rendered by its own FileRenderPlayer.
+    """
+    def __init__(self, media_file, proxy_file_path, render_thread, stop_frame):
+        self.media_file = media_file
+        self.proxy_file_path = proxy_file_path
+        self.render_path = proxy_file_path + PROXY_PART_EXTENSION
+        self.render_thread = render_thread
+        self.stop_frame = stop_frame
+
+    def get_render_fraction(self):
+        return self.render_thread.get_render_fraction()
+
+    def is_done(self):
+        self.render_thread.producer.get_length()
+        return self.render_thread.producer.frame() >= self.stop_frame
+
 
 class ProxyRenderRunnerThread(threading.Thread):
     def __init__(self, proxy_profile, files_to_render, set_as_proxy_immediately):
@@ -65,99 +94,67 @@ class ProxyRenderRunnerThread(threading.Thread):
         self.files_to_render = files_to_render
         self.set_as_proxy_immediately = set_as_proxy_immediately
         self.aborted = False
+        self.active_jobs = []
+        self.img_seq_process = None
+        self.jobs_lock = threading.Lock() # abort() is called from GUI thread
 
-    def run(self):        
-        items = 1
+    def run(self):
         global progress_window
         start = time.time()
-        elapsed = 0
         proxy_w, proxy_h =  _get_proxy_dimensions(self.proxy_profile, editorstate.PROJECT().proxy_data.size)
         proxy_encoding = _get_proxy_encoding()
-        self.current_render_file_path = None
+        max_jobs = _get_proxy_render_jobs_count(len(self.files_to_render))
+        self.done_count = 0
         
-        print "proxy render started, items: " + str(len(self.files_to_render)) + ", dim: " + str(proxy_w) + "x" + str(proxy_h)
+        print "proxy render started, items: " + str(len(self.files_to_render)) + ", dim: " + str(proxy_w) + "x" + str(proxy_h) + ", concurrent renders: " + str(max_jobs)
         
-        for media_file in self.files_to_render:
-            if self.aborted == True:
-                break
-
-            if media_file.type == appconsts.IMAGE_SEQUENCE:
-                self._create_img_seq_proxy(media_file, proxy_w, proxy_h, items, start)
-                continue
-
-            # Create render objects
-            proxy_file_path = media_file.create_proxy_path(proxy_w, proxy_h, proxy_encoding.extension)
-            self.current_render_file_path = proxy_file_path
-            renderconsumer.performance_settings_enabled = False
-            consumer = renderconsumer.get_render_consumer_for_encoding(
-                                                        proxy_file_path,
-                                                        self.proxy_profile, 
-                                                        proxy_encoding)
-            renderconsumer.performance_settings_enabled = True
-            # Bit rates for proxy files are counted using 2500kbs for 
-            # PAL size image as starting point.
-            pal_pix_count = 720.0 * 576.0
-            pal_proxy_rate = 2500.0
-            proxy_pix_count = float(proxy_w * proxy_h)
-            proxy_rate = pal_proxy_rate * (proxy_pix_count / pal_pix_count)
-            proxy_rate = int(proxy_rate / 100) * 100 # Make proxy rate even hundred
-            # There are no practical reasons to have bitrates lower than 500kbs.
-            if proxy_rate < 500:
-                proxy_rate = 500
-            consumer.set("vb", str(int(proxy_rate)) + "k")
-
-            consumer.set("rescale", "nearest")
-
-            file_producer = mlt.Producer(self.proxy_profile, str(media_file.path))
-            mltrefhold.hold_ref(file_producer) # this may or may not be needed to avoid crashes
-            stop_frame = file_producer.get_length() - 1
-
-            # Create and launch render thread
-            global render_thread 
-            render_thread = renderconsumer.FileRenderPlayer(None, file_producer, consumer, 0, stop_frame)
-            render_thread.start()
-
-            # Render view update loop
-            self.thread_running = True
-            self.aborted = False
-            while self.thread_running:
+        pending = list(self.files_to_render)
+        while (len(pending) > 0 or len(self.active_jobs) > 0) and self.aborted == False:
+            # Launch renders until all render slots are in use
+            while len(pending) > 0 and len(self.active_jobs) < max_jobs and self.aborted == False:
+                media_file = pending.pop(0)
+                if media_file.type == appconsts.IMAGE_SEQUENCE:
+                    # Rendered in this thread, launched renders keep running meanwhile
+                    self._create_img_seq_proxy(media_file, proxy_w, proxy_h, start)
+                    self.done_count += 1
+                    continue
+                job = self._launch_render_job(media_file, proxy_w, proxy_h, proxy_encoding)
+                with self.jobs_lock:
+                    self.active_jobs.append(job)
+
+            # Complete finished renders
+            for job in list(self.active_jobs):
                 if self.aborted == True:
                     break
-                render_fraction = render_thread.get_render_fraction()
-                now = time.time()
-                elapsed = now - start
-                Gdk.threads_enter()
-                progress_window.update_render_progress(render_fraction, media_file.name, items, len(self.files_to_render), elapsed)
-                Gdk.threads_leave()
-                render_thread.producer.get_length()
-                if render_thread.producer.frame() >= stop_frame:
-                    self.thread_running = False
-                    media_file.add_proxy_file(proxy_file_path)
+                if job.is_done():
+                    job.render_thread.shutdown()
+                    os.rename(job.render_path, job.proxy_file_path)
+                    job.media_file.add_proxy_file(job.proxy_file_path)
                     if self.set_as_proxy_immediately: # When proxy mode is USE_PROXY_MEDIA all proxy files are used all the time
-                        media_file.set_as_proxy_media_file()
-                    self.current_render_file_path = None
-                else:
-                    time.sleep(0.1)
-
-            if not self.aborted:
-                items = items + 1
-                Gdk.threads_enter()
-                progress_window.update_render_progress(0, media_file.name, items, len(self.files_to_render), elapsed)
-                Gdk.threads_leave()
-            else:
-                print "proxy render aborted"
-                render_thread.shutdown()
-                break
+                        job.media_file.set_as_proxy_media_file()
+                    with self.jobs_lock:
+                        self.active_jobs.remove(job)
+                    self.done_count += 1
+
+            if self.aborted == False:
+                self._update_progress(start)
+                time.sleep(0.1)
 
-            render_thread.shutdown()
+        if self.aborted == True:
+            print "proxy render aborted"
 
         Gdk.threads_enter()
         _proxy_render_stopped()
         Gdk.threads_leave()
 
         # Remove unfinished proxy files
-        if self.current_render_file_path != None:
-            os.remove(self.current_render_file_path)
+        with self.jobs_lock:
+            for job in self.active_jobs:
+                job.render_thread.shutdown()
+                if os.path.exists(job.render_path):
+                    os.remove(job.render_path)
+            self.active_jobs = []
+
         # If we're currently proxy editing, we need to update 
         # all the clips on the timeline to use proxy media.
         if editorstate.PROJECT().proxy_data.proxy_mode == appconsts.USE_PROXY_MEDIA:
@@ -165,13 +162,59 @@ class ProxyRenderRunnerThread(threading.Thread):
         
         print "proxy render done"
 
-    def _create_img_seq_proxy(self, media_file, proxy_w, proxy_h, items, start):
-        now = time.time()
-        elapsed = now - start
+    def _launch_render_job(self, media_file, proxy_w, proxy_h, proxy_encoding):
+        # Create render objects
+        proxy_file_path = media_file.create_proxy_path(proxy_w, proxy_h, proxy_encoding)
+        renderconsumer.performance_settings_enabled = False
+        consumer = renderconsumer.get_render_consumer_for_encoding(
+                                                    proxy_file_path + PROXY_PART_EXTENSION,
+                                                    self.proxy_profile, 
+                                                    proxy_encoding)
+        renderconsumer.performance_settings_enabled = True
+        # Bit rates for proxy files are counted using 2500kbs for 
+        # PAL size image as starting point.
+        pal_pix_count = 720.0 * 576.0
+        pal_proxy_rate = 2500.0
+        proxy_pix_count = float(proxy_w * proxy_h)
+        proxy_rate = pal_proxy_rate * (proxy_pix_count / pal_pix_count)
+        proxy_rate = int(proxy_rate / 100) * 100 # Make proxy rate even hundred
+        # There are no practical reasons to have bitrates lower than 500kbs.
+        if proxy_rate < 500:
+            proxy_rate = 500
+        consumer.set("vb", str(int(proxy_rate)) + "k")
+
+        consumer.set("rescale", "nearest")
+
+        file_producer = mlt.Producer(self.proxy_profile, str(media_file.path))
+        mltrefhold.hold_ref(file_producer) # this may or may not be needed to avoid crashes
+        stop_frame = file_producer.get_length() - 1
+
+        # Create and launch render thread
+        render_thread = renderconsumer.FileRenderPlayer(None, file_producer, consumer, 0, stop_frame)
+        render_thread.start()
+
+        return ProxyRenderJob(media_file, proxy_file_path, render_thread, stop_frame)
+
+    def _update_progress(self, start, img_seq_file=None, img_seq_fraction=0.0):
+        # Aggregate fraction counts every file as one equal part
+        fraction = float(self.done_count) + img_seq_fraction
+        names = []
+        if img_seq_file != None:
+            names.append(img_seq_file.name)
+        for job in self.active_jobs:
+            fraction += job.get_render_fraction()
+            names.append(job.media_file.name)
+        fraction = fraction / float(len(self.files_to_render))
+        current_item = min(self.done_count + 1, len(self.files_to_render))
+        elapsed = time.time() - start
+
         Gdk.threads_enter()
-        progress_window.update_render_progress(0.0, media_file.name, items, len(self.files_to_render), elapsed)
+        progress_window.update_render_progress(fraction, ", ".join(names), current_item, len(self.files_to_render), elapsed)
         Gdk.threads_leave()
 
+    def _create_img_seq_proxy(self, media_file, proxy_w, proxy_h, start):
+        self._update_progress(start, media_file, 0.0)
+
         asset_folder, asset_file_name = os.path.split(media_file.path)
         lookup_filename = utils.get_img_seq_glob_lookup_name(asset_file_name)
         lookup_path = asset_folder + "/" + lookup_filename
@@ -181,36 +224,45 @@ class ProxyRenderRunnerThread(threading.Thread):
         if not os.path.isdir(copyfolder):
             os.makedirs(copyfolder)
         
-        listing = glob.glob(lookup_path)
-        size = proxy_w, proxy_h
-        done = 0
-        for orig_path in listing:
-            orig_folder, orig_file_name = os.path.split(orig_path)
-
-            try:
-                im = Image.open(orig_path)
-                im.thumbnail(size, Image.ANTIALIAS)
-                im.save(copyfolder + "/" + orig_file_name, "PNG")
-            except IOError:
-                print "proxy img seq frame failed for '%s'" % orig_path
-
-            done = done + 1
-        
-            frac = float(done) / float(len(listing))
-            now = time.time()
-            elapsed = now - start
-        
-            if done % 5 == 0:
-                Gdk.threads_enter()
-                progress_window.update_render_progress(frac, media_file.name, items, len(self.files_to_render), elapsed)
-                Gdk.threads_leave()
-        
-        media_file.add_proxy_file(proxy_file_path)
+        # Frames are resized in worker processes of a launched process, forking this process is not safe.
+        # Launched process has its own process group so that its workers are stopped with it on abort.
+        FLOG = open(utils.get_hidden_user_dir_path() + "log_img_seq_proxy_render", 'w')
+        with self.jobs_lock:
+            if self.aborted == True:
+                return
+            self.img_seq_process = subprocess.Popen([sys.executable, respaths.LAUNCH_DIR + "flowbladeimgseqproxy",
+                                                     lookup_path, copyfolder, str(proxy_w), str(proxy_h)],
+                                                     stdin=FLOG, stdout=subprocess.PIPE, stderr=FLOG,
+                                                     preexec_fn=os.setsid)
+        done = False
+        for line in iter(self.img_seq_process.stdout.readline, ""):
+            if line.startswith(imgseqproxy.PROGRESS_MSG):
+                self._update_progress(start, media_file, float(line.split()[1]))
+            elif line.startswith(imgseqproxy.DONE_MSG):
+                msg, frames, skipped = line.split()
+                print "proxy img seq done, frames: " + frames + ", already existing: " + skipped
+                done = True
+            else:
+                FLOG.write(line)
+
+        self.img_seq_process.wait()
+        FLOG.close()
+        with self.jobs_lock:
+            self.img_seq_process = None
+
+        if done == True and self.aborted == False:
+            media_file.add_proxy_file(proxy_file_path)
 
     def abort(self):
-        render_thread.shutdown()
         self.aborted = True
-        self.thread_running = False
+        with self.jobs_lock:
+            for job in self.active_jobs:
+                job.render_thread.shutdown()
+            if self.img_seq_process != None:
+                try:
+                    os.killpg(self.img_seq_process.pid, signal.SIGTERM)
+                except OSError:
+                    pass # already exited
 
 
 class ProxyManagerDialog:
@@ -404,7 +456,7 @@ class ProxyRenderProgressDialog:
 
 class ProxyRenderIssuesWindow:
     def __init__(self, files_to_render, already_have_proxies, not_video_files, is_proxy_file, 
-                 other_project_proxies, proxy_w, proxy_h, proxy_file_extension):
+                 other_project_proxies, proxy_w, proxy_h, proxy_encoding):
         dialog_title =_("Proxy Render Info")
         
         self.files_to_render = files_to_render
@@ -412,7 +464,7 @@ class ProxyRenderIssuesWindow:
         self.already_have_proxies = already_have_proxies
         self.proxy_w = proxy_w
         self.proxy_h = proxy_h
-        self.proxy_file_extension = proxy_file_extension
+        self.proxy_encoding = proxy_encoding
 
         self.issues = 1
         if (len(files_to_render) + len(already_have_proxies) + len(other_project_proxies)) == 0 and not_video_files > 0:
@@ -478,7 +530,7 @@ class ProxyRenderIssuesWindow:
         else:
             if self.action_select.get_active() == 0: # Render Unrendered Possible & Use existing
                 for f in self.other_project_proxies:
-                    f.add_existing_proxy_file(self.proxy_w, self.proxy_h, self.proxy_file_extension)
+                    f.add_existing_proxy_file(self.proxy_w, self.proxy_h, self.proxy_encoding)
                     if editorstate.PROJECT().proxy_data.proxy_mode == appconsts.USE_PROXY_MEDIA:
                         f.set_as_proxy_media_file()
         
@@ -541,13 +593,14 @@ def _do_create_proxy_files(media_files, retry_from_render_folder_select=False):
 
     proxy_profile = _get_proxy_profile(editorstate.PROJECT())
     proxy_w, proxy_h =  _get_proxy_dimensions(proxy_profile, editorstate.PROJECT().proxy_data.size)
-    proxy_file_extension = _get_proxy_encoding().extension
+    proxy_encoding = _get_proxy_encoding()
 
     files_to_render = []
     not_video_files = 0
     already_have_proxies = []
     is_proxy_file = 0
     other_project_proxies = []
+    reused_proxies = 0
     for f in media_files:
         if f.is_proxy_file == True: # Can't create a proxy file for a proxy file
             is_proxy_file = is_proxy_file + 1
@@ -564,10 +617,12 @@ def _do_create_proxy_files(media_files, retry_from_render_folder_select=False):
                 already_have_proxies.append(f)
                 continue
                 
-        path_for_size_and_encoding = f.create_proxy_path(proxy_w, proxy_h, proxy_file_extension)
-        if os.path.exists(path_for_size_and_encoding): # A proxy for media file (with these exact settings) has been created by other projects. 
-                                                       # Get user to confirm overwrite
-            other_project_proxies.append(f)
+        path_for_size_and_encoding = f.create_proxy_path(proxy_w, proxy_h, proxy_encoding)
+        if f.type != appconsts.IMAGE_SEQUENCE and os.path.exists(path_for_size_and_encoding):
+            # A proxy for media file content (with these exact settings) has been created by this or other projects.
+            # Proxy files are named by media content so it can be used without rendering.
+            _use_stored_proxy_file(f, path_for_size_and_encoding)
+            reused_proxies = reused_proxies + 1
             continue
 
         if f.type == appconsts.IMAGE_SEQUENCE:
@@ -578,11 +633,21 @@ def _do_create_proxy_files(media_files, retry_from_render_folder_select=False):
             
         files_to_render.append(f)
 
+    if reused_proxies > 0:
+        print "proxy files reused from proxy store: " + str(reused_proxies)
+        gui.media_list_view.widget.queue_draw()
+        if len(files_to_render) == 0 and len(already_have_proxies) == 0 \
+            and len(other_project_proxies) == 0 and not_video_files == 0 and is_proxy_file == 0:
+            # Nothing to render, runner thread still updates timeline clips to reused proxies when in proxy mode
+            if editorstate.PROJECT().proxy_data.proxy_mode == appconsts.USE_PROXY_MEDIA:
+                _create_proxy_files(files_to_render)
+            return
+
     if  len(already_have_proxies) > 0 or len(other_project_proxies) > 0 or not_video_files > 0 or is_proxy_file > 0 or len(files_to_render) == 0:
         global proxy_render_issues_window
         proxy_render_issues_window = ProxyRenderIssuesWindow(files_to_render, already_have_proxies, 
                                                              not_video_files, is_proxy_file, other_project_proxies,
-                                                             proxy_w, proxy_h, proxy_file_extension)
+                                                             proxy_w, proxy_h, proxy_encoding)
         return
 
     _create_proxy_files(files_to_render)
@@ -604,6 +669,26 @@ def _create_proxy_files(media_files_to_render):
     runner_thread = ProxyRenderRunnerThread(proxy_profile, media_files_to_render, set_as_proxy_immediately)
     runner_thread.start()
 
+def use_stored_proxy_file(media_file):
+    """
+    Called when media file is added to project. If proxy file for media file content with
+    current project proxy settings exists in proxy store, it is used without rendering.
+    """
+    if editorpersistance.prefs.render_folder == None:
+        return
+    if media_file.type != appconsts.VIDEO or media_file.has_proxy_file == True:
+        return
+
+    proxy_w, proxy_h = _get_proxy_file_dimensions(editorstate.PROJECT())
+    proxy_path = media_file.create_proxy_path(proxy_w, proxy_h, _get_proxy_encoding())
+    if os.path.exists(proxy_path):
+        _use_stored_proxy_file(media_file, proxy_path)
+
+def _use_stored_proxy_file(media_file, proxy_path):
+    media_file.add_proxy_file(proxy_path)
+    if editorstate.PROJECT().proxy_data.proxy_mode == appconsts.USE_PROXY_MEDIA:
+        media_file.set_as_proxy_media_file()
+
 # ------------------------------------------------------------------ module functions
 def _get_proxies_dir():
     return editorpersistance.prefs.render_folder + "/proxies"
@@ -612,7 +697,18 @@ def _get_proxy_encoding():
     enc_index = editorstate.PROJECT().proxy_data.encoding
     return renderconsumer.proxy_encodings[enc_index]
 
+def _get_proxy_render_jobs_count(files_count):
+    # Preference value 0 means that number of concurrent renders is derived from CPU count.
+    # Every render also uses some threads for decoding and encoding so half of the cores are used.
+    jobs = editorpersistance.prefs.proxy_render_jobs
+    if jobs < 1:
+        jobs = min(max(multiprocessing.cpu_count() / 2, 1), PROXY_RENDER_MAX_AUTO_JOBS)
+    return max(min(jobs, files_count), 1)
+
 def _get_proxy_dimensions(project_profile, proxy_size):
+    return _get_scaled_proxy_dimensions(project_profile.width(), project_profile.height(), proxy_size)
+
+def _get_scaled_proxy_dimensions(width, height, proxy_size):
     # Get new dimension that are about half of previous and diviseble by eight
     if proxy_size == PROXY_SIZE_FULL:
         size_mult = 1.0
@@ -621,12 +717,19 @@ def _get_proxy_dimensions(project_profile, proxy_size):
     else: # quarter size
         size_mult = 0.25
 
-    old_width_half = int(project_profile.width() * size_mult)
-    old_height_half = int(project_profile.height() * size_mult)
+    old_width_half = int(width * size_mult)
+    old_height_half = int(height * size_mult)
     new_width = old_width_half - old_width_half % 8
     new_height = old_height_half - old_height_half % 8
     return (new_width, new_height)
 
+def _get_proxy_file_dimensions(project):
+    # Same values as _get_proxy_dimensions(_get_proxy_profile(project), size) 
+    # used for proxy file paths, without writing and loading proxy profile.
+    proxy_size = project.proxy_data.size
+    profile_w, profile_h = _get_proxy_dimensions(project.profile, proxy_size)
+    return _get_scaled_proxy_dimensions(profile_w, profile_h, proxy_size)
+
 def _get_proxy_profile(project):
     project_profile = project.profile
     new_width, new_height = _get_proxy_dimensions(project_profile, project.proxy_data.size)
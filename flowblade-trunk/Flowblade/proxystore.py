@@ -0,0 +1,145 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module names proxy files by media file content.
+
+Proxy file names are created from a fingerprint of media file content and proxy
+dimensions and encoding. Same footage in different folders or projects gets
+the same proxy file, so an existing proxy can be used without rendering it again.
+
+Fingerprint is md5 of file size and sampled chunks from start, middle and end of file.
+Fingerprints are kept in memory while file size and mtime stay the same.
+"""
+
+import glob
+import md5
+import os
+import threading
+
+import appconsts
+import editorpersistance
+import utils
+
+SAMPLE_CHUNK_SIZE = 65536
+
+_fingerprints = {} # abs path -> (size, mtime, fingerprint)
+_lock = threading.Lock() # fingerprints are computed in media import and proxy render threads
+
+
+def get_proxy_path(media_path, media_type, proxy_width, proxy_height, proxy_encoding, unique=False):
+    """
+    Returns path of proxy file for media file in proxy store.
+    For image sequences path is to proxy frame file in proxy folder and proxy_encoding is not used.
+    If unique is True, path is to a new proxy file not shared with other media files.
+    """
+    fingerprint = get_fingerprint(media_path, media_type)
+    if fingerprint == None:
+        # Media not readable, name from path like before content names were used.
+        fingerprint = md5.new(media_path).hexdigest()
+
+    proxy_md_key = fingerprint + str(proxy_width) + "x" + str(proxy_height)
+    if media_type != appconsts.IMAGE_SEQUENCE:
+        # Different proxy encodings can have the same file extension
+        proxy_md_key = proxy_md_key + proxy_encoding.extension + proxy_encoding.attr_string
+    if unique == True:
+        proxy_md_key = proxy_md_key + os.urandom(16)
+    md_str = md5.new(proxy_md_key).hexdigest()
+
+    if media_type == appconsts.IMAGE_SEQUENCE:
+        folder, file_name = os.path.split(media_path)
+        return str(get_store_folder() + md_str + "/" + file_name)
+    else:
+        return str(get_store_folder() + md_str + "." + proxy_encoding.extension) # str() because we get unicode here
+
+def get_fingerprint(media_path, media_type=appconsts.VIDEO):
+    """
+    Returns content fingerprint string for media file or None if file cannot be read.
+    """
+    if media_type == appconsts.IMAGE_SEQUENCE:
+        return _get_img_seq_fingerprint(media_path)
+    return _get_file_fingerprint(media_path)
+
+def get_store_folder():
+    return editorpersistance.prefs.render_folder + "/proxies/"
+
+def get_store_size():
+    """
+    Returns size in bytes of all proxy files in store, including image sequence proxy frames.
+    """
+    size = 0
+    if editorpersistance.prefs.render_folder == None:
+        return size
+    for dir_path, dir_names, file_names in os.walk(get_store_folder()):
+        for file_name in file_names:
+            try:
+                size += os.path.getsize(os.path.join(dir_path, file_name))
+            except OSError:
+                pass
+    return size
+
+def _get_file_fingerprint(file_path):
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+
+    abs_path = os.path.abspath(file_path)
+    with _lock:
+        try:
+            size, mtime, fingerprint = _fingerprints[abs_path]
+            if size == st.st_size and mtime == st.st_mtime:
+                return fingerprint
+        except KeyError:
+            pass
+
+    try:
+        fingerprint = _compute_fingerprint(file_path, st.st_size)
+    except IOError:
+        return None
+
+    with _lock:
+        _fingerprints[abs_path] = (st.st_size, st.st_mtime, fingerprint)
+    return fingerprint
+
+def _compute_fingerprint(file_path, size):
+    digest = md5.new(str(size))
+    f = open(file_path, "rb")
+    try:
+        for offset in (0, size / 2, size - SAMPLE_CHUNK_SIZE):
+            f.seek(max(offset, 0))
+            digest.update(f.read(SAMPLE_CHUNK_SIZE))
+    finally:
+        f.close()
+    return digest.hexdigest()
+
+def _get_img_seq_fingerprint(media_path):
+    # Image sequence is identified by frame count and first and last frame contents.
+    asset_folder, asset_file_name = os.path.split(media_path)
+    lookup_path = asset_folder + "/" + utils.get_img_seq_glob_lookup_name(asset_file_name)
+    listing = sorted(glob.glob(lookup_path))
+    if len(listing) == 0:
+        return None
+
+    first = _get_file_fingerprint(listing[0])
+    last = _get_file_fingerprint(listing[-1])
+    if first == None or last == None:
+        return None
+    return md5.new(str(len(listing)) + first + last).hexdigest()
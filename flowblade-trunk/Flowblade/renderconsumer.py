@@ -33,6 +33,7 @@ import os
 # Jan-2017 - SvdB
 import editorpersistance
 
+import descriptorcache
 import mltenv
 import respaths
 from editorstate import PLAYER
@@ -68,7 +69,6 @@ VARIABLE_VAL = "%VARIABLE%"
 SCREEN_SIZE_RPL = "%SCREENSIZE%"
 ASPECT_RPL = "%ASPECT%"
 
-render_encoding_doc = None
 encoding_options = []
 not_supported_encoding_options = []
 quality_option_groups = {}
@@ -150,6 +150,9 @@ class EncodingOption:
             elif token_sides[0] == "f":
                 self.format = token_sides[1]
 
+        self.update_supported()
+
+    def update_supported(self):
         self.supported, self.err_msg = mltenv.render_profile_supported(self.format, 
                                                          self.vcodec,
                                                          self.acodec)
@@ -188,34 +191,18 @@ class EncodingOption:
     
 def load_render_profiles():
     """
-    Load render profiles from xml into DOM at start-up and build
-    object tree.
+    Load render profiles from xml at start-up and build object tree.
     """
     print "Loading render profiles..."
     file_path = respaths.ROOT_PATH + RENDER_ENCODING_FILE
-    global render_encoding_doc
-    render_encoding_doc = xml.dom.minidom.parse(file_path)
-
-    # Create quality option groups
-    global quality_option_groups
-    qgroup_nodes = render_encoding_doc.getElementsByTagName(QUALITY_GROUP)
-    for qgnode in qgroup_nodes:
-        quality_qroup = []
-        group_key = _get_attribute(qgnode, ID)
-        group_default_index = _get_attribute(qgnode, DEFAULT_INDEX)
-        if group_default_index != None: 
-            quality_option_groups_default_index[group_key] = group_default_index
-        option_nodes = qgnode.getElementsByTagName(QUALITY)
-        for option_node in option_nodes:
-            q_option = QualityOption(option_node)
-            quality_qroup.append(q_option)
-        quality_option_groups[group_key] = quality_qroup
+    global quality_option_groups, quality_option_groups_default_index
+    quality_option_groups, quality_option_groups_default_index, all_encoding_options, all_proxy_encodings = \
+        descriptorcache.load("render_profiles", [file_path], _parse_render_profiles)
 
-    # Create encoding options
+    # Parsed options are cached, availability is checked here every time
     global encoding_options, not_supported_encoding_options, non_user_encodings
-    encoding_option_nodes = render_encoding_doc.getElementsByTagName(ENCODING_OPTION)
-    for eo_node in encoding_option_nodes:
-        encoding_option = EncodingOption(eo_node)
+    for encoding_option in all_encoding_options:
+        encoding_option.update_supported()
         if encoding_option.supported:
             if encoding_option.nonuser == None:
                 encoding_options.append(encoding_option)
@@ -227,10 +214,9 @@ def load_render_profiles():
             #print encoding_option.name + msg
 
     # Proxy encoding
-    proxy_encoding_nodes = render_encoding_doc.getElementsByTagName(PROXY_ENCODING_OPTION)
     found_proxy_encodings = []
-    for proxy_node in proxy_encoding_nodes:
-        proxy_encoding_option = EncodingOption(proxy_node)
+    for proxy_encoding_option in all_proxy_encodings:
+        proxy_encoding_option.update_supported()
         if proxy_encoding_option.supported:
             msg = " ...available"
             found_proxy_encodings.append(proxy_encoding_option)
@@ -240,6 +226,41 @@ def load_render_profiles():
     global proxy_encodings
     proxy_encodings = found_proxy_encodings
 
+def _parse_render_profiles():
+    # Returns (quality option groups, quality groups default indexes, encoding options, proxy encoding options)
+    file_path = respaths.ROOT_PATH + RENDER_ENCODING_FILE
+    render_encoding_doc = xml.dom.minidom.parse(file_path)
+
+    # Create quality option groups, EncodingOption objects get their quality options from these
+    global quality_option_groups, quality_option_groups_default_index
+    quality_option_groups = {}
+    quality_option_groups_default_index = {}
+    qgroup_nodes = render_encoding_doc.getElementsByTagName(QUALITY_GROUP)
+    for qgnode in qgroup_nodes:
+        quality_qroup = []
+        group_key = _get_attribute(qgnode, ID)
+        group_default_index = _get_attribute(qgnode, DEFAULT_INDEX)
+        if group_default_index != None: 
+            quality_option_groups_default_index[group_key] = group_default_index
+        option_nodes = qgnode.getElementsByTagName(QUALITY)
+        for option_node in option_nodes:
+            q_option = QualityOption(option_node)
+            quality_qroup.append(q_option)
+        quality_option_groups[group_key] = quality_qroup
+
+    # Create encoding options
+    all_encoding_options = []
+    encoding_option_nodes = render_encoding_doc.getElementsByTagName(ENCODING_OPTION)
+    for eo_node in encoding_option_nodes:
+        all_encoding_options.append(EncodingOption(eo_node))
+
+    all_proxy_encodings = []
+    proxy_encoding_nodes = render_encoding_doc.getElementsByTagName(PROXY_ENCODING_OPTION)
+    for proxy_node in proxy_encoding_nodes:
+        all_proxy_encodings.append(EncodingOption(proxy_node))
+
+    return (quality_option_groups, quality_option_groups_default_index, all_encoding_options, all_proxy_encodings)
+
 def get_render_consumer_for_encoding_and_quality(file_path, profile, enc_opt_index, quality_opt_index):
     args_vals_list = get_args_vals_tuples_list_for_encoding_and_quality(profile,
                                                                        enc_opt_index,
@@ -0,0 +1,381 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module runs headless jobs in a persistent worker process.
+
+Audio levels, segment render and media import jobs are normally done in processes
+launched for each job, and each process initializes MLT, prefs, translations and
+descriptors before doing any work. When preference 'use_render_worker' is set, jobs
+are sent to a worker process that has done this init once and keeps running until
+it has been idle for WORKER_IDLE_TIMEOUT.
+
+Jobs are sent over a Unix socket in hidden user dir. Request and replies are lines
+of JSON. Worker replies ACCEPTED_MSG or ERROR_MSG to request and then sends job
+messages until DONE_MSG or ERROR_MSG. Client closing the connection aborts the job.
+
+If worker is not running, submit() launches it and returns None, and caller does
+the job in its own process like before. Worker crashing does not affect editor.
+"""
+
+import fcntl
+import json
+import locale
+import mlt
+import multiprocessing
+import os
+import pickle
+import socket
+import SocketServer
+import subprocess
+import sys
+import threading
+import time
+
+import editorpersistance
+import editorstate
+import lazyimport
+import mltenv
+import mltfilters
+import mltprofiles
+import mlttransitions
+import renderconsumer
+import respaths
+import translations
+import utils
+
+# Job modules use this module to send jobs, and are needed only in worker process
+audiowaveformrenderer = lazyimport.lazy_import("audiowaveformrenderer")
+projectmediaimport = lazyimport.lazy_import("projectmediaimport")
+segmentedrender = lazyimport.lazy_import("segmentedrender")
+
+SOCKET_FILE = "render_worker_socket"
+LOCK_FILE = "render_worker_lock"
+LOG_FILE = "log_render_worker"
+
+WORKER_IDLE_TIMEOUT = 30 * 60 # seconds, worker exits after being idle this long
+WORKER_START_WAIT = 30 # seconds, worker is not launched again while it may still be starting
+IDLE_CHECK_INTERVAL = 10 # seconds
+ACCEPT_TIMEOUT = 5 # seconds
+
+# Job types
+LEVELS_JOB = "levels"
+RENDER_JOB = "render"
+MEDIA_IMPORT_JOB = "media_import"
+
+# Messages
+ACCEPTED_MSG = "accepted"
+PROGRESS_MSG = "progress"
+LEVELS_DONE_MSG = "levels_done"
+DONE_MSG = "done"
+ERROR_MSG = "error"
+
+_launch_time = 0
+
+# Worker process state
+_pool = None
+_active_jobs = 0
+_last_job_time = 0
+_jobs_lock = threading.Lock()
+_media_import_lock = threading.Lock() # project loading uses module state
+
+
+# ------------------------------------------------------------- client
+class WorkerJob:
+    """
+    Job running in worker process.
+    """
+    def __init__(self, sock):
+        self.sock = sock
+        self.reader = sock.makefile("r")
+        self.done = False
+        self.error = None
+
+    def messages(self):
+        """
+        Yields job messages as dicts until job is done or fails.
+        After iteration self.done is True if job was completed.
+        """
+        try:
+            for line in iter(self.reader.readline, ""):
+                msg = json.loads(line)
+                if msg["msg"] == DONE_MSG:
+                    self.done = True
+                    break
+                elif msg["msg"] == ERROR_MSG:
+                    self.error = msg["error"]
+                    break
+                yield msg
+        except (socket.error, ValueError) as e:
+            self.error = str(e)
+        finally:
+            self.close()
+
+        if self.done == False and self.error == None:
+            self.error = "worker closed connection"
+        if self.error != None:
+            print "render worker job failed: " + self.error
+
+    def wait(self):
+        for msg in self.messages():
+            pass
+        return self.done
+
+    def abort(self):
+        # Unblocks thread iterating messages, worker stops job when it can't send messages
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+def submit(job_type, args):
+    """
+    Sends job to worker and returns WorkerJob, or None if worker is not used or not running.
+    Worker is launched if it is used and not running, caller must do this job without it.
+    """
+    if editorpersistance.prefs.use_render_worker == False:
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(ACCEPT_TIMEOUT)
+        sock.connect(_get_socket_path())
+        request = {"type":job_type, "root_path":respaths.ROOT_PATH, "args":args}
+        sock.sendall(json.dumps(request) + "\n")
+        job = WorkerJob(sock)
+        reply = json.loads(job.reader.readline())
+    except (socket.error, ValueError):
+        sock.close()
+        launch_worker()
+        return None
+
+    if reply["msg"] != ACCEPTED_MSG:
+        print "render worker refused job: " + reply.get("error", "")
+        job.close()
+        return None
+
+    sock.settimeout(None)
+    return job
+
+def start():
+    """
+    Launches worker at editor start if it is used and not already running.
+    """
+    if editorpersistance.prefs.use_render_worker == False:
+        return
+    if _is_running() == False:
+        launch_worker()
+
+def launch_worker():
+    """
+    Launches worker process if it is used. Worker exits itself if another worker is running.
+    """
+    global _launch_time
+    if editorpersistance.prefs.use_render_worker == False:
+        return
+    if time.time() - _launch_time < WORKER_START_WAIT:
+        return
+    _launch_time = time.time()
+
+    FLOG = open(utils.get_hidden_user_dir_path() + LOG_FILE, 'a')
+    # Own session so that worker is not stopped with terminal signals sent to editor
+    subprocess.Popen([sys.executable, respaths.LAUNCH_DIR + "flowbladerenderworker", respaths.ROOT_PATH],
+                     stdin=FLOG, stdout=FLOG, stderr=FLOG, close_fds=True, preexec_fn=os.setsid)
+
+def _is_running():
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(_get_socket_path())
+        return True
+    except socket.error:
+        return False
+    finally:
+        sock.close()
+
+def _get_socket_path():
+    return utils.get_hidden_user_dir_path() + SOCKET_FILE
+
+
+# ------------------------------------------------------------- worker process
+class JobRequestHandler(SocketServer.StreamRequestHandler):
+
+    def handle(self):
+        # Job was counted as started in WorkerServer.process_request()
+        try:
+            line = self.rfile.readline()
+            if line == "":
+                return # client only checked that worker is running
+            request = json.loads(line)
+            if request["root_path"] != respaths.ROOT_PATH:
+                # Worker was launched from another installation
+                self._send({"msg":ERROR_MSG, "error":"worker running from " + respaths.ROOT_PATH})
+                return
+            try:
+                job_func = _job_funcs[request["type"]]
+            except KeyError:
+                self._send({"msg":ERROR_MSG, "error":"unknown job type " + str(request["type"])})
+                return
+
+            self._send({"msg":ACCEPTED_MSG})
+            job_func(utils.utf8_strings(request["args"]), self._send)
+            self._send({"msg":DONE_MSG})
+        except socket.error:
+            print "render worker client disconnected"
+        except Exception as e:
+            print "render worker job failed:", e
+            try:
+                self._send({"msg":ERROR_MSG, "error":str(e)})
+            except socket.error:
+                pass
+        finally:
+            _job_ended()
+
+    def finish(self):
+        try:
+            SocketServer.StreamRequestHandler.finish(self)
+        except socket.error:
+            pass # client closed connection
+
+    def _send(self, msg):
+        self.wfile.write(json.dumps(msg) + "\n")
+        self.wfile.flush()
+
+
+class WorkerServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+    daemon_threads = True
+
+    def process_request(self, request, client_address):
+        # Job is counted in main thread before handler thread is started, so that idle
+        # check in main loop can not see worker as idle while job is starting.
+        _job_started()
+        try:
+            SocketServer.ThreadingMixIn.process_request(self, request, client_address)
+        except:
+            _job_ended()
+            raise
+
+
+def _do_levels_job(args, send):
+    profile_desc = args["profile_desc"]
+    jobs = [(clip_path, profile_desc) for clip_path in args["files"]]
+    for clip_path in _pool.imap_unordered(audiowaveformrenderer._render_levels_file, jobs):
+        if clip_path != None:
+            send({"msg":LEVELS_DONE_MSG, "path":clip_path})
+
+def _do_render_job(args, send):
+    args_file = open(args["args_path"], "rb")
+    args_vals_list = pickle.load(args_file)
+    args_file.close()
+
+    profile = mltprofiles.get_profile(args["profile_desc"])
+    segmentedrender.render_segment(args["xml_path"], args_vals_list, profile, args["segment_path"],
+                                   args["seg_in"], args["seg_out"],
+                                   lambda fraction: send({"msg":PROGRESS_MSG, "fraction":fraction}))
+
+def _do_media_import_job(args, send):
+    with _media_import_lock:
+        projectmediaimport.write_media_assets(args["project_path"])
+
+_job_funcs = {LEVELS_JOB:_do_levels_job,
+              RENDER_JOB:_do_render_job,
+              MEDIA_IMPORT_JOB:_do_media_import_job}
+
+def _job_started():
+    global _active_jobs
+    with _jobs_lock:
+        _active_jobs += 1
+
+def _job_ended():
+    global _active_jobs, _last_job_time
+    with _jobs_lock:
+        _active_jobs -= 1
+        _last_job_time = time.time()
+
+def _is_idle():
+    with _jobs_lock:
+        return _active_jobs == 0 and time.time() - _last_job_time > WORKER_IDLE_TIMEOUT
+
+def main():
+    # Called from .../launch/flowbladerenderworker script
+    global _pool, _last_job_time
+    root_path = sys.argv[1]
+    respaths.set_paths(root_path)
+
+    # Only one worker per user, lock is released when process exits
+    lock_file = open(utils.get_hidden_user_dir_path() + LOCK_FILE, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except IOError:
+        print "render worker already running"
+        return
+
+    try:
+        editorstate.mlt_version = mlt.LIBMLT_VERSION
+    except:
+        editorstate.mlt_version = "0.0.99" # magic string for "not found"
+
+    # Load editor prefs and list of recent projects
+    editorpersistance.load()
+
+    # Init translations module with translations data
+    translations.init_languages()
+    translations.load_filters_translations()
+    mlttransitions.init_module()
+
+    repo = mlt.Factory().init()
+
+    # Set numeric locale to use "." as radix, MLT initilizes this to OS locale and this causes bugs
+    locale.setlocale(locale.LC_NUMERIC, 'C')
+
+    # Check for codecs and formats on the system
+    mltenv.check_available_features(repo)
+    renderconsumer.load_render_profiles()
+
+    # Load filter and compositor descriptions from xml files.
+    mltfilters.load_filters_xml(mltenv.services)
+    mlttransitions.load_compositors_xml(mltenv.transitions)
+
+    # Create list of available mlt profiles
+    mltprofiles.load_profile_list()
+
+    # Levels processes are forked before server threads exist
+    _pool = multiprocessing.Pool(multiprocessing.cpu_count())
+
+    socket_path = _get_socket_path()
+    if os.path.exists(socket_path):
+        os.remove(socket_path) # left by worker that did not exit cleanly
+    server = WorkerServer(socket_path, JobRequestHandler)
+    os.chmod(socket_path, 0600)
+    server.timeout = IDLE_CHECK_INTERVAL
+    _last_job_time = time.time()
+    print "render worker started, pid " + str(os.getpid())
+
+    while not _is_idle():
+        server.handle_request()
+
+    server.server_close()
+    os.remove(socket_path)
+    _pool.terminate()
+    print "render worker exited after being idle"
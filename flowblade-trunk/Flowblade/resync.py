@@ -19,6 +19,7 @@
 """
 
 import appconsts
+import clipindex
 from editorstate import current_sequence
 
 # Syncing clips
@@ -66,7 +67,7 @@ def calculate_and_set_child_clip_sync_states():
     parent_track = current_sequence().first_video_track()
     for child_clip, track in sync_children.iteritems():
         child_index = track.clips.index(child_clip)
-        child_clip_start = track.clip_start(child_index) - child_clip.clip_in
+        child_clip_start = clipindex.clip_start(track, child_index) - child_clip.clip_in
 
         #print child_clip.id
         parent_clip = child_clip.sync_data.master_clip
@@ -75,7 +76,7 @@ def calculate_and_set_child_clip_sync_states():
         except:
             child_clip.sync_data.sync_state = appconsts.SYNC_PARENT_GONE
             continue
-        parent_clip_start = parent_track.clip_start(parent_index) - parent_clip.clip_in
+        parent_clip_start = clipindex.clip_start(parent_track, parent_index) - parent_clip.clip_in
 
         pos_offset = child_clip_start - parent_clip_start
         if pos_offset == child_clip.sync_data.pos_offset:
@@ -92,7 +93,7 @@ def get_resync_data_list():
     parent_track = current_sequence().first_video_track()
     for child_clip, track in sync_children.iteritems():
         child_index = track.clips.index(child_clip)
-        child_clip_start = track.clip_start(child_index) - child_clip.clip_in
+        child_clip_start = clipindex.clip_start(track, child_index) - child_clip.clip_in
 
         parent_clip = child_clip.sync_data.master_clip
         try:
@@ -100,7 +101,7 @@ def get_resync_data_list():
         except:
             # Parent clip no longer awailable
             continue
-        parent_clip_start = parent_track.clip_start(parent_index) - parent_clip.clip_in
+        parent_clip_start = clipindex.clip_start(parent_track, parent_index) - parent_clip.clip_in
 
         pos_offset = child_clip_start - parent_clip_start
 
@@ -117,7 +118,7 @@ def get_resync_data_list_for_clip_list(clips_list):
     for clip_track_tuple in clips_list:
         child_clip, track = clip_track_tuple
         child_index = track.clips.index(child_clip)
-        child_clip_start = track.clip_start(child_index) - child_clip.clip_in
+        child_clip_start = clipindex.clip_start(track, child_index) - child_clip.clip_in
 
         parent_clip = child_clip.sync_data.master_clip
         try:
@@ -125,7 +126,7 @@ def get_resync_data_list_for_clip_list(clips_list):
         except:
             # Parent clip no longer awailable
             continue
-        parent_clip_start = parent_track.clip_start(parent_index) - parent_clip.clip_in
+        parent_clip_start = clipindex.clip_start(parent_track, parent_index) - parent_clip.clip_in
 
         pos_offset = child_clip_start - parent_clip_start
 
@@ -0,0 +1,58 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module converts MLT images to cairo surfaces.
+
+MLT mlt_image_rgb24a data has bytes in R, G, B, A order and cairo 32 bit formats
+want B, G, R, A on little endian machines. Conversion is done with a single
+copy from a read-only view of MLT data into the surface buffer.
+"""
+
+import cairo
+
+import lazyimport
+
+# numpy is imported when first frame is converted, not at application start
+np = lazyimport.lazy_import("numpy")
+
+# Byte order of cairo pixel from MLT rgb24a pixel
+_CAIRO_BYTE_ORDER = [2, 1, 0, 3]
+
+
+def get_surface_from_mlt_rgb(rgb_data, width, height):
+    """
+    Returns cairo.ImageSurface created from frame.get_image(mlt.mlt_image_rgb24a, width, height) data.
+    Surface format is FORMAT_RGB24, alpha is not used.
+    """
+    width = int(width)
+    height = int(height)
+
+    # MLT may give more data then width * height pixels, view to only needed part
+    src = np.frombuffer(rgb_data, dtype=np.uint8, count=width * height * 4)
+    src.shape = (height, width, 4)
+
+    stride = cairo.ImageSurface.format_stride_for_width(cairo.FORMAT_RGB24, width)
+    buf = np.empty((height, stride), dtype=np.uint8)
+    dst = buf.reshape(height, stride / 4, 4)[:, 0:width, :] # view into buf
+    np.take(src, _CAIRO_BYTE_ORDER, axis=2, out=dst, mode="clip") # "raise" mode would buffer out
+
+    # Surface keeps reference to buf
+    return cairo.ImageSurface.create_for_data(buf, cairo.FORMAT_RGB24, width, height, stride)
@@ -27,6 +27,7 @@ import mlt
 import os
 
 import appconsts
+import clipindex
 import edit
 import editorstate
 import mltfilters
@@ -111,6 +112,7 @@ class Sequence:
         self.watermark_filter = None
         self.watermark_file_path = None
         self.seq_len = 0 # used in trim crash hack, remove when fixed
+        self.edit_generation = 0 # Bumped on every edit and other saved change, autosave uses this to find changed sequences
 
         # MLT objects for a multitrack sequence
         self.init_mlt_objects()
@@ -294,11 +296,13 @@ class Sequence:
         for i in range (1, len(self.tracks) - 1):# visible tracks
             track = self.tracks[i]
             track.height = TRACK_HEIGHT_SMALL
+        self.edit_generation += 1
 
     def maximize_tracks_height(self, allocation):
         for i in range (1, len(self.tracks) - 1):# visible tracks
             track = self.tracks[i]
             track.height = TRACK_HEIGHT_NORMAL
+        self.edit_generation += 1
     
         self.resize_tracks_to_fit(allocation)
 
@@ -540,6 +544,7 @@ class Sequence:
                     for f in clip.filters:
                         f.active = is_active
                         f.update_mlt_disabled_value()
+        self.edit_generation += 1
         
     # ------------------------------------------------------ compositors
     def create_compositor(self, compositor_type):
@@ -826,6 +831,7 @@ class Sequence:
         black_track_clip.clip_in = c_in
         black_track_clip.clip_out = c_out
         black_track_clip.set_in_and_out(c_in, c_out)
+        clipindex.clips_changed()
 
     def get_length(self):
         return self.multitrack.get_length()
@@ -860,14 +866,14 @@ class Sequence:
                 continue
             
             # Get index and clip
-            index = track.get_clip_index_at(tline_frame)
+            index = clipindex.get_clip_index_at(track, tline_frame)
             try:
                 clip = track.clips[index]            
             except Exception:
                 continue # Frame after last clip in track
             
             # Get next cut frame
-            clip_start_in_tline = track.clip_start(index)
+            clip_start_in_tline = clipindex.clip_start(track, index)
             length = clip.clip_out - clip.clip_in 
             next_cut_frame = clip_start_in_tline + length + 1 # +1 clip out inclusive
  
@@ -890,8 +896,8 @@ class Sequence:
                 continue
             
             # Get index and clip start
-            index = track.get_clip_index_at(tline_frame)
-            clip_start_frame = track.clip_start(index)
+            index = clipindex.get_clip_index_at(track, tline_frame)
+            clip_start_frame = clipindex.clip_start(track, index)
             
             # If we are on cut, we want previous cut
             if clip_start_frame == tline_frame:
@@ -904,7 +910,7 @@ class Sequence:
                 continue # index not good clip
             
             # Get prev cut frame
-            next_cut_frame = track.clip_start(index)
+            next_cut_frame = clipindex.clip_start(track, index)
             
             # Set cut frame
             if cut_frame == -1:
@@ -916,13 +922,13 @@ class Sequence:
     
     def get_closest_cut_frame(self, track_id, frame):
         track = self.tracks[track_id]
-        index = track.get_clip_index_at(frame)
+        index = clipindex.get_clip_index_at(track, frame)
         try:
             clip = track.clips[index]            
         except Exception:
             return -1
             
-        start_frame = track.clip_start(index)
+        start_frame = clipindex.clip_start(track, index)
         start_dist = frame - start_frame
         end_frame = start_frame + (clip.clip_out - clip.clip_in + 1) # frames are inclusive
         end_dist = end_frame - frame
@@ -958,7 +964,7 @@ class Sequence:
         """
         Returns index or -1 if frame not on a clip
         """
-        index = track.get_clip_index_at(frame)
+        index = clipindex.get_clip_index_at(track, frame)
         try:
             clip = track.clips[index]
         except Exception:
@@ -970,6 +976,7 @@ class Sequence:
         track = self.tracks[track_index]
         track.mute_state = mute_state
         track.set("hide", int(track.mute_state))
+        self.edit_generation += 1
 
     def drop_audio_levels(self):
         for i in range(1, len(self.tracks)):
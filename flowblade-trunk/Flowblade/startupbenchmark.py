@@ -0,0 +1,100 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Benchmark for startup work that is cached between launches.
+
+Times MLT environment detection and filters, compositors and render profiles
+loading with and without caches. Run from Flowblade folder:
+
+    python startupbenchmark.py [rounds]
+"""
+
+import locale
+import mlt
+import os
+import sys
+import time
+
+import descriptorcache
+import editorstate
+import mltenv
+import mltfilters
+import mlttransitions
+import renderconsumer
+import respaths
+
+
+def _time_call(func, rounds, clear_func=None):
+    # Returns best time of rounds in milliseconds
+    best = None
+    for i in range(0, rounds):
+        if clear_func != None:
+            clear_func()
+        start = time.time()
+        func()
+        elapsed = (time.time() - start) * 1000.0
+        if best == None or elapsed < best:
+            best = elapsed
+    return best
+
+def _report(name, uncached, cached):
+    print "%-20s %10.1f ms %10.1f ms %8.1fx" % (name, uncached, cached, uncached / max(cached, 0.001))
+
+def main():
+    rounds = 5
+    if len(sys.argv) > 1:
+        rounds = int(sys.argv[1])
+
+    respaths.set_paths(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        editorstate.mlt_version = mlt.LIBMLT_VERSION
+    except:
+        editorstate.mlt_version = "0.0.99"
+
+    repo = mlt.Factory().init()
+    locale.setlocale(locale.LC_NUMERIC, 'C')
+
+    print "Best of " + str(rounds) + " rounds, MLT " + editorstate.mlt_version
+    print "%-20s %13s %13s %9s" % ("", "not cached", "cached", "speedup")
+
+    env_uncached = _time_call(lambda: mltenv.check_available_features(repo, True), rounds)
+    env_cached = _time_call(lambda: mltenv.check_available_features(repo), rounds)
+    _report("MLT environment", env_uncached, env_cached)
+
+    descriptors = [("filters", [respaths.FILTERS_XML_DOC], mltfilters._parse_filters_xml),
+                   ("compositors", [respaths.COMPOSITORS_XML_DOC], mlttransitions._parse_compositors_xml),
+                   ("render_profiles", [respaths.ROOT_PATH + renderconsumer.RENDER_ENCODING_FILE], renderconsumer._parse_render_profiles)]
+
+    total_uncached = env_uncached
+    total_cached = env_cached
+    for name, paths, parse_func in descriptors:
+        load = lambda: descriptorcache.load(name, paths, parse_func)
+        uncached = _time_call(load, rounds, lambda: descriptorcache.clear(name))
+        cached = _time_call(load, rounds)
+        _report(name, uncached, cached)
+        total_uncached += uncached
+        total_cached += cached
+
+    _report("total", total_uncached, total_cached)
+
+
+if __name__ == "__main__":
+    main()
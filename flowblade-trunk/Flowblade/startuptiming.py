@@ -0,0 +1,137 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module measures application startup time.
+
+Enabled by launching with '-startup-timing' flag. Import times of modules are
+measured by wrapping __import__ and init step times are recorded by calls to step()
+in app.main(). Report is printed when startup is done and modules imported
+lazily later are printed when they are loaded.
+
+All functions are cheap no-ops when timing is not enabled.
+"""
+
+import __builtin__
+import sys
+import thread
+import time
+
+STARTUP_TIMING_FLAG = "-startup-timing"
+REPORT_MODULES_COUNT = 30
+
+enabled = False
+
+_start_time = 0
+_step_time = 0
+_steps = [] # (step name, seconds)
+_imports = {} # import name -> [inclusive seconds, self seconds]
+_import_stack = [] # seconds spent in nested imports for each import in progress
+_orig_import = None
+_main_thread_id = None
+
+
+def start():
+    """
+    Starts timing and measuring imports. Called from launch script before app is imported.
+    """
+    global enabled, _start_time, _step_time, _orig_import, _main_thread_id
+    enabled = True
+    _start_time = time.time()
+    _step_time = _start_time
+    _main_thread_id = thread.get_ident()
+    _orig_import = __builtin__.__import__
+    __builtin__.__import__ = _timed_import
+
+def start_if_requested():
+    if STARTUP_TIMING_FLAG in sys.argv:
+        start()
+
+def step(name):
+    """
+    Records time since previous step as time used by init step name.
+    """
+    global _step_time
+    if enabled == False:
+        return
+    now = time.time()
+    _steps.append((name, now - _step_time))
+    _step_time = now
+
+def lazy_import_done(name, seconds):
+    if enabled == False:
+        return
+    print "Startup timing: lazy import " + name + " " + _ms(seconds) + " ms"
+
+def report():
+    """
+    Prints startup timing report and stops measuring imports.
+    Returns False so that it can be used as GLib idle callback.
+    """
+    global _orig_import
+    if enabled == False:
+        return False
+    total = time.time() - _start_time
+    if _orig_import != None:
+        __builtin__.__import__ = _orig_import
+        _orig_import = None
+
+    imports_total = 0.0
+    for name, (inclusive, self_time) in _imports.iteritems():
+        imports_total += self_time
+
+    print "Startup timing report, total " + _ms(total) + " ms"
+    print "Module imports " + _ms(imports_total) + " ms, " + str(len(_imports)) + " modules, slowest:"
+    print "%10s %10s  %s" % ("self ms", "total ms", "module")
+    slowest = sorted(_imports.iteritems(), key=lambda item: item[1][1], reverse=True)
+    for name, (inclusive, self_time) in slowest[0:REPORT_MODULES_COUNT]:
+        print "%10s %10s  %s" % (_ms(self_time), _ms(inclusive), name)
+
+    print "Init steps:"
+    for name, seconds in _steps:
+        print "%10s  %s" % (_ms(seconds), name)
+
+    return False
+
+def _timed_import(name, globals=None, locals=None, fromlist=None, level=-1):
+    # Imports from other threads are not timed, nesting stack is for main thread only
+    if thread.get_ident() != _main_thread_id:
+        return _orig_import(name, globals, locals, fromlist, level)
+
+    modules_count = len(sys.modules)
+    _import_stack.append(0.0)
+    start = time.time()
+    try:
+        return _orig_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.time() - start
+        nested = _import_stack.pop()
+        if len(_import_stack) > 0:
+            _import_stack[-1] += elapsed
+        # Only record imports that loaded new modules
+        if len(sys.modules) != modules_count:
+            if fromlist:
+                name = name + " (" + ", ".join(fromlist) + ")"
+            times = _imports.setdefault(name, [0.0, 0.0])
+            times[0] += elapsed
+            times[1] += elapsed - nested
+
+def _ms(seconds):
+    return "%.1f" % (seconds * 1000.0)
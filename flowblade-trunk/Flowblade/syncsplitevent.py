@@ -25,6 +25,7 @@ Module handles events related to audiosplits and setting clip sync relationships
 from gi.repository import Gtk, Gdk
 
 import appconsts
+import clipindex
 import dialogutils
 import edit
 import editorstate
@@ -68,7 +69,7 @@ def split_audio_from_clips_list(clips, track):
     for clip in clips:
         # We're using the existing function to do thid need x for clip frame to use it
         index = track.clips.index(clip)
-        frame = track.clip_start(index)
+        frame = clipindex.clip_start(track, index)
         x = tlinewidgets._get_frame_x(frame)
 
         popup_data = (clip, track, item_id, x)
@@ -81,7 +82,7 @@ def _do_split_audio_edit(popup_data):
     clip, track, item_id, x = popup_data
     press_frame = tlinewidgets.get_frame(x)
     index = current_sequence().get_clip_index(track, press_frame)
-    frame = track.clip_start(index)
+    frame = clipindex.clip_start(track, index)
 
     audio_clip = current_sequence().create_file_producer_clip(clip.path)
     audio_clip.media_type = appconsts.AUDIO
@@ -32,6 +32,7 @@ from operator import itemgetter
 import appconsts
 import boxmove
 import clipeffectseditor
+import clipindex
 import compositeeditor
 import compositormodes
 import dialogs
@@ -135,7 +136,7 @@ def cut_pressed():
            continue 
 
         # Get index and clip
-        index = track.get_clip_index_at(int(tline_frame))
+        index = clipindex.get_clip_index_at(track, int(tline_frame))
         try:
             clip = track.clips[index]            
             # don't cut blanck clip
@@ -145,7 +146,7 @@ def cut_pressed():
             continue # Frame after last clip in track
 
         # Get cut frame in clip frames
-        clip_start_in_tline = track.clip_start(index)
+        clip_start_in_tline = clipindex.clip_start(track, index)
         clip_frame = tline_frame - clip_start_in_tline + clip.clip_in
 
         # Dont edit if frame on cut.
@@ -350,9 +351,9 @@ def three_point_overwrite_pressed():
     if editevent.track_lock_check_and_user_info(track, three_point_overwrite_pressed, "3 point overwrite"):
         return
     
-    range_start_frame = track.clip_start(movemodes.selected_range_in)
+    range_start_frame = clipindex.clip_start(track, movemodes.selected_range_in)
     out_clip = track.clips[movemodes.selected_range_out]
-    out_start = track.clip_start(movemodes.selected_range_out)
+    out_start = clipindex.clip_start(track, movemodes.selected_range_out)
     range_end_frame = out_start + out_clip.clip_out - out_clip.clip_in
     range_length = range_end_frame - range_start_frame + 1 # calculated end is incl.
 
@@ -456,7 +457,7 @@ def range_overwrite_pressed():
     action = edit.range_overwrite_action(data)
     action.do_edit()
 
-    updater.display_tline_cut_frame(track, track.get_clip_index_at(mark_in_frame))
+    updater.display_tline_cut_frame(track, clipindex.get_clip_index_at(track, mark_in_frame))
 
 def _show_three_poimt_edit_not_defined():
     primary_txt = _("3 point edit not defined!")
@@ -521,7 +522,7 @@ def sync_compositor(compositor):
                              gui.editor_window.window)
         return
     clip_index = track.clips.index(origin_clip)
-    clip_start = track.clip_start(clip_index)
+    clip_start = clipindex.clip_start(track, clip_index)
     clip_end = clip_start + origin_clip.clip_out - origin_clip.clip_in
     
     # Auto fades need to go to start or end of clips and maintain their lengths
@@ -605,7 +606,7 @@ def sync_all_compositors():
     for resync_item in resync_list:
         try:
             clip, track, clip_index, compositor = resync_item
-            clip_start = track.clip_start(clip_index)
+            clip_start = clipindex.clip_start(track, clip_index)
             clip_end = clip_start + clip.clip_out - clip.clip_in
             
             # Auto fades need to go to start or end of clips and maintain their lengths
@@ -1171,9 +1172,11 @@ def _marker_menu_item_activated(widget, msg):
                 mrk_index = i
         if mrk_index != -1:
             current_sequence().markers.pop(mrk_index)
+            current_sequence().edit_generation += 1
             updater.repaint_tline()
     elif msg == "deleteall":
         current_sequence().markers = []
+        current_sequence().edit_generation += 1
         updater.repaint_tline()
     else: # seek to marker
         name, frame = current_sequence().markers[int(msg)]
@@ -1197,6 +1200,7 @@ def _marker_add_dialog_callback(dialog, response_id, name_entry):
 
     current_sequence().markers.append((name, current_frame))
     current_sequence().markers = sorted(current_sequence().markers, key=itemgetter(1))
+    current_sequence().edit_generation += 1
     updater.repaint_tline()
     
 
@@ -1214,4 +1218,5 @@ def set_track_small_height(track_index):
     track.height = appconsts.TRACK_HEIGHT_SMALL
     if editorstate.SCREEN_HEIGHT < 863:
         track.height = appconsts.TRACK_HEIGHT_SMALLEST
+    current_sequence().edit_generation += 1
 
@@ -35,6 +35,7 @@ import appconsts
 import audiowaveformrenderer
 import cairoarea
 import clipeffectseditor
+import clipindex
 import editorpersistance
 from editorstate import current_sequence
 from editorstate import timeline_visible
@@ -43,6 +44,7 @@ from editorstate import PROJECT
 from editorstate import EDIT_MODE
 from editorstate import current_proxy_media_paths
 import editorstate
+import framegrabber
 import gui
 import respaths
 import sequence
@@ -198,6 +200,18 @@ BLANK_CLIP_COLOR_GRAD_L = (0, 0.6, 0.6, 0.65, 1)
 BLANK_CLIP_COLOR_SELECTED_GRAD = (1, 0.7, 0.7, 0.75, 1)
 BLANK_CLIP_COLOR_SELECTED_GRAD_L = (0, 0.7, 0.7, 0.75, 1)
 
+# Clip bg gradient types and their color stops
+CLIP_BG_BLANK = 0
+CLIP_BG_BLANK_SELECTED = 1
+CLIP_BG_VIDEO = 2
+CLIP_BG_IMAGE = 3
+CLIP_BG_AUDIO = 4
+CLIP_BG_GRAD_STOPS = {CLIP_BG_BLANK:(BLANK_CLIP_COLOR_GRAD, BLANK_CLIP_COLOR_GRAD_L),
+                      CLIP_BG_BLANK_SELECTED:(BLANK_CLIP_COLOR_SELECTED_GRAD, BLANK_CLIP_COLOR_SELECTED_GRAD_L),
+                      CLIP_BG_VIDEO:(CLIP_COLOR_GRAD, CLIP_COLOR_GRAD_L),
+                      CLIP_BG_IMAGE:(IMAGE_CLIP_COLOR_GRAD, IMAGE_CLIP_COLOR_GRAD_L),
+                      CLIP_BG_AUDIO:(AUDIO_CLIP_COLOR_GRAD, AUDIO_CLIP_COLOR_GRAD_L)}
+
 SINGLE_TRACK_TRANSITION_SELECTED = (0.8, 0.8, 1.0)
 
 SYNC_OK_COLOR = (0.18, 0.55, 0.18)
@@ -287,6 +301,14 @@ trim_status = appconsts.ON_BETWEEN_FRAME
 # Dict for clip thumbnails path -> image
 clip_thumbnails = {}
 
+# Incremented to force redraw of cached track layer when something else then
+# sequence edits, scroll, zoom or canvas size changes how tracks are drawn,
+# e.g. clip selection or thumbnails. Sequence edits bump sequence edit_generation.
+track_layer_generation = 0
+
+# Clip bg gradients for track heights, track height -> {clip bg type -> cairo.LinearGradient}
+clip_bg_patterns = {}
+
 # Timeline match image
 match_frame = -1
 match_frame_track_index = -1
@@ -294,9 +316,41 @@ image_on_right = True
 match_frame_image = None
 match_frame_width = 1
 match_frame_height = 1
+match_frame_clip_path = None
+match_frame_clip_frame = -1
 
 
 # ------------------------------------------------------------------- module functions
+def invalidate_track_layer():
+    global track_layer_generation
+    track_layer_generation += 1
+
+def clear_clip_bg_patterns():
+    global clip_bg_patterns
+    clip_bg_patterns = {}
+
+def _get_clip_bg_patterns(track_height, y):
+    """
+    Returns clip bg gradients for track height moved to track y position.
+    """
+    try:
+        patterns = clip_bg_patterns[track_height]
+    except KeyError:
+        patterns = {}
+        for bg_type, color_stops in CLIP_BG_GRAD_STOPS.iteritems():
+            grad = cairo.LinearGradient(0, 0, 0, track_height)
+            for color_stop in color_stops:
+                grad.add_color_stop_rgba(*color_stop)
+            patterns[bg_type] = grad
+        clip_bg_patterns[track_height] = patterns
+
+    # Gradients are created in track local coordinates, pattern matrix maps them to track position.
+    matrix = cairo.Matrix(y0=-y)
+    for grad in patterns.itervalues():
+        grad.set_matrix(matrix)
+
+    return patterns
+
 def load_icons():
     global FULL_LOCK_ICON, FILTER_CLIP_ICON, VIEW_SIDE_ICON,\
     COMPOSITOR_CLIP_ICON, INSERT_ARROW_ICON, AUDIO_MUTE_ICON, MARKER_ICON, \
@@ -365,13 +419,16 @@ def set_dark_bg_color():
 
     global BG_COLOR
     BG_COLOR = get_multiplied_color((r, g, b), 1.25)
+    clear_clip_bg_patterns()
 
-def set_match_frame(tline_match_frame, track_index, display_on_right):
-    global match_frame, match_frame_track_index, image_on_right, match_frame_image
+def set_match_frame(tline_match_frame, track_index, display_on_right, clip_path=None, clip_frame=-1):
+    global match_frame, match_frame_track_index, image_on_right, match_frame_image, match_frame_clip_path, match_frame_clip_frame
     match_frame = tline_match_frame
     match_frame_track_index = track_index
     image_on_right = display_on_right
     match_frame_image = None
+    match_frame_clip_path = clip_path
+    match_frame_clip_frame = clip_frame
 
 def match_frame_close_hit(x, y):
     if match_frame == -1:
@@ -1309,6 +1366,11 @@ class TimeLineCanvas:
         
         # Drag state
         self.drag_on = False
+
+        # Offscreen surface with background, tracks, compositors and sync relations drawn
+        self.track_layer = None
+        self.track_layer_size = None
+        self.track_layer_key = None
                 
         # for edit mode setting
         global canvas_widget
@@ -1372,11 +1434,11 @@ class TimeLineCanvas:
         if clip_index == -1:
             return
 
-        clip_start_frame = track.clip_start(clip_index) - pos
+        clip_start_frame = clipindex.clip_start(track, clip_index) - pos
         if abs(x - _get_frame_x(clip_start_frame)) < 5:
             return
 
-        clip_end_frame = track.clip_start(clip_index + 1) - pos
+        clip_end_frame = clipindex.clip_start(track, clip_index + 1) - pos
         if abs(x - _get_frame_x(clip_end_frame)) < 5:
             return
 
@@ -1384,28 +1446,18 @@ class TimeLineCanvas:
     def _draw(self, event, cr, allocation):
         x, y, w, h = allocation
 
-        # Draw bg
-        cr.set_source_rgb(*BG_COLOR)
-        cr.rectangle(0, 0, w, h)
-        cr.fill()
-
         # This can get called during loads by unwanted expose events
         if editorstate.project_is_loading == True:
+            cr.set_source_rgb(*BG_COLOR)
+            cr.rectangle(0, 0, w, h)
+            cr.fill()
             return
 
-        # Init sync draw structures
-        self.parent_positions = {}
-        self.sync_children = []
-
-        # Draw tracks
-        for i in range(1, len(current_sequence().tracks) - 1): # black and hidden tracks are ignored
-            self.draw_track(cr
-                            ,current_sequence().tracks[i]
-                            ,_get_track_y(i)
-                            ,w)
-
-        self.draw_compositors(cr)
-        self.draw_sync_relations(cr)
+        # Draw tracks from cache, they are only redrawn after edits, scrolls, zooms and 
+        # other changes that invalidate cached layer, not when only frame pointer moves.
+        self._update_track_layer(cr, w, h)
+        cr.set_source_surface(self.track_layer, 0, 0)
+        cr.paint()
 
         # Exit displaying from fake_current_pointer for SLIDE_TRIM mode if last displayed 
         # was from fake_pointer but this is not anymore
@@ -1442,6 +1494,38 @@ class TimeLineCanvas:
         
         audiowaveformrenderer.launch_queued_renders()
 
+    def _update_track_layer(self, cr, w, h):
+        seq = current_sequence()
+        layer_key = (id(seq), seq.edit_generation, pos, pix_per_frame, w, h, track_layer_generation)
+        if self.track_layer != None and self.track_layer_key == layer_key:
+            return
+
+        if self.track_layer == None or self.track_layer_size != (w, h):
+            self.track_layer = cr.get_target().create_similar(cairo.CONTENT_COLOR, w, h)
+            self.track_layer_size = (w, h)
+        layer_cr = cairo.Context(self.track_layer)
+
+        # Draw bg
+        layer_cr.set_source_rgb(*BG_COLOR)
+        layer_cr.rectangle(0, 0, w, h)
+        layer_cr.fill()
+
+        # Init sync draw structures
+        self.parent_positions = {}
+        self.sync_children = []
+
+        # Draw tracks
+        for i in range(1, len(current_sequence().tracks) - 1): # black and hidden tracks are ignored
+            self.draw_track(layer_cr
+                            ,current_sequence().tracks[i]
+                            ,_get_track_y(i)
+                            ,w)
+
+        self.draw_compositors(layer_cr)
+        self.draw_sync_relations(layer_cr)
+
+        self.track_layer_key = layer_key
+
     def draw_track(self, cr, track, y, width):
         """
         Draws visible clips in track.
@@ -1454,8 +1538,8 @@ class TimeLineCanvas:
             text_y = TEXT_Y_SMALL
 
         # Get clip indexes for clips overlapping first and last displayed frame.
-        start = track.get_clip_index_at(int(pos))
-        end = track.get_clip_index_at(int(pos + width / pix_per_frame))
+        start = clipindex.get_clip_index_at(track, int(pos))
+        end = clipindex.get_clip_index_at(track, int(pos + width / pix_per_frame))
         #print start, end
         width_frames = float(width) / pix_per_frame
 
@@ -1466,7 +1550,7 @@ class TimeLineCanvas:
             end = end + 1
             
         # Get frame of clip.clip_in_in on timeline.
-        clip_start_in_tline = track.clip_start(start)
+        clip_start_in_tline = clipindex.clip_start(track, start)
 
         # Pos is the first drawn frame.
         # clip_start_frame starts always less or equal to zero as this is
@@ -1480,6 +1564,8 @@ class TimeLineCanvas:
 
         proxy_paths = current_proxy_media_paths()
 
+        bg_patterns = _get_clip_bg_patterns(track_height, y)
+
         global clip_thumbnails
                 
         # Draw clips in draw range
@@ -1507,43 +1593,28 @@ class TimeLineCanvas:
                     clip_bg_col = clip.color
                 elif clip.is_blanck_clip:
                     if clip.selected:
-                        grad = cairo.LinearGradient (0, y, 0, y + track_height)
-                        grad.add_color_stop_rgba(*BLANK_CLIP_COLOR_SELECTED_GRAD)
-                        grad.add_color_stop_rgba(*BLANK_CLIP_COLOR_SELECTED_GRAD_L)
-                        cr.set_source(grad)
+                        cr.set_source(bg_patterns[CLIP_BG_BLANK_SELECTED])
                     else:
-                        grad = cairo.LinearGradient (0, y, 0, y + track_height)
-                        grad.add_color_stop_rgba(*BLANK_CLIP_COLOR_GRAD)
-                        grad.add_color_stop_rgba(*BLANK_CLIP_COLOR_GRAD_L)
-                        cr.set_source(grad)
+                        cr.set_source(bg_patterns[CLIP_BG_BLANK])
                 elif track.type == sequence.VIDEO:
                     if clip.media_type == sequence.VIDEO:
                         if not clip.selected:
-                            grad = cairo.LinearGradient (0, y, 0, y + track_height)
-                            grad.add_color_stop_rgba(*CLIP_COLOR_GRAD)
-                            grad.add_color_stop_rgba(*CLIP_COLOR_GRAD_L)
                             clip_bg_col = CLIP_COLOR_GRAD[1:4]
-                            cr.set_source(grad)
+                            cr.set_source(bg_patterns[CLIP_BG_VIDEO])
                         else:
                             cr.set_source_rgb(*CLIP_SELECTED_COLOR)
                             clip_bg_col = CLIP_SELECTED_COLOR
                     else: # IMAGE type
                         if not clip.selected:
-                            grad = cairo.LinearGradient (0, y, 0, y + track_height)
-                            grad.add_color_stop_rgba(*IMAGE_CLIP_COLOR_GRAD)
-                            grad.add_color_stop_rgba(*IMAGE_CLIP_COLOR_GRAD_L)
                             clip_bg_col = IMAGE_CLIP_COLOR_GRAD[1:4]
-                            cr.set_source(grad)
+                            cr.set_source(bg_patterns[CLIP_BG_IMAGE])
                         else:
                             cr.set_source_rgb(*IMAGE_CLIP_SELECTED_COLOR)
                             clip_bg_col = IMAGE_CLIP_SELECTED_COLOR
                 else:# Audio clip
                     if not clip.selected:
-                        grad = cairo.LinearGradient (0, y, 0, y + track_height)
-                        grad.add_color_stop_rgba(*AUDIO_CLIP_COLOR_GRAD)
-                        grad.add_color_stop_rgba(*AUDIO_CLIP_COLOR_GRAD_L)
                         clip_bg_col = AUDIO_CLIP_COLOR_GRAD[1:4]
-                        cr.set_source(grad)
+                        cr.set_source(bg_patterns[CLIP_BG_AUDIO])
                     else:
                         clip_bg_col = AUDIO_CLIP_SELECTED_COLOR
                         cr.set_source_rgb(*AUDIO_CLIP_SELECTED_COLOR)
@@ -1738,10 +1809,16 @@ class TimeLineCanvas:
 
             # Draw audio level data, except for IMAGE_SEQUENCE clips
             # Init data rendering if data needed and not available
-            if clip.waveform_data == None and editorstate.display_all_audio_levels == True and clip.media_type != appconsts.IMAGE_SEQUENCE and clip.media_type != appconsts.PATTERN_PRODUCER:
-                 clip.waveform_data = audiowaveformrenderer.get_waveform_data(clip)
+            # Data is not kept in clip so that evicting it from size limited cache frees it,
+            # clip.waveform_data only flags that levels are displayed for single clip.
+            waveform_data = None
+            if clip.media_type != appconsts.IMAGE_SEQUENCE and clip.media_type != appconsts.PATTERN_PRODUCER:
+                if editorstate.display_all_audio_levels == True:
+                    waveform_data = audiowaveformrenderer.get_waveform_data(clip)
+                elif clip.waveform_data != None:
+                    waveform_data = audiowaveformrenderer.get_levels_data(clip.path)
             # Draw data if available large enough scale
-            if clip.waveform_data != None and scale_length > FILL_MIN:
+            if waveform_data != None and scale_length > FILL_MIN:
                 r, g, b = clip_bg_col
                 cr.set_source_rgb(r * 0.9, g * 0.9, b * 0.9)
 
@@ -1775,17 +1852,17 @@ class TimeLineCanvas:
                 # Get media frame 0 position in screen pixels
                 media_start_pos_pix = scale_in - clip_in * pix_per_frame
                 
-                # Draw level bar for each frame in draw range
-                for f in range(draw_first, draw_last, step):
-                    try:
-                        x = media_start_pos_pix + f * pix_per_frame
-                        h = bar_height * clip.waveform_data[f]
-                        if h < 1:
-                            h = 1
-                        cr.rectangle(x, y + y_pad + (bar_height - h), draw_pix_per_frame, h)
-                    except:
-                        # This is just dirty fix a when 23.98 fps does not work
-                        break
+                # Draw level bar for each frame in draw range, levels data drops frames 
+                # past its end which happens e.g. with 23.98 fps.
+                draw_levels = waveform_data.get_draw_levels(draw_first, draw_last, step)
+                f = draw_first
+                for level in draw_levels:
+                    x = media_start_pos_pix + f * pix_per_frame
+                    h = bar_height * level
+                    if h < 1:
+                        h = 1
+                    cr.rectangle(x, y + y_pad + (bar_height - h), draw_pix_per_frame, h)
+                    f += step
 
                 cr.fill()
 
@@ -1862,7 +1939,7 @@ class TimeLineCanvas:
                         cr.move_to(scale_in + TEXT_X, y + track_height - 2)
                         cr.show_text(str(clip.sync_diff))
 
-            if clip.waveform_data == None and editorstate.display_all_audio_levels == True and scale_length > FILL_MIN:
+            if waveform_data == None and editorstate.display_all_audio_levels == True and scale_length > FILL_MIN:
                 if clip.media_type != appconsts.IMAGE_SEQUENCE and clip.media_type != appconsts.PATTERN_PRODUCER:
                     cr.set_source_surface(LEVELS_RENDER_ICON, int(scale_in) + 4, y + 8)
                     cr.paint()
@@ -2007,11 +2084,6 @@ class TimeLineCanvas:
         cr.stroke()
         
     def create_match_frame_image_surface(self):
-        # Create non-scaled icon
-        matchframe_path = utils.get_hidden_user_dir_path() + appconsts.MATCH_FRAME
-        icon = cairo.ImageSurface.create_from_png(matchframe_path)
-
-        # Create and return scaled icon
         allocation = canvas_widget.widget.get_allocation()
         x, y, w, h = allocation.x, allocation.y, allocation.width, allocation.height
         profile_screen_ratio = float(PROJECT().profile.width()) / float(PROJECT().profile.height())
@@ -2019,16 +2091,11 @@ class TimeLineCanvas:
         global match_frame_width, match_frame_height
         match_frame_height = h - 40
         match_frame_width = match_frame_height * profile_screen_ratio
-    
-        scaled_icon = cairo.ImageSurface(cairo.FORMAT_ARGB32, int(match_frame_width), int(match_frame_height))
-        cr = cairo.Context(scaled_icon)
-        cr.scale(float(match_frame_width) / float(icon.get_width()), float(match_frame_height) / float(icon.get_height()))
 
-        cr.set_source_surface(icon, 0, 0)
-        cr.paint()
-        
+        # Frame is decoded straight to surface in match frame size
         global match_frame_image
-        match_frame_image = scaled_icon
+        match_frame_image = framegrabber.get_frame_surface(match_frame_clip_path, match_frame_clip_frame, 
+                                                           match_frame_width, match_frame_height)
         
 class TimeLineColumn:
     """
@@ -55,6 +55,7 @@ import mltfilters
 import persistance
 import respaths
 import renderconsumer
+import segmentedrender
 import translations
 import utils
 
@@ -1176,7 +1177,14 @@ class SingleRenderThread(threading.Thread):
 
         # Get render range
         start_frame, end_frame, wait_for_stop_render = get_render_range(render_item)
-        
+
+        # Render in segments in parallel processes if so set in preferences and possible for render
+        segments_count = editorpersistance.prefs.render_segments
+        if segmentedrender.can_render_segmented(render_item.render_path, render_item.args_vals_list,
+                                                start_frame, end_frame, segments_count):
+            self._do_segmented_render(render_item, producer, profile, start_frame, end_frame, segments_count)
+            return
+
         # Create and launch render thread
         render_thread = renderconsumer.FileRenderPlayer(None, producer, consumer, start_frame, end_frame) # None == file name not needed this time when using FileRenderPlayer because callsite keeps track of things
         render_thread.wait_for_producer_end_stop = wait_for_stop_render
@@ -1221,7 +1229,61 @@ class SingleRenderThread(threading.Thread):
         single_render_thread = None
         # Update view for render end
         GLib.idle_add(_single_render_shutdown)
-                    
+
+    def _do_segmented_render(self, render_item, producer, profile, start_frame, end_frame, segments_count):
+        self.segmented_render = segmentedrender.SegmentedRender(producer, render_item.render_path, profile,
+                                                                render_item.args_vals_list, start_frame, 
+                                                                end_frame, segments_count)
+        self.segmented_render.start()
+        render_item.render_started()
+
+        Gdk.threads_enter()
+        single_render_window.current_render.set_text("  " + os.path.basename(render_item.render_path))
+        Gdk.threads_leave()
+
+        # View update loop
+        self.running = True
+        while self.running and self.segmented_render.is_running() and not self.segmented_render.has_failed():
+            render_fraction = self.segmented_render.get_render_fraction()
+            current_render_time = time.time() - render_item.start_time
+
+            Gdk.threads_enter()
+            single_render_window.update_render_progress(render_fraction, render_item.get_display_name(), current_render_time)
+            single_render_window.segments_status.set_text(self.segmented_render.get_segments_status_str())
+            Gdk.threads_leave()
+
+            time.sleep(0.33)
+
+        global single_render_thread
+        if self.running == False:
+            self.segmented_render.abort()
+        elif self.segmented_render.join_segments():
+            render_time, segments_time, speedup = self.segmented_render.get_speedup()
+            print "segmented render done, time: " + utils.get_time_str_for_sec_float(render_time) + \
+                  ", segments render time: " + utils.get_time_str_for_sec_float(segments_time) + \
+                  ", speedup: " + "%.2f" % speedup
+
+            Gdk.threads_enter()
+            single_render_window.render_progress_bar.set_fraction(1.0)
+            single_render_window.segments_status.set_text(" " + _("Speedup: ") + "%.2fx" % speedup)
+            Gdk.threads_leave()
+            time.sleep(1.0) # Let user see speedup
+        else:
+            single_render_thread = None
+            # Render process exits when user closes error dialog
+            Gdk.threads_enter()
+            primary_txt = _("Segmented Render Failed!")
+            secondary_txt = self.segmented_render.error_msg + "\n\n" + _("See file ") + \
+                            utils.get_hidden_user_dir_path() + segmentedrender.SEGMENT_LOG_FILE + _(" for details.")
+            dialogutils.warning_message_with_callback(primary_txt, secondary_txt, single_render_window.window,
+                                                      False, _segmented_render_error_dialog_closed)
+            Gdk.threads_leave()
+            return
+
+        single_render_thread = None
+        # Update view for render end
+        GLib.idle_add(_single_render_shutdown)
+
     def abort(self):
         self.running = False
 
@@ -1245,10 +1307,16 @@ class SingleRenderWindow:
         current_r.set_size_request(250, 20)
         current_r_t.set_size_request(250, 20)
 
+        self.segments_status = Gtk.Label()
+        segments_r = guiutils.get_right_justified_box([guiutils.bold_label(_("Segments:"))])
+        segments_r.set_size_request(250, 20)
+
         info_vbox = Gtk.VBox(False, 0)
         info_vbox.pack_start(guiutils.get_left_justified_box([current_r, self.current_render]), False, False, 0)
         info_vbox.pack_start(guiutils.get_left_justified_box([current_r_t, self.current_render_time]), False, False, 0)
         info_vbox.pack_start(guiutils.get_left_justified_box([est_r, self.est_time_left]), False, False, 0)
+        if editorpersistance.prefs.render_segments > 1:
+            info_vbox.pack_start(guiutils.get_left_justified_box([segments_r, self.segments_status]), False, False, 0)
 
         self.stop_render_button = Gtk.Button(_("Stop Render"))
         self.stop_render_button.connect("clicked", 
@@ -1304,4 +1372,8 @@ def _start_single_render_shutdown():
 
 def _single_render_shutdown():
     Gtk.main_quit()
+
+def _segmented_render_error_dialog_closed(dialog, response_id):
+    dialog.destroy()
+    _single_render_shutdown()
     
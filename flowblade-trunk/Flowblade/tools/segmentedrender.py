@@ -0,0 +1,393 @@
+"""
+    Flowblade Movie Editor is a nonlinear video editor.
+    Copyright 2012 Janne Liljeblad.
+
+    This file is part of Flowblade Movie Editor <http://code.google.com/p/flowblade>.
+
+    Flowblade Movie Editor is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Flowblade Movie Editor is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Flowblade Movie Editor.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+"""
+Module renders timeline in segments in parallel processes.
+
+Sequence is saved as MLT XML and render range is cut in segments that are rendered
+in flowbladesegmentrender worker processes. Segment files are then joined to the
+render file with ffmpeg concat demuxer without re-encoding.
+
+Segments are rendered without audio and audio is rendered for the whole range in
+one more process and muxed into render file when segments are joined. Audio encoders
+add priming samples at stream start, so joined audio segments would have gaps.
+
+Used by single render process in batchrendering.py when preference 'render_segments' > 1.
+Segments are rendered in persistent render worker when it is used, see renderworker.py.
+"""
+
+import locale
+import mlt
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import editorpersistance
+import mltprofiles
+import renderconsumer
+import renderworker
+import respaths
+import utils
+
+SEGMENTS_DIR = "segmentrender/"
+SEQUENCE_XML_FILE = "sequence.xml"
+RENDER_ARGS_FILE = "render_args"
+AUDIO_RENDER_ARGS_FILE = "audio_render_args"
+SEGMENT_LOG_FILE = "log_segment_render"
+
+SEGMENT_PROGRESS_MSG = "SEGMENT_PROGRESS"
+SEGMENT_DONE_MSG = "SEGMENT_DONE"
+
+MIN_SEGMENT_FRAMES = 250 # Shorter segments are not worth process startup
+
+
+def can_render_segmented(render_path, args_vals_list, start_frame, end_frame, segments_count):
+    """
+    Returns True if render can be done in segments.
+    Image sequence and audio only renders can't be joined and joining needs ffmpeg.
+    """
+    if segments_count < 2:
+        return False
+    if "%" in render_path:
+        return False
+    if ("video_off", "1") in args_vals_list:
+        return False
+    if (end_frame - start_frame + 1) < segments_count * MIN_SEGMENT_FRAMES:
+        return False
+    try:
+        subprocess.call(["ffmpeg", "-version"], stdout=open(os.devnull, "w"), stderr=subprocess.STDOUT)
+    except OSError:
+        print "ffmpeg not available, segmented render not used"
+        return False
+    return True
+
+def get_segment_ranges(start_frame, end_frame, segments_count):
+    """
+    Returns list of (in, out) inclusive frame ranges of equal length.
+    """
+    length = end_frame - start_frame + 1
+    ranges = []
+    for i in range(0, segments_count):
+        seg_in = start_frame + (length * i) / segments_count
+        seg_out = start_frame + (length * (i + 1)) / segments_count - 1
+        ranges.append((seg_in, seg_out))
+    return ranges
+
+
+class SegmentedRender:
+    """
+    Renders range of sequence tractor in segments in parallel processes and joins them in render file.
+    """
+    def __init__(self, tractor, render_path, profile, args_vals_list, start_frame, end_frame, segments_count):
+        self.tractor = tractor
+        self.render_path = render_path
+        self.profile = profile
+        self.args_vals_list = args_vals_list
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.ranges = get_segment_ranges(start_frame, end_frame, segments_count)
+        self.segment_threads = []
+        self.audio_thread = None
+        self.aborted = False
+        self.error_msg = None
+        self.start_time = 0
+        self.end_time = 0
+
+        self.segments_dir = utils.get_hidden_user_dir_path() + SEGMENTS_DIR
+        self.xml_path = self.segments_dir + SEQUENCE_XML_FILE
+        self.args_path = self.segments_dir + RENDER_ARGS_FILE
+        self.audio_args_path = self.segments_dir + AUDIO_RENDER_ARGS_FILE
+        file_name, self.extension = os.path.splitext(render_path)
+        self.audio_path = str(self.segments_dir + "audio" + self.extension)
+
+    def start(self):
+        self.start_time = time.time()
+        if os.path.exists(self.segments_dir):
+            shutil.rmtree(self.segments_dir)
+        os.mkdir(self.segments_dir)
+
+        self._write_sequence_xml()
+
+        self._write_args_file(self.args_path, self.args_vals_list + [("audio_off", "1")])
+        self._write_args_file(self.audio_args_path, self.args_vals_list + [("video_off", "1")])
+
+        self.audio_thread = SegmentRenderProcessThread(self.xml_path, self.audio_args_path, self.profile.description(),
+                                                       self.audio_path, self.start_frame, self.end_frame)
+        self.audio_thread.start()
+
+        for i in range(0, len(self.ranges)):
+            seg_in, seg_out = self.ranges[i]
+            t = SegmentRenderProcessThread(self.xml_path, self.args_path, self.profile.description(),
+                                           self._get_segment_path(i), seg_in, seg_out)
+            t.start()
+            self.segment_threads.append(t)
+
+        print "segmented render started, segments: " + str(self.ranges)
+
+    def get_render_fraction(self):
+        # Segments have equal lengths
+        fraction = 0.0
+        for t in self.segment_threads:
+            fraction += t.fraction
+        return fraction / len(self.ranges)
+
+    def get_segments_status_str(self):
+        status = ""
+        for i in range(0, len(self.segment_threads)):
+            status += " " + str(i + 1) + ": " + str(int(self.segment_threads[i].fraction * 100)) + "%"
+        return status
+
+    def is_running(self):
+        for t in self._get_render_threads():
+            if t.is_alive():
+                return True
+        return False
+
+    def has_failed(self):
+        for t in self._get_render_threads():
+            if t.failed and not t.is_alive():
+                return True
+        return False
+
+    def abort(self):
+        self.aborted = True
+        self._stop_render_threads()
+        self.cleanup()
+
+    def cleanup(self):
+        if os.path.exists(self.segments_dir):
+            shutil.rmtree(self.segments_dir)
+
+    def join_segments(self):
+        """
+        Joins segment files and muxes audio file to render file without re-encoding.
+        Returns True on success, on failure self.error_msg tells what failed.
+        Segment files are deleted in both cases.
+        """
+        try:
+            return self._join_segments()
+        finally:
+            self.cleanup()
+
+    def _join_segments(self):
+        for t in self._get_render_threads():
+            if t.failed and not t.is_alive():
+                print "segmented render failed, segment " + t.segment_path
+                self.error_msg = _("Rendering segment file ") + os.path.basename(t.segment_path) + _(" failed.")
+                self._stop_render_threads() # Other segments may still be rendering
+                return False
+
+        list_path = self.segments_dir + "segments.txt"
+        list_file = open(list_path, "w")
+        for i in range(0, len(self.ranges)):
+            list_file.write("file '" + self._get_segment_path(i) + "'\n")
+        list_file.close()
+
+        # Audio stream is optional because encoding may not have audio
+        ffmpeg_call = ["ffmpeg", "-y",
+                       "-f", "concat",
+                       "-safe", "0",
+                       "-i", list_path,
+                       "-i", self.audio_path,
+                       "-map", "0:v",
+                       "-map", "1:a?",
+                       "-c", "copy",
+                       "-loglevel", "error",
+                       self.render_path]
+        ret = subprocess.call(ffmpeg_call)
+        self.end_time = time.time()
+        if ret != 0:
+            print "segmented render join failed, ffmpeg return code " + str(ret)
+            self.error_msg = _("Joining segment files with ffmpeg failed, return code ") + str(ret) + "."
+            return False
+
+        return True
+
+    def get_speedup(self):
+        """
+        Returns (wall clock time, sum of segment render times, speedup).
+        """
+        render_time = self.end_time - self.start_time
+        segments_time = 0.0
+        for t in self._get_render_threads():
+            segments_time += t.render_time
+        if render_time > 0:
+            speedup = segments_time / render_time
+        else:
+            speedup = 1.0
+        return (render_time, segments_time, speedup)
+
+    def _stop_render_threads(self):
+        for t in self._get_render_threads():
+            t.abort()
+        for t in self._get_render_threads():
+            t.join()
+
+    def _get_render_threads(self):
+        if self.audio_thread == None:
+            return self.segment_threads
+        return self.segment_threads + [self.audio_thread]
+
+    def _write_args_file(self, args_path, args_vals_list):
+        args_file = open(args_path, "wb")
+        pickle.dump(args_vals_list, args_file)
+        args_file.close()
+
+    def _write_sequence_xml(self):
+        xml_consumer = mlt.Consumer(self.profile, "xml", str(self.xml_path))
+        xml_consumer.connect(self.tractor)
+        xml_consumer.start()
+        self.tractor.set_speed(1)
+
+        while xml_consumer.is_stopped() == False:
+            time.sleep(0.1)
+        self.tractor.set_speed(0)
+
+    def _get_segment_path(self, index):
+        return str(self.segments_dir + "segment_" + str(index) + self.extension)
+
+
+class SegmentRenderProcessThread(threading.Thread):
+    """
+    Launches one segment render process and reads its progress.
+    """
+    def __init__(self, xml_path, args_path, profile_desc, segment_path, seg_in, seg_out):
+        threading.Thread.__init__(self)
+        self.xml_path = xml_path
+        self.args_path = args_path
+        self.profile_desc = profile_desc
+        self.segment_path = segment_path
+        self.seg_in = seg_in
+        self.seg_out = seg_out
+        self.process = None
+        self.worker_job = None
+        self.aborted = False
+        self.fraction = 0.0
+        self.render_time = 0.0
+        self.failed = True # Set False when process reports segment done
+
+    def run(self):
+        start = time.time()
+        if self._render_in_worker() == True:
+            self.render_time = time.time() - start
+            return
+        if self.aborted == True:
+            return
+
+        FLOG = open(utils.get_hidden_user_dir_path() + SEGMENT_LOG_FILE, 'a')
+        self.process = subprocess.Popen([sys.executable, respaths.LAUNCH_DIR + "flowbladesegmentrender",
+                                         respaths.ROOT_PATH, self.xml_path, self.args_path, self.profile_desc,
+                                         self.segment_path, str(self.seg_in), str(self.seg_out)],
+                                         stdin=FLOG, stdout=subprocess.PIPE, stderr=FLOG)
+
+        for line in iter(self.process.stdout.readline, ""):
+            if line.startswith(SEGMENT_PROGRESS_MSG):
+                self.fraction = float(line.split()[1])
+            elif line.startswith(SEGMENT_DONE_MSG):
+                self.fraction = 1.0
+                self.failed = False
+            else:
+                FLOG.write(line)
+
+        self.process.wait()
+        self.render_time = time.time() - start
+
+    def _render_in_worker(self):
+        # Returns False if worker is not available and segment needs to be rendered in own process
+        job_args = {"xml_path":self.xml_path, "args_path":self.args_path, "profile_desc":self.profile_desc,
+                    "segment_path":self.segment_path, "seg_in":self.seg_in, "seg_out":self.seg_out}
+        self.worker_job = renderworker.submit(renderworker.RENDER_JOB, job_args)
+        if self.worker_job == None:
+            return False
+
+        for msg in self.worker_job.messages():
+            self.fraction = msg["fraction"]
+        if self.worker_job.done == True:
+            self.fraction = 1.0
+            self.failed = False
+        return True
+
+    def abort(self):
+        self.aborted = True
+        if self.worker_job != None:
+            self.worker_job.abort()
+            return
+        try:
+            self.process.terminate()
+        except (AttributeError, OSError):
+            pass # Not started or already exited
+
+
+# ------------------------------------------------ segment render process
+def main():
+    # Called from .../launch/flowbladesegmentrender script
+    root_path, xml_path, args_path, profile_desc, segment_path, seg_in, seg_out = sys.argv[1:8]
+    seg_in = int(seg_in)
+    seg_out = int(seg_out)
+
+    respaths.set_paths(root_path)
+    editorpersistance.load()
+
+    repo = mlt.Factory().init()
+
+    # Set numeric locale to use "." as radix, MLT initilizes this to OS locale and this causes bugs
+    locale.setlocale(locale.LC_NUMERIC, 'C')
+
+    mltprofiles.load_profile_list()
+    profile = mltprofiles.get_profile(profile_desc)
+
+    args_file = open(args_path, "rb")
+    args_vals_list = pickle.load(args_file)
+    args_file.close()
+
+    render_segment(xml_path, args_vals_list, profile, segment_path, seg_in, seg_out, _print_progress)
+
+    print SEGMENT_DONE_MSG
+    sys.stdout.flush()
+
+def render_segment(xml_path, args_vals_list, profile, segment_path, seg_in, seg_out, progress_func):
+    """
+    Renders frames seg_in - seg_out of sequence xml and calls progress_func(fraction) while rendering.
+    Render is stopped if progress_func raises an exception.
+    """
+    producer = mlt.Producer(profile, str(xml_path))
+    segment_producer = producer.cut(seg_in, seg_out)
+    consumer = renderconsumer.get_mlt_render_consumer(segment_path, profile, args_vals_list)
+    consumer.set("terminate_on_pause", 1) # Stops at segment end
+
+    consumer.connect(segment_producer)
+    segment_producer.set_speed(1)
+    consumer.start()
+
+    length = float(seg_out - seg_in + 1)
+    try:
+        while consumer.is_stopped() == False:
+            progress_func(min(segment_producer.frame() / length, 1.0))
+            time.sleep(0.5)
+    finally:
+        consumer.stop()
+
+def _print_progress(fraction):
+    print SEGMENT_PROGRESS_MSG + " " + str(fraction)
+    sys.stdout.flush()
@@ -24,11 +24,14 @@ import os
 
 import appconsts
 from editorstate import PROJECT
-import gmic
-import toolnatron
+import lazyimport
 import render
 import utils
 
+# Imported on first use, see lazyimport.py
+gmic = lazyimport.lazy_import("gmic")
+toolnatron = lazyimport.lazy_import("toolnatron")
+
 _tools = []
 _render_items = []
 #_active_integrators = []
@@ -36,7 +39,7 @@ test_timeout_id = None
            
 # --------------------------------------------------- interface
 def init():
-    
+    # Called on first use, checking tools availability imports gmic and toolnatron modules
     if gmic.gmic_available():
         _tools.append(GMICIntegrator())
 
@@ -47,6 +50,9 @@ def init():
     _tools.append(ReverseIntegrator())
     
 def get_export_integrators():
+    if len(_tools) == 0:
+        init()
+
     export_integrators = []
     for tool_integrator in _tools:
         if tool_integrator.is_export_target == True:
@@ -46,11 +46,13 @@ def _track_menu_item_activated(widget, data):
 def lock_track(track_index):
     track = get_track(track_index)
     track.edit_freedom = appconsts.LOCKED
+    current_sequence().edit_generation += 1
     updater.repaint_tline()
 
 def unlock_track(track_index):
     track = get_track(track_index)
     track.edit_freedom = appconsts.FREE
+    current_sequence().edit_generation += 1
     updater.repaint_tline()
 
 def set_track_normal_height(track_index):
@@ -69,6 +71,7 @@ def set_track_normal_height(track_index):
                                 True)
         return
 
+    current_sequence().edit_generation += 1
     tlinewidgets.set_ref_line_y(gui.tline_canvas.widget.get_allocation())
     gui.tline_column.init_listeners()
     updater.repaint_tline()
@@ -78,6 +81,7 @@ def set_track_small_height(track_index):
     track.height = appconsts.TRACK_HEIGHT_SMALL
     if editorstate.SCREEN_HEIGHT < 863:
         track.height = appconsts.TRACK_HEIGHT_SMALLEST
+    current_sequence().edit_generation += 1
     
     tlinewidgets.set_ref_line_y(gui.tline_canvas.widget.get_allocation())
     gui.tline_column.init_listeners()
@@ -130,6 +134,7 @@ def _tline_vertical_shrink_changed(widget):
 def _activate_all_tracks():
     for i in range(0, len(current_sequence().tracks) - 1):
         current_sequence().tracks[i].active = True
+    current_sequence().edit_generation += 1
 
     gui.tline_column.widget.queue_draw()
     
@@ -139,6 +144,7 @@ def _activate_only_current_top_active():
             current_sequence().tracks[i].active = True
         else:
             current_sequence().tracks[i].active = False
+    current_sequence().edit_generation += 1
 
     gui.tline_column.widget.queue_draw()
     
@@ -170,6 +176,7 @@ def track_active_switch_pressed(data):
         track.active = (track.active == False)
         if current_sequence().all_tracks_off() == True:
             track.active = True
+        current_sequence().edit_generation += 1
         gui.tline_column.widget.queue_draw()
     elif data.event.button == 3:
         guicomponents.display_tracks_popup_menu(data.event, data.track, \
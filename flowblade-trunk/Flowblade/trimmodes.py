@@ -25,6 +25,7 @@ Module handles user edit events for trim, roll and slip trim modes.
 import traceback
 
 import appconsts
+import clipindex
 import dialogutils
 import edit
 import editorpersistance
@@ -676,7 +677,7 @@ def one_roll_trim_undo_done(track, index, is_to_side_edit):
     Callback if initial edit done. Undo and redo do not cause this to be called
     """
     # reinit edit mode to correct side
-    frame = track.clip_start(index)
+    frame = clipindex.clip_start(track, index)
     success = set_oneroll_mode(track, frame, is_to_side_edit)
     if not success:
         set_no_edit_mode_func()
@@ -799,7 +800,7 @@ class RippleData:
                         if blank.is_blanck_clip == False:
                             continue #  Clip is media clip, we're looking for closest blank
                         
-                        blank_first_frame = track.clip_start(i)
+                        blank_first_frame = clipindex.clip_start(track, i)
                         blank_last_frame = blank_first_frame + blank.clip_length()
                         
                         # Clip before trimmed timeline frame, distance is from blank last frame
@@ -877,7 +878,7 @@ class RippleData:
             for j in range(0, len(compositors)):
                 comp = compositors[j]
                 first_affected_blank_index = self.trim_blank_indexes[i - 1]
-                first_affected_frame = tracks[i].clip_start(first_affected_blank_index + 1)
+                first_affected_frame = clipindex.clip_start(tracks[i], first_affected_blank_index + 1)
                 if comp.clip_in >= first_affected_frame:
                     affected_compositors_destroy_ids.append(comp.destroy_id)
         
@@ -885,7 +886,7 @@ class RippleData:
         
 
     def get_track_blank_end_offset(self, track, blank_index):
-        blank_end_frame = track.clip_start(blank_index + 1)
+        blank_end_frame = clipindex.clip_start(track, blank_index + 1)
         return blank_end_frame - self.trim_frame
 
     def get_tracks_compositors_list(self):
@@ -1185,9 +1186,9 @@ def _get_two_roll_first_and_last():
     
     index = edit_data["index"]
     track = edit_data["track_object"]
-    first = track.clip_start(index - 1) + 1
+    first = clipindex.clip_start(track, index - 1) + 1
     end_clip = track.clips[index]
-    last = track.clip_start(index) + end_clip.clip_out - end_clip.clip_in
+    last = clipindex.clip_start(track, index) + end_clip.clip_out - end_clip.clip_in
                  
     return (first, last)
 
@@ -1269,7 +1270,7 @@ def _set_slide_mode_edit_data(track, edit_frame):
     trim_limits = {}
     trim_limits["start_handle"] = clip.clip_in
     trim_limits["end_handle"] = clip.get_length() - clip.clip_out
-    trim_limits["clip_start"] = track.clip_start(index)
+    trim_limits["clip_start"] = clipindex.clip_start(track, index)
     trim_limits["media_length"] = clip.get_length()
 
     global edit_data
@@ -1426,9 +1427,9 @@ def _do_slide_edit():
 def _slide_trim_first_do_callback(track, clip, index, start_frame_being_viewed):
     # If in one roll mode, reinit edit mode to correct side
     if start_frame_being_viewed:
-        frame = track.clip_start(index) + 1 # +1 because cut frame selects previous clip
+        frame = clipindex.clip_start(track, index) + 1 # +1 because cut frame selects previous clip
     else:
-        frame = track.clip_start(index) + clip.clip_out - clip.clip_in - 1
+        frame = clipindex.clip_start(track, index) + clip.clip_out - clip.clip_in - 1
     set_slide_mode(track, frame)
 
 def slide_play_pressed():
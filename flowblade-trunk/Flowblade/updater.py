@@ -27,6 +27,7 @@ from gi.repository import Gdk
 
 import appconsts
 import clipeffectseditor
+import clipindex
 import compositeeditor
 import gui
 import editorstate
@@ -143,6 +144,7 @@ def repaint_tline():
     """
     Repaints timeline canvas and scale
     """
+    tlinewidgets.invalidate_track_layer()
     gui.tline_canvas.widget.queue_draw()
     gui.tline_scale.widget.queue_draw()
 
@@ -482,7 +484,7 @@ def display_tline_cut_frame(track, index):
     if index > (len(track.clips) - 1):
         index = len(track.clips) - 1
     
-    clip_start_frame = track.clip_start(index)
+    clip_start_frame = clipindex.clip_start(track, index)
     PLAYER().seek_frame(clip_start_frame)
 
 def media_file_row_double_clicked(treeview, tree_path, col):
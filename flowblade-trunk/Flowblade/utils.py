@@ -509,6 +509,16 @@ def update_xml_file_producer_info(resource, info):
     print info
     #  <profile description="HD 720p 29.97 fps" width="1280" height="720" progressive="1" sample_aspect_num="1" sample_aspect_den="1" display_aspect_num="16" display_aspect_den="9" frame_rate_num="30000" frame_rate_den="1001" colorspace="0"/>
     
+def utf8_strings(value):
+    # JSON decodes strings to unicode, editor code uses utf-8 encoded str for paths
+    if isinstance(value, unicode):
+        return value.encode("utf-8")
+    elif isinstance(value, dict):
+        return dict((utf8_strings(k), utf8_strings(v)) for k, v in value.iteritems())
+    elif isinstance(value, list):
+        return [utf8_strings(item) for item in value]
+    return value
+
 def is_media_file(file_path):
     file_type = get_file_type(file_path)
     if file_type == "unknown":
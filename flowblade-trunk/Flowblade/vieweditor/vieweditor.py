@@ -26,6 +26,7 @@ from gi.repository import Gtk, GObject
 import cairoarea
 import cairo
 import respaths
+import rgbframe
 
 MIN_PAD = 20
 GUIDES_COLOR = (0.5, 0.5, 0.5, 1.0)
@@ -46,7 +47,7 @@ class ViewEditor(Gtk.Frame):
         self.scaled_screen_height = self.profile_h
         self.origo = (MIN_PAD, MIN_PAD)
 
-        self.bg_buf = None
+        self.bg_surface = None
         self.write_out_layers = False
         self.write_file_path = None
 
@@ -194,14 +195,7 @@ class ViewEditor(Gtk.Frame):
 
     # --------------------------------------------------- drawing
     def set_screen_rgb_data(self, screen_rgb_data):
-        buf = np.fromstring(screen_rgb_data, dtype=np.uint8)
-        buf.shape = (self.profile_h + 1, self.profile_w, 4) # +1 in h, seemeed to need it
-        out = np.copy(buf)
-        r = np.index_exp[:, :, 0]
-        b = np.index_exp[:, :, 2]
-        out[r] = buf[b]
-        out[b] = buf[r]
-        self.bg_buf = out
+        self.bg_surface = rgbframe.get_surface_from_mlt_rgb(screen_rgb_data, self.profile_w, self.profile_h)
 
     def _draw(self, event, cr, allocation):
         x, y, w, h = allocation
@@ -212,20 +206,13 @@ class ViewEditor(Gtk.Frame):
         cr.fill()
 
 
-        if self.bg_buf is not None:
-            # MLT Provides images in which R <-> B are swiched from what Cairo wants them,
-            # so use numpy to switch them and to create a modifiable buffer for Cairo
-            
-            # Create cairo surface
-            stride = cairo.ImageSurface.format_stride_for_width(cairo.FORMAT_RGB24, self.profile_w)
-            surface = cairo.ImageSurface.create_for_data(self.bg_buf, cairo.FORMAT_RGB24, self.profile_w, self.profile_h, stride)
-        
+        if self.bg_surface is not None:
             # Display it
             ox, oy = self.origo
             cr.save()
             cr.translate(ox, oy)
             cr.scale(self.scale * self.aspect_ratio, self.scale)
-            cr.set_source_surface(surface, 0, 0)
+            cr.set_source_surface(self.bg_surface, 0, 0)
             cr.paint()
             cr.restore()
         